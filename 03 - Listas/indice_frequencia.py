@@ -0,0 +1,333 @@
+#%%
+# Índice de frequência: conta uma vez em O(n) e responde contagem, "está na lista?" e top-k sem varrer
+
+"""
+No exercício 4 (Listas.ipynb), cada consulta faz lista.count(fruta), que percorre a lista inteira:
+Q consultas em n itens custam O(n·Q). IndiceFrequencia conta tudo numa passada (Counter, em C) e
+depois cada consulta é uma busca em dicionário:
+
+    indice = IndiceFrequencia(["maçã", "banana", "maçã"])
+    indice.contar("maçã")       -> 2      (O(1))
+    "uva" in indice             -> False  (O(1))
+    indice.mais_comuns(1)       -> [("maçã", 2)]
+
+Para o top-k não ordenar tudo a cada pergunta, os itens ficam agrupados por contagem
+(contagem -> itens), e as contagens existentes formam uma lista duplamente ligada em ordem
+(_acima/_abaixo, com 0 como sentinela). Somar ou tirar 1 de um item só o move para o grupo
+vizinho, O(1), e mais_comuns(k) desce a partir do maior grupo: O(k). Empates saem na ordem em
+que os itens chegaram àquela contagem (na construção, a ordem da primeira aparição, como no
+Counter.most_common).
+
+- normalizar: função aplicada aos itens e às consultas (str.lower, str.casefold...), como o
+  .lower() do exercício
+- ListaComIndice: lista que mantém o índice atualizado a cada append/extend/remove/pop
+"""
+
+from collections import Counter
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+Normalizar = Callable[[Any], Hashable]
+
+
+class IndiceFrequencia:
+    def __init__(self, itens: Iterable = (), normalizar: Normalizar | None = None):
+        self.normalizar = normalizar
+        self._contagens: dict = {}
+        self._grupos: dict[int, dict] = {}   # contagem -> itens com essa contagem (dict ordenado)
+        self._acima: dict[int, int] = {0: 0}  # próxima contagem existente acima (0 = nenhuma)
+        self._abaixo: dict[int, int] = {0: 0}
+        self._total = 0
+        self.estender(itens)
+
+    def _chave(self, item: Any) -> Hashable:
+        return item if self.normalizar is None else self.normalizar(item)
+
+    # --- lista ligada das contagens ---
+
+    def _ligar(self, contagem: int, abaixo: int, acima: int) -> None:
+        self._abaixo[contagem], self._acima[contagem] = abaixo, acima
+        self._acima[abaixo] = contagem
+        self._abaixo[acima] = contagem
+
+    def _desligar(self, contagem: int) -> None:
+        abaixo, acima = self._abaixo.pop(contagem), self._acima.pop(contagem)
+        self._acima[abaixo] = acima
+        self._abaixo[acima] = abaixo
+        del self._grupos[contagem]
+
+    def _mover(self, chave: Hashable, de: int, para: int) -> None:
+        # Passa a chave do grupo "de" para o grupo "para" (0 = fora do índice). Com passos de 1 o
+        # grupo novo é vizinho do antigo; saltos maiores andam pelas contagens existentes no meio
+        if para:
+            grupo = self._grupos.get(para)
+            if grupo is None:
+                atual = de
+                if para > de:
+                    while self._acima[atual] and self._acima[atual] < para:
+                        atual = self._acima[atual]
+                    self._ligar(para, atual, self._acima[atual])
+                else:
+                    while self._abaixo[atual] and self._abaixo[atual] > para:
+                        atual = self._abaixo[atual]
+                    self._ligar(para, self._abaixo[atual], atual)
+                grupo = self._grupos[para] = {}
+            grupo[chave] = None
+            self._contagens[chave] = para
+        else:
+            del self._contagens[chave]
+        if de:
+            grupo = self._grupos[de]
+            del grupo[chave]
+            if not grupo:
+                self._desligar(de)
+
+    def _construir(self, contagens: Counter) -> None:
+        # Índice vazio: agrupa tudo de uma vez. Há no máximo ~√(2n) contagens distintas, então
+        # ordená-las não pesa perto da contagem em si
+        self._contagens = dict(contagens)
+        for chave, contagem in self._contagens.items():
+            grupo = self._grupos.get(contagem)
+            if grupo is None:
+                grupo = self._grupos[contagem] = {}
+            grupo[chave] = None
+        anterior = 0
+        for contagem in sorted(self._grupos):
+            self._ligar(contagem, anterior, 0)
+            anterior = contagem
+
+    # --- atualização ---
+
+    def adicionar(self, item: Any, vezes: int = 1) -> int:
+        # Nova contagem do item
+        if vezes < 0:
+            raise ValueError("vezes deve ser >= 0 (para tirar, use remover)")
+        chave = self._chave(item)
+        atual = self._contagens.get(chave, 0)
+        if vezes:
+            self._mover(chave, atual, atual + vezes)
+            self._total += vezes
+        return atual + vezes
+
+    def estender(self, itens: Iterable) -> None:
+        lote = Counter(itens if self.normalizar is None else map(self.normalizar, itens))
+        if not self._contagens:
+            self._construir(lote)
+        else:
+            for chave, vezes in lote.items():
+                atual = self._contagens.get(chave, 0)
+                self._mover(chave, atual, atual + vezes)
+        self._total += lote.total()
+
+    def remover(self, item: Any, vezes: int = 1) -> int:
+        # Como list.remove: ValueError se o item não tem tantas ocorrências. Devolve a nova contagem
+        if vezes < 0:
+            raise ValueError("vezes deve ser >= 0 (para somar, use adicionar)")
+        chave = self._chave(item)
+        atual = self._contagens.get(chave, 0)
+        if vezes > atual:
+            raise ValueError(f"{item!r} aparece {atual} vez(es), não dá para remover {vezes}")
+        if vezes:
+            self._mover(chave, atual, atual - vezes)
+            self._total -= vezes
+        return atual - vezes
+
+    def descartar(self, item: Any) -> int:
+        # Tira todas as ocorrências; devolve quantas eram (0 se não estava)
+        atual = self._contagens.get(self._chave(item), 0)
+        if atual:
+            self.remover(item, atual)
+        return atual
+
+    # --- consultas ---
+
+    def contar(self, item: Any) -> int:
+        return self._contagens.get(self._chave(item), 0)
+
+    __getitem__ = contar
+
+    def __contains__(self, item: Any) -> bool:
+        return self._chave(item) in self._contagens
+
+    def mais_comuns(self, k: int | None = None) -> list[tuple[Hashable, int]]:
+        # Os k itens mais frequentes, do maior para o menor (todos se k for None), em O(k)
+        limite = len(self._contagens) if k is None else max(k, 0)
+        resultado = []
+        contagem = self._abaixo[0]
+        while contagem and len(resultado) < limite:
+            for chave in self._grupos[contagem]:
+                resultado.append((chave, contagem))
+                if len(resultado) == limite:
+                    break
+            contagem = self._abaixo[contagem]
+        return resultado
+
+    def maior_contagem(self) -> int:
+        return self._abaixo[0]
+
+    def proporcao(self, item: Any) -> float:
+        return self.contar(item) / self._total if self._total else 0.0
+
+    @property
+    def total(self) -> int:
+        # Quantidade de itens (com repetição), o len da lista original
+        return self._total
+
+    def __len__(self) -> int:
+        # Quantidade de itens distintos
+        return len(self._contagens)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._contagens)
+
+    def items(self):
+        return self._contagens.items()
+
+    def __repr__(self) -> str:
+        return f"IndiceFrequencia({self.mais_comuns(5)!r}{', ...' if len(self) > 5 else ''})"
+
+
+class ListaComIndice:
+    """
+    Lista com um IndiceFrequencia junto: count, in e mais_comuns viram O(1)/O(k). Inserir no fim
+    continua O(1); remove/pop do meio seguem O(n) como na lista, só o índice é atualizado em O(1).
+    Com normalizar, count, in e remove usam a chave normalizada: remove('maçã') tira a primeira
+    'Maçã' da lista. O índice é atualizado antes da lista, então um erro no normalizar (ou no
+    hash) não deixa os dois fora de sincronia.
+    """
+
+    def __init__(self, itens: Iterable = (), normalizar: Normalizar | None = None):
+        self.itens: list = list(itens)
+        self.indice = IndiceFrequencia(self.itens, normalizar)
+
+    def append(self, item: Any) -> None:
+        self.indice.adicionar(item)
+        self.itens.append(item)
+
+    def extend(self, itens: Iterable) -> None:
+        novos = list(itens)
+        self.indice.estender(novos)
+        self.itens.extend(novos)
+
+    def _posicao(self, item: Any) -> int:
+        # Primeira posição com a mesma chave do item; ValueError se não houver, como list.index
+        if item not in self.indice:
+            raise ValueError(f"{item!r} não está na lista")
+        normalizar = self.indice.normalizar
+        if normalizar is None:
+            return self.itens.index(item)
+        chave = normalizar(item)
+        return next(posicao for posicao, atual in enumerate(self.itens) if normalizar(atual) == chave)
+
+    def remove(self, item: Any) -> None:
+        posicao = self._posicao(item)
+        self.indice.remover(self.itens[posicao])
+        del self.itens[posicao]
+
+    def pop(self, posicao: int = -1) -> Any:
+        item = self.itens[posicao]  # IndexError antes de mexer no índice
+        self.indice.remover(item)
+        del self.itens[posicao]
+        return item
+
+    def __setitem__(self, posicao: int, item: Any) -> None:
+        antigo = self.itens[posicao]
+        self.indice.adicionar(item)  # se falhar aqui, nada mudou
+        self.indice.remover(antigo)
+        self.itens[posicao] = item
+
+    def count(self, item: Any) -> int:
+        return self.indice.contar(item)
+
+    def mais_comuns(self, k: int | None = None) -> list[tuple[Hashable, int]]:
+        return self.indice.mais_comuns(k)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self.indice
+
+    def __getitem__(self, posicao):
+        return self.itens[posicao]
+
+    def __iter__(self) -> Iterator:
+        return iter(self.itens)
+
+    def __len__(self) -> int:
+        return len(self.itens)
+
+    def __repr__(self) -> str:
+        return f"ListaComIndice({self.itens!r})"
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: list.count por consulta (O(n·Q)) vs índice (O(n) uma vez + O(1) por consulta)
+#------------------------------------------------------
+
+def benchmark(tamanhos: tuple[int, ...] = (10_000, 100_000, 1_000_000), consultas: int = 1_000,
+              limite_count: int = 200_000_000, k: int = 10) -> None:
+    import random
+    import time
+
+    def medir(funcao) -> float:
+        inicio = time.perf_counter()
+        funcao()
+        return time.perf_counter() - inicio
+
+    aleatorio = random.Random(4)
+    # Vocabulário com frequências bem desiguais (tipo Zipf), como palavras ou frutas
+    vocabulario = [f"fruta{i}" for i in range(5_000)]
+    pesos = [1 / (posicao + 1) for posicao in range(len(vocabulario))]
+
+    print(f"{consultas} consultas por tamanho; top-{k} e atualizações incrementais no índice")
+    print("n         | list.count x Q | construir índice | Q contagens (índice) | top-k Counter | top-k índice"
+          " | append+remove (por op)")
+    for n in tamanhos:
+        lista = aleatorio.choices(vocabulario, pesos, k=n)
+        perguntas = aleatorio.choices(vocabulario, k=consultas)
+
+        if n * consultas <= limite_count:
+            tempo_count = medir(lambda: [lista.count(fruta) for fruta in perguntas])
+            com_count = f"{tempo_count:13.3f}s"
+        else:
+            # Estima pela média de algumas consultas: cada uma é uma varredura completa
+            amostra = perguntas[:20]
+            tempo_count = medir(lambda: [lista.count(fruta) for fruta in amostra]) * consultas / len(amostra)
+            com_count = f"~{tempo_count:.3f}s"
+
+        indice = None
+
+        def construir():
+            nonlocal indice
+            indice = IndiceFrequencia(lista)
+
+        tempo_construir = medir(construir)
+        tempo_consultas = medir(lambda: [indice.contar(fruta) for fruta in perguntas])
+        assert all(indice.contar(fruta) == lista.count(fruta) for fruta in perguntas[:20])
+
+        contador = Counter(lista)
+        tempo_top_counter = medir(lambda: contador.most_common(k))
+        tempo_top_indice = medir(lambda: indice.mais_comuns(k))
+        assert [c for _, c in indice.mais_comuns(k)] == [c for _, c in contador.most_common(k)]
+
+        # Atualizações: cada append/remove mexe só nos grupos vizinhos
+        operacoes = 100_000
+        novos = aleatorio.choices(vocabulario, pesos, k=operacoes)
+
+        def atualizar():
+            for fruta in novos:
+                indice.adicionar(fruta)
+            for fruta in novos:
+                indice.remover(fruta)
+
+        tempo_atualizar = medir(atualizar)
+        print(f"{n:9d} | {com_count:>14s} | {tempo_construir:15.4f}s | {tempo_consultas:19.5f}s"
+              f" | {tempo_top_counter * 1e6:10.1f} µs | {tempo_top_indice * 1e6:9.1f} µs"
+              f" | {tempo_atualizar / (2 * operacoes) * 1e9:15.0f} ns")
+
+    frutas = ListaComIndice(["maçã", "banana", "maçã", "laranja", "banana", "maçã"], normalizar=str.lower)
+    frutas.append("Maçã")
+    frutas.remove("banana")
+    print(f"\n{frutas}: maçã aparece {frutas.count('MAÇÃ')} vezes; mais comuns: {frutas.mais_comuns(2)}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,74 @@
+import random
+from collections import Counter
+
+import pytest
+
+from indice_frequencia import IndiceFrequencia, ListaComIndice
+
+FRUTAS = ["maçã", "banana", "maçã", "laranja", "banana", "maçã"]
+
+
+def test_contagens_iguais_ao_list_count():
+    indice = IndiceFrequencia(FRUTAS)
+    for fruta in set(FRUTAS) | {"uva"}:
+        assert indice.contar(fruta) == indice[fruta] == FRUTAS.count(fruta)
+    assert "maçã" in indice and "uva" not in indice
+    assert indice.mais_comuns(2) == [("maçã", 3), ("banana", 2)]
+    assert (indice.total, len(indice), indice.maior_contagem()) == (6, 3, 3)
+    assert indice.proporcao("maçã") == 0.5
+
+
+def test_atualizacoes_incrementais_contra_counter():
+    aleatorio = random.Random(1)
+    indice, referencia = IndiceFrequencia(), Counter()
+    for _ in range(3_000):
+        item, vezes = aleatorio.randrange(12), aleatorio.randrange(4)
+        operacao = aleatorio.random()
+        if operacao < 0.4:
+            indice.adicionar(item, vezes)
+            referencia[item] += vezes
+        elif operacao < 0.7:
+            if vezes > referencia[item]:
+                with pytest.raises(ValueError):
+                    indice.remover(item, vezes)
+            else:
+                indice.remover(item, vezes)
+                referencia[item] -= vezes
+        elif operacao < 0.8:
+            assert indice.descartar(item) == referencia.pop(item, 0)
+        else:
+            lote = [aleatorio.randrange(12) for _ in range(vezes)]
+            indice.estender(lote)
+            referencia.update(lote)
+        referencia = +referencia
+        assert dict(indice.items()) == dict(referencia)
+        assert [c for _, c in indice.mais_comuns(5)] == sorted(referencia.values(), reverse=True)[:5]
+
+
+def test_normalizar_vale_para_consultas():
+    indice = IndiceFrequencia(["Maçã", "maçã"], normalizar=str.lower)
+    assert indice.contar("MAÇÃ") == 2 and "maÇã" in indice
+
+
+def test_lista_com_indice_remove_pela_chave_normalizada():
+    lista = ListaComIndice(["Maçã", "banana", "maçã"], normalizar=str.lower)
+    assert "maçã" in lista
+    lista.remove("MAÇÃ")
+    assert lista.itens == ["banana", "maçã"] and lista.count("maçã") == 1
+    with pytest.raises(ValueError):
+        lista.remove("uva")
+
+
+def test_lista_com_indice_fica_sincronizada():
+    lista = ListaComIndice(FRUTAS)
+    lista.append("uva")
+    lista.extend(["uva", "kiwi"])
+    assert lista.pop() == "kiwi"
+    lista[0] = "banana"
+    lista.remove("laranja")
+    assert lista.indice.items() == Counter(lista.itens).items()
+    with pytest.raises(IndexError):
+        lista.pop(100)
+    with pytest.raises(TypeError):
+        lista[0] = ["não", "hasheável"]
+    assert lista.indice.items() == Counter(lista.itens).items()
@@ -0,0 +1,57 @@
+from operator import itemgetter
+
+import pytest
+
+from uniao_listas import ListaSemRepeticao, congelar, intersecao, remover_repetidos, sem_repetidos, unir
+
+
+def _adicionar_sem_repetir(lista_origem, lista_destino):
+    # Exercício 5 (Listas.ipynb), a referência de resultado
+    for elemento in lista_origem:
+        if elemento not in lista_destino:
+            lista_destino.append(elemento)
+
+
+def test_unir_igual_ao_exercicio():
+    lista1, lista2 = [1, 2, 3, 4, 2], [3, 4, 5, 6, 1]
+    esperado = []
+    _adicionar_sem_repetir(lista1, esperado)
+    _adicionar_sem_repetir(lista2, esperado)
+    assert unir(lista1, lista2) == esperado == [1, 2, 3, 4, 5, 6]
+    assert unir() == []
+
+
+def test_sem_repetidos_aceita_gerador_e_chave():
+    assert list(sem_repetidos(iter("abracadabra"))) == ["a", "b", "r", "c", "d"]
+    assert remover_repetidos(["Ana", "ana", "Bia"], chave=str.casefold) == ["Ana", "Bia"]
+    registros = [{"id": 1, "v": "a"}, {"id": 2, "v": "b"}, {"id": 1, "v": "c"}]
+    assert unir(registros, chave=itemgetter("id")) == registros[:2]
+
+
+def test_itens_nao_hasheaveis():
+    with pytest.raises(TypeError, match="chave="):
+        unir([[1, 2]], [[3]])
+    with pytest.raises(TypeError, match="chave="):
+        list(sem_repetidos([{"a": 1}]))
+    assert unir([[1, 2], [3]], [[1, 2], [4]], chave=congelar) == [[1, 2], [3], [4]]
+    assert congelar({"a": [1, {2}]}) == frozenset({("a", (1, frozenset({2})))})
+
+
+def test_outros_type_error_nao_viram_dica_de_chave():
+    with pytest.raises(TypeError) as erro:
+        unir([1], 5)
+    assert "not iterable" in str(erro.value) and "chave=" not in str(erro.value)
+
+
+def test_intersecao_na_ordem_da_primeira():
+    assert intersecao([4, 3, 2, 1, 3], [3, 4, 5]) == [4, 3]
+    assert intersecao([1, 2, 3], [2, 3], [3]) == [3]
+    assert intersecao([1, 1, 2]) == [1, 2]
+    assert intersecao(["A", "b"], ["a"], chave=str.lower) == ["A"]
+
+
+def test_lista_sem_repeticao():
+    lista = ListaSemRepeticao([3, 1, 3])
+    assert lista.adicionar(2) and not lista.adicionar(1)
+    assert lista.estender([5, 2, 6]) == 2
+    assert list(lista) == [3, 1, 2, 5, 6] and len(lista) == 5 and lista[0] == 3 and 5 in lista
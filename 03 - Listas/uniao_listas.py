@@ -0,0 +1,210 @@
+#%%
+# União, remoção de repetidos e interseção de listas mantendo a ordem, em O(n)
+
+"""
+No exercício 5 (Listas.ipynb), adicionar_sem_repetir testa "elemento not in lista_destino": uma
+busca na lista inteira por elemento, O(n²) no total. A versão com set(lista1) | set(lista2) é
+O(n), mas perde a ordem. Aqui a ordem é a da primeira aparição e cada elemento custa O(1), com
+um conjunto dos já vistos (ou dict.fromkeys, que faz o mesmo em C):
+
+    unir([1, 2, 3, 4], [3, 4, 5, 6])      -> [1, 2, 3, 4, 5, 6]
+    intersecao([4, 3, 2, 1], [3, 4, 5])   -> [4, 3]
+
+- sem_repetidos: gerador, consome qualquer iterável (arquivo, gerador, lista) sem materializar
+- chave: função que diz quando dois itens são "o mesmo" (itemgetter("id"), str.casefold...). Também
+  resolve itens não hasheáveis (dicts, listas): o conjunto guarda a chave, e a saída, o item original.
+  congelar transforma listas/dicts/sets aninhados numa chave hasheável
+- ListaSemRepeticao: lista que recusa repetidos em O(1), para adicionar aos poucos (como o
+  adicionar_sem_repetir chamado várias vezes)
+"""
+
+from itertools import chain
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+Chave = Callable[[Any], Hashable]
+
+
+def congelar(item: Any) -> Hashable:
+    # Listas/tuplas -> tuplas, dicts -> frozenset de pares, sets -> frozenset (recursivo)
+    if isinstance(item, dict):
+        return frozenset((chave, congelar(valor)) for chave, valor in item.items())
+    if isinstance(item, (list, tuple)):
+        return tuple(congelar(valor) for valor in item)
+    if isinstance(item, (set, frozenset)):
+        return frozenset(congelar(valor) for valor in item)
+    return item
+
+
+def _nao_hasheavel(erro: TypeError) -> bool:
+    # "unhashable type: 'list'"; qualquer outro TypeError não tem relação com a chave
+    return "unhashable" in str(erro)
+
+
+def _sem_chave_para(erro: TypeError) -> TypeError:
+    return TypeError(f"{erro}: para itens não hasheáveis informe chave=... (por exemplo chave=congelar)")
+
+
+def sem_repetidos(itens: Iterable, chave: Chave | None = None) -> Iterator:
+    # Primeira aparição de cada item, na ordem original
+    vistos = set()
+    adicionar = vistos.add
+    try:
+        if chave is None:
+            for item in itens:
+                if item not in vistos:
+                    adicionar(item)
+                    yield item
+        else:
+            for item in itens:
+                identificador = chave(item)
+                if identificador not in vistos:
+                    adicionar(identificador)
+                    yield item
+    except TypeError as erro:
+        if chave is None and _nao_hasheavel(erro):
+            raise _sem_chave_para(erro) from erro
+        raise
+
+
+def unir(*listas: Iterable, chave: Chave | None = None) -> list:
+    # União na ordem da primeira aparição
+    if chave is None:
+        try:
+            return list(dict.fromkeys(chain.from_iterable(listas)))  # o mesmo conjunto de vistos, em C
+        except TypeError as erro:
+            if _nao_hasheavel(erro):
+                raise _sem_chave_para(erro) from erro
+            raise  # outro TypeError (ex.: um argumento que não é iterável) segue como está
+    return list(sem_repetidos(chain.from_iterable(listas), chave))
+
+
+def remover_repetidos(itens: Iterable, chave: Chave | None = None) -> list:
+    return unir(itens, chave=chave)
+
+
+def intersecao(primeira: Iterable, *outras: Iterable, chave: Chave | None = None) -> list:
+    # Itens da primeira que aparecem em todas as outras, na ordem da primeira e sem repetir
+    identificar = chave or (lambda item: item)
+    comuns = None
+    for outra in outras:
+        chaves = {identificar(item) for item in outra}
+        comuns = chaves if comuns is None else comuns & chaves
+    resultado = []
+    for item in sem_repetidos(primeira, chave):
+        if comuns is None or identificar(item) in comuns:
+            resultado.append(item)
+    return resultado
+
+
+class ListaSemRepeticao:
+    """
+    Lista que ignora itens repetidos. O conjunto dos já vistos acompanha a lista, então cada
+    adicionar/in custa O(1), por mais que a lista cresça.
+    """
+
+    def __init__(self, itens: Iterable = (), chave: Chave | None = None):
+        self.chave = chave
+        self.itens: list = []
+        self._vistos: set = set()
+        self.estender(itens)
+
+    def _identificar(self, item: Any) -> Hashable:
+        return item if self.chave is None else self.chave(item)
+
+    def adicionar(self, item: Any) -> bool:
+        # True se o item entrou, False se já existia
+        identificador = self._identificar(item)
+        if identificador in self._vistos:
+            return False
+        self._vistos.add(identificador)
+        self.itens.append(item)
+        return True
+
+    def estender(self, itens: Iterable) -> int:
+        # Quantos itens novos entraram
+        antes = len(self.itens)
+        vistos, acrescentar, chave = self._vistos, self.itens.append, self.chave
+        for item in itens:
+            identificador = item if chave is None else chave(item)
+            if identificador not in vistos:
+                vistos.add(identificador)
+                acrescentar(item)
+        return len(self.itens) - antes
+
+    def __contains__(self, item: Any) -> bool:
+        return self._identificar(item) in self._vistos
+
+    def __iter__(self) -> Iterator:
+        return iter(self.itens)
+
+    def __len__(self) -> int:
+        return len(self.itens)
+
+    def __getitem__(self, indice):
+        return self.itens[indice]
+
+    def __repr__(self) -> str:
+        return f"ListaSemRepeticao({self.itens!r})"
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: adicionar_sem_repetir (O(n²)) vs set (sem ordem) vs unir (O(n))
+#------------------------------------------------------
+
+def adicionar_sem_repetir(lista_origem, lista_destino):
+    # Cópia do exercício 5 (Listas.ipynb)
+    for elemento in lista_origem:
+        if elemento not in lista_destino:
+            lista_destino.append(elemento)
+
+
+def benchmark(tamanhos: tuple[int, ...] = (10_000, 100_000, 1_000_000, 10_000_000),
+              limite_quadratico: int = 20_000) -> None:
+    import random
+    import time
+    from operator import itemgetter
+
+    def medir(funcao) -> float:
+        inicio = time.perf_counter()
+        funcao()
+        return time.perf_counter() - inicio
+
+    print("n (total) | adicionar_sem_repetir | set (sem ordem) | unir (dict.fromkeys) | sem_repetidos"
+          " | unir(chave=id), dicts | ns por elemento (unir)")
+    aleatorio = random.Random(9)
+    for n in tamanhos:
+        # Duas listas de n/2 com ~50% de sobreposição, em ordem aleatória
+        universo = aleatorio.sample(range(n * 4), n // 2 * 3 // 2)
+        lista1, lista2 = universo[:n // 2], universo[-(n // 2):]
+        if n <= limite_quadratico:
+            destino = []
+
+            def exercicio():
+                adicionar_sem_repetir(lista1, destino)
+                adicionar_sem_repetir(lista2, destino)
+
+            quadratico = f"{medir(exercicio):9.3f}s"
+            assert destino == unir(lista1, lista2)
+        else:
+            quadratico = "   (O(n²))"
+        com_set = medir(lambda: set(lista1) | set(lista2))
+        com_dict = medir(lambda: unir(lista1, lista2))
+        com_gerador = medir(lambda: list(sem_repetidos(chain(lista1, lista2))))
+        if n <= 1_000_000:
+            registros1 = [{"id": valor, "nome": str(valor)} for valor in lista1]
+            registros2 = [{"id": valor, "nome": str(valor)} for valor in lista2]
+            com_chave = f"{medir(lambda: unir(registros1, registros2, chave=itemgetter('id'))):9.3f}s"
+            del registros1, registros2
+        else:
+            com_chave = "         -"
+        print(f"{n:9d} | {quadratico:>21s} | {com_set:14.3f}s | {com_dict:19.3f}s | {com_gerador:12.3f}s"
+              f" | {com_chave:>21s} | {com_dict / n * 1e9:6.1f}")
+
+    print(f"\nunir([1, 2, 3, 4], [3, 4, 5, 6]) = {unir([1, 2, 3, 4], [3, 4, 5, 6])}")
+    print(f"intersecao([4, 3, 2, 1], [3, 4, 5]) = {intersecao([4, 3, 2, 1], [3, 4, 5])}")
+    print(f"sem repetir listas (não hasheáveis): {unir([[1, 2], [3]], [[1, 2], [4]], chave=congelar)}")
+
+
+if __name__ == "__main__":
+    benchmark()
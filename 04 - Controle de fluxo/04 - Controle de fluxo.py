@@ -19,6 +19,10 @@ elif temp >= 18 and temp <= 26:
 else:
     print("temperatura alta")
 
+# Milhões de leituras de uma vez (np.digitize), limites configuráveis e contagem por sensor: classificacao_sensores.py
+from classificacao_sensores import CLASSIFICADOR_PADRAO, classificar
+print(CLASSIFICADOR_PADRAO.classificar_valor(temp), CLASSIFICADOR_PADRAO.rotular(classificar([15.2, 18, 26, 31.7])))
+
 #%%
 
     #Exercício 3: Filtragem de Logs por Severidade
@@ -46,6 +50,9 @@ logs = [
 for log in logs:
     if log['level'] == 'ERROR':
         print(log['message'])
+
+# Nos arquivos do loguru (GBs), um índice por nível e minuto evita reler o arquivo a cada consulta:
+# consultar("meus_logs.log", "ERROR", inicio, fim) em 06 - Log/consulta_logs.py
  
 #%%
 
@@ -57,13 +64,17 @@ for log in logs:
 idade = int(input("Informe a sua indade: "))
 email = input("Informe seu e-mail: ")
 
-if idade < 18 and idade > 65:
+if idade < 18 or idade > 65:  # com "and" nenhuma idade ficava fora (não existe idade < 18 e > 65 ao mesmo tempo)
     print("Idade fora do intervalo permitido")
 elif "@" not in email or "." not in email:
     print("forneça um e-mail válido")
 else:
     print("Dados de usuário válidos")
 
+# Regex de e-mail e milhões de usuários de uma vez, com um código de erro por linha: validacao_usuarios.py
+from validacao_usuarios import descrever, validar_usuario
+print(descrever(validar_usuario(idade, email)) or "Dados de usuário válidos")
+
 
 #%%
 a = ['Mary', 'had', 'a', 'little', 'lamb']
@@ -87,6 +98,10 @@ for palavra in palavras:
 
 print(contagem_palavras)
 
+# Sem pontuação grudada ("python!" e "python" juntas) e com Counter: frequencia_palavras.py
+from frequencia_palavras import contar_palavras, mais_frequentes
+print(mais_frequentes(contar_palavras(texto), 3))
+
 #%%
 
 #8. Filtragem de Dados Faltantes
@@ -122,6 +137,10 @@ for venda in vendas:
 
 print(total_categoria)
 
+# Várias agregações de uma vez, sem o if/else escrito à mão (agrupamento.py)
+from agrupamento import agrupar
+print(agrupar(vendas, "categoria", total=("valor", "sum"), vendas=("valor", "count"), media=("valor", "mean")))
+
 
 #%%
 # While
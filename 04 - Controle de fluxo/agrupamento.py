@@ -0,0 +1,352 @@
+#%%
+# Agrupamento e agregação (group by) de registros
+
+"""
+O exercício 10 (04 - Controle de fluxo.py) soma as vendas por categoria com o padrão
+"if chave in dicionario: += / else: =", escrito à mão a cada vez e só para uma soma. Aqui:
+
+- agrupar / AgrupadorStreaming: agregação por hash em uma passada sobre qualquer iterável de
+  registros (dicionários, tuplas, objetos), com várias agregações de uma vez:
+
+      agrupar(vendas, "categoria", total=("valor", "sum"), media=("valor", "mean"),
+              vendas=("valor", "count"), maior=("valor", "max"))
+
+  Cada grupo guarda só um acumulador por coluna ([quantidade, soma, mínimo, máximo]); dois
+  agrupadores (de blocos ou processos diferentes) se juntam com mesclar
+- agrupar_colunas: para colunas numéricas grandes (arrays NumPy), np.unique dá o código de cada
+  grupo (chaves inteiras numa faixa curta viram o próprio código, sem ordenar) e np.bincount
+  soma/conta tudo de uma vez; mínimo e máximo saem de np.minimum.at/np.maximum.at
+
+Agregações: sum, count, mean, min, max. Valores ausentes (None, ou NaN nos arrays) são ignorados,
+como no pandas: count conta só os presentes e um grupo sem nenhum valor tem mean/min/max = nan.
+"""
+
+import math
+from collections import defaultdict
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Hashable, Iterable, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # o caminho em Python puro continua funcionando
+    np = None
+
+AGREGACOES = ("sum", "count", "mean", "min", "max")
+
+# Posições no acumulador de cada coluna
+QUANTIDADE, SOMA, MINIMO, MAXIMO = range(4)
+
+_MAIOR_INT64 = (1 << 63) - 1
+
+
+def _extrator(campo: str | int | Sequence | Callable, por_atributo: bool = False) -> Callable[[Any], Any]:
+    # Nome de campo (dict) ou de atributo, índice (tupla/lista), vários campos (chave composta) ou função
+    if callable(campo):
+        return campo
+    pegar = attrgetter if por_atributo else itemgetter
+    if isinstance(campo, (list, tuple)):
+        return pegar(*campo)
+    return pegar(campo)
+
+
+def _validar(agregacoes: dict[str, tuple]) -> None:
+    if not agregacoes:
+        raise ValueError("Informe ao menos uma agregação, por exemplo total=('valor', 'sum')")
+    for nome, (_, funcao) in agregacoes.items():
+        if funcao not in AGREGACOES:
+            raise ValueError(f"Agregação desconhecida em {nome!r}: {funcao!r} (use {', '.join(AGREGACOES)})")
+
+
+def _finalizar(acumulador: list, funcao: str) -> float:
+    quantidade, soma, minimo, maximo = acumulador
+    if funcao == "sum":
+        return soma
+    if funcao == "count":
+        return quantidade
+    if not quantidade:
+        return math.nan
+    if funcao == "mean":
+        return soma / quantidade
+    return minimo if funcao == "min" else maximo
+
+
+class AgrupadorStreaming:
+    """
+    Agregação por hash, registro a registro. chave: nome do campo, índice, tupla de campos
+    (chave composta) ou função; cada agregação é nome=(coluna, funcao).
+    """
+
+    def __init__(self, chave: str | int | Sequence | Callable, por_atributo: bool = False,
+                 **agregacoes: tuple):
+        _validar(agregacoes)
+        self.chave = chave
+        self.agregacoes = agregacoes
+        self.colunas = list(dict.fromkeys(coluna for coluna, _ in agregacoes.values()))
+        funcoes = {funcao for _, funcao in agregacoes.values()}
+        self._min_max = bool(funcoes & {"min", "max"})
+        self._chave = _extrator(chave, por_atributo)
+        self._valores = [_extrator(coluna, por_atributo) for coluna in self.colunas]
+        self.grupos: dict[Hashable, list[list]] = {}
+
+    def _novo_grupo(self) -> list[list]:
+        return [[0, 0, math.inf, -math.inf] for _ in self.colunas]
+
+    def adicionar(self, registro) -> None:
+        self.adicionar_varios((registro,))
+
+    def adicionar_varios(self, registros: Iterable) -> "AgrupadorStreaming":
+        grupos = self.grupos
+        obter_chave = self._chave
+        novo_grupo = self._novo_grupo
+        min_max = self._min_max
+        valores = list(enumerate(self._valores))
+        # Variáveis locais e um laço por registro: o caminho quente fica sem chamadas de método
+        for registro in registros:
+            chave = obter_chave(registro)
+            acumuladores = grupos.get(chave)
+            if acumuladores is None:
+                acumuladores = grupos[chave] = novo_grupo()
+            for indice, obter_valor in valores:
+                valor = obter_valor(registro)
+                if valor is None or valor != valor:  # None e NaN
+                    continue
+                acumulador = acumuladores[indice]
+                acumulador[QUANTIDADE] += 1
+                acumulador[SOMA] += valor
+                if min_max:
+                    if valor < acumulador[MINIMO]:
+                        acumulador[MINIMO] = valor
+                    if valor > acumulador[MAXIMO]:
+                        acumulador[MAXIMO] = valor
+        return self
+
+    def mesclar(self, outro: "AgrupadorStreaming") -> "AgrupadorStreaming":
+        if outro.colunas != self.colunas:
+            raise ValueError("Só é possível mesclar agrupadores com as mesmas colunas")
+        for chave, acumuladores_outro in outro.grupos.items():
+            acumuladores = self.grupos.get(chave)
+            if acumuladores is None:
+                self.grupos[chave] = [acumulador[:] for acumulador in acumuladores_outro]
+                continue
+            for acumulador, acumulador_outro in zip(acumuladores, acumuladores_outro):
+                acumulador[QUANTIDADE] += acumulador_outro[QUANTIDADE]
+                acumulador[SOMA] += acumulador_outro[SOMA]
+                acumulador[MINIMO] = min(acumulador[MINIMO], acumulador_outro[MINIMO])
+                acumulador[MAXIMO] = max(acumulador[MAXIMO], acumulador_outro[MAXIMO])
+        return self
+
+    def resultado(self) -> dict[Hashable, dict[str, float]]:
+        posicao = {coluna: indice for indice, coluna in enumerate(self.colunas)}
+        saidas = [(nome, posicao[coluna], funcao) for nome, (coluna, funcao) in self.agregacoes.items()]
+        return {chave: {nome: _finalizar(acumuladores[indice], funcao) for nome, indice, funcao in saidas}
+                for chave, acumuladores in self.grupos.items()}
+
+    def __len__(self) -> int:
+        return len(self.grupos)
+
+
+def agrupar(registros: Iterable, chave: str | int | Sequence | Callable, por_atributo: bool = False,
+            **agregacoes: tuple) -> dict[Hashable, dict[str, float]]:
+    return AgrupadorStreaming(chave, por_atributo, **agregacoes).adicionar_varios(registros).resultado()
+
+
+def somar_por(registros: Iterable, chave: str | int | Sequence | Callable, valor: str | int) -> dict:
+    # O caso do exercício 10 (só a soma), com defaultdict: o laço mais curto possível
+    obter_chave, obter_valor = _extrator(chave), _extrator(valor)
+    totais = defaultdict(int)
+    for registro in registros:
+        totais[obter_chave(registro)] += obter_valor(registro)
+    return dict(totais)
+
+
+#------------------------------------------------------
+# Colunas NumPy: np.unique + np.bincount
+#------------------------------------------------------
+
+def _codigos_coluna(coluna) -> tuple["np.ndarray", "np.ndarray"]:
+    # (valores distintos, código 0..g-1 de cada linha)
+    coluna = np.asarray(coluna).ravel()
+    if coluna.dtype.kind in 'iu' and coluna.size:
+        menor, maior = int(coluna.min()), int(coluna.max())
+        if maior - menor <= 4 * coluna.size and maior <= _MAIOR_INT64:
+            # Inteiros numa faixa curta: o próprio valor é o código, sem ordenar (O(n)). A subtração
+            # é feita em int64: no dtype da coluna (int16, uint8...) ela pode estourar. uint64 acima
+            # do int64 não cabe na conversão e vai para o np.unique
+            deslocados = coluna.astype(np.int64) - menor
+            usados = np.bincount(deslocados, minlength=maior - menor + 1) > 0
+            novo_codigo = np.cumsum(usados) - 1
+            return np.flatnonzero(usados) + menor, novo_codigo[deslocados]
+    unicos, codigos = np.unique(coluna, return_inverse=True)
+    return unicos, codigos.ravel()
+
+
+def _codigos(chaves) -> tuple[list, "np.ndarray"]:
+    # Código 0..g-1 de cada linha e a chave de cada código; chave composta = tupla de colunas
+    if not isinstance(chaves, tuple):
+        unicos, codigos = _codigos_coluna(chaves)
+        return unicos.tolist(), codigos
+    partes = [_codigos_coluna(coluna) for coluna in chaves]
+    combinado = np.ravel_multi_index([codigos for _, codigos in partes], [len(unicos) for unicos, _ in partes])
+    usados, codigos = _codigos_coluna(combinado)
+    indices = np.unravel_index(usados, [len(unicos) for unicos, _ in partes])
+    rotulos = list(zip(*(unicos[indice].tolist() for (unicos, _), indice in zip(partes, indices))))
+    return rotulos, codigos
+
+
+def _agregar_coluna(codigos: "np.ndarray", n_grupos: int, valores, funcoes: set[str]) -> dict[str, "np.ndarray"]:
+    valores = np.asarray(valores, dtype=np.float64).ravel()
+    presentes = ~np.isnan(valores)
+    if not presentes.all():
+        codigos, valores = codigos[presentes], valores[presentes]
+    saida = {"sum": np.bincount(codigos, weights=valores, minlength=n_grupos),
+             "count": np.bincount(codigos, minlength=n_grupos)}
+    vazios = saida["count"] == 0
+    if "mean" in funcoes:
+        saida["mean"] = saida["sum"] / np.where(vazios, 1, saida["count"])
+        saida["mean"][vazios] = np.nan
+    # ufunc.at: uma passada, sem ordenar por grupo (rápido a partir do NumPy 1.25)
+    if "min" in funcoes:
+        saida["min"] = np.full(n_grupos, np.inf)
+        np.minimum.at(saida["min"], codigos, valores)
+        saida["min"][vazios] = np.nan
+    if "max" in funcoes:
+        saida["max"] = np.full(n_grupos, -np.inf)
+        np.maximum.at(saida["max"], codigos, valores)
+        saida["max"][vazios] = np.nan
+    return saida
+
+
+def agrupar_colunas(chaves, colunas: dict[str, Any], como_dict: bool = True, **agregacoes: tuple):
+    """
+    chaves: array (ou tupla de arrays, para chave composta); colunas: nome -> array de valores.
+    Com como_dict=False devolve (lista de chaves, {nome: array}), sem montar um dict por grupo.
+    Sem NumPy, cai no AgrupadorStreaming.
+    """
+    _validar(agregacoes)
+    if np is None:
+        nomes = list(colunas)
+        registros = zip(zip(*chaves) if isinstance(chaves, tuple) else chaves, *(colunas[nome] for nome in nomes))
+        agrupador = AgrupadorStreaming(0, **{nome: (nomes.index(coluna) + 1, funcao)
+                                             for nome, (coluna, funcao) in agregacoes.items()})
+        resultado = agrupador.adicionar_varios(registros).resultado()
+        if como_dict:
+            return resultado
+        rotulos = list(resultado)
+        return rotulos, {nome: [resultado[rotulo][nome] for rotulo in rotulos] for nome in agregacoes}
+
+    rotulos, codigos = _codigos(chaves)
+    n_grupos = len(rotulos)
+
+    por_coluna = {}
+    for coluna in dict.fromkeys(coluna for coluna, _ in agregacoes.values()):
+        funcoes = {funcao for nome_coluna, funcao in agregacoes.values() if nome_coluna == coluna}
+        por_coluna[coluna] = _agregar_coluna(codigos, n_grupos, colunas[coluna], funcoes)
+    saida = {nome: por_coluna[coluna][funcao] for nome, (coluna, funcao) in agregacoes.items()}
+
+    if not como_dict:
+        return rotulos, saida
+    listas = {nome: valores.tolist() for nome, valores in saida.items()}
+    return {rotulo: {nome: listas[nome][indice] for nome in agregacoes} for indice, rotulo in enumerate(rotulos)}
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: exercício 10 vs defaultdict vs AgrupadorStreaming vs NumPy
+#------------------------------------------------------
+
+def _total_como_exercicio(vendas: list[dict]) -> dict:
+    # Cópia do exercício 10 (04 - Controle de fluxo.py)
+    total_categoria = {}
+    for venda in vendas:
+        categoria = venda["categoria"]
+        valor = venda["valor"]
+        if categoria in total_categoria:
+            total_categoria[categoria] += valor
+        else:
+            total_categoria[categoria] = valor
+    return total_categoria
+
+
+def _cinco_agregacoes_a_mao(vendas: list[dict]) -> dict:
+    # O mesmo padrão do exercício estendido para soma, contagem, média, mínimo e máximo
+    grupos = {}
+    for venda in vendas:
+        categoria = venda["categoria"]
+        valor = venda["valor"]
+        if categoria in grupos:
+            grupo = grupos[categoria]
+            grupo["total"] += valor
+            grupo["vendas"] += 1
+            if valor < grupo["menor"]:
+                grupo["menor"] = valor
+            if valor > grupo["maior"]:
+                grupo["maior"] = valor
+        else:
+            grupos[categoria] = {"total": valor, "vendas": 1, "menor": valor, "maior": valor}
+    for grupo in grupos.values():
+        grupo["media"] = grupo["total"] / grupo["vendas"]
+    return grupos
+
+
+def benchmark(n_registros: int = 1_000_000, n_colunar: int = 10_000_000, n_categorias: int = 1000) -> None:
+    import random
+    import time
+
+    def medir(descricao: str, funcao, n: int):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        duracao = time.perf_counter() - inicio
+        print(f"  {descricao:42s} | {duracao:6.3f}s | {n / duracao / 1e6:6.2f} M registros/s")
+        return resultado
+
+    aleatorio = random.Random(11)
+    categorias = [f"categoria_{i}" for i in range(n_categorias)]
+    vendas = [{"categoria": categoria, "valor": aleatorio.randint(1, 5000)}
+              for categoria in aleatorio.choices(categorias, k=n_registros)]
+    cinco = dict(total=("valor", "sum"), vendas=("valor", "count"), media=("valor", "mean"),
+                 menor=("valor", "min"), maior=("valor", "max"))
+
+    print(f"{n_registros} dicionários, {n_categorias} categorias")
+    print(" só a soma:")
+    exercicio = medir("exercício 10 (if/else)", lambda: _total_como_exercicio(vendas), n_registros)
+    somas = medir("somar_por (defaultdict)", lambda: somar_por(vendas, "categoria", "valor"), n_registros)
+    streaming_soma = medir("agrupar(total=sum)", lambda: agrupar(vendas, "categoria", total=("valor", "sum")),
+                           n_registros)
+    print(" soma, contagem, média, mínimo e máximo:")
+    a_mao = medir("if/else escrito à mão", lambda: _cinco_agregacoes_a_mao(vendas), n_registros)
+    streaming = medir("agrupar (5 agregações)", lambda: agrupar(vendas, "categoria", **cinco), n_registros)
+    print(f"  mesmo resultado: {exercicio == somas == {c: g['total'] for c, g in streaming_soma.items()}}"
+          f" {all(a_mao[c][nome] == streaming[c][nome] for c in a_mao for nome in cinco)}")
+
+    if np is None:
+        return
+    chaves = np.array([venda["categoria"] for venda in vendas])
+    valores = np.array([venda["valor"] for venda in vendas], dtype=np.float64)
+    colunar = medir("agrupar_colunas (strings, NumPy)", lambda: agrupar_colunas(chaves, {"valor": valores}, **cinco),
+                    n_registros)
+    print(f"  mesmo resultado: {all(math.isclose(colunar[c][nome], streaming[c][nome]) for c in streaming for nome in cinco)}")
+
+    gerador = np.random.default_rng(11)
+    codigos = gerador.integers(0, n_categorias, n_colunar)
+    valores = gerador.integers(1, 5000, n_colunar).astype(np.float64)
+    print(f"\n{n_colunar} linhas em colunas NumPy (chave inteira)")
+    medir("agrupar_colunas (sum, count, mean)",
+          lambda: agrupar_colunas(codigos, {"valor": valores}, como_dict=False,
+                                  total=("valor", "sum"), vendas=("valor", "count"), media=("valor", "mean")),
+          n_colunar)
+    rotulos, saida = medir("agrupar_colunas (5 agregações)",
+                           lambda: agrupar_colunas(codigos, {"valor": valores}, como_dict=False, **cinco), n_colunar)
+    try:
+        import pandas as pd
+    except ImportError:
+        return
+    quadro = pd.DataFrame({"categoria": codigos, "valor": valores})
+    referencia = medir("pandas groupby().agg (referência)",
+                       lambda: quadro.groupby("categoria")["valor"].agg(["sum", "count", "mean", "min", "max"]),
+                       n_colunar)
+    print(f"  mesmo resultado que o pandas: {np.allclose(referencia['sum'].to_numpy(), saida['total'])}"
+          f" {np.array_equal(referencia['max'].to_numpy(), saida['maior'])}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,427 @@
+#%%
+# Classificação de leituras de temperatura de sensores IoT em lote e em streaming
+
+"""
+O exercício 2 (04 - Controle de fluxo.py) classifica uma leitura de input() com if/elif:
+< 18 °C 'Baixa', de 18 a 26 °C 'Normal', > 26 °C 'Alta'. Os sensores mandam milhões de leituras
+por minuto, então aqui:
+
+- Classificador: as mesmas faixas (ou outras, configuráveis) aplicadas a um array inteiro com
+  np.digitize; o resultado é um código por leitura (0, 1, 2...; -1 = sem leitura/NaN), que vira
+  texto ou pd.Categorical só quando preciso
+- JanelaPorSensor: quantas leituras de cada classe cada sensor teve nos últimos N segundos.
+  Um array (sensor, fatia de tempo, classe) usado como buffer circular: memória fixa, e a janela
+  anda zerando só as fatias que saíram dela
+- MonitorSensores + seguir_arquivo / servidor_sensores: ingestão com asyncio de linhas
+  "sensor,momento,temperatura" vindas de um arquivo que cresce (tail -f) ou de um socket local,
+  processadas em lotes, com a vazão (leituras/s) medida. Uma linha malformada (em branco, campos
+  a mais ou a menos, número ilegível) é descartada e contada, sem derrubar a ingestão
+
+Limites: cada limite pertence à classe de cima ou à de baixo. No padrão do exercício, 18 é
+'Normal' (classe de cima) e 26 também é 'Normal' (classe de baixo).
+"""
+
+import asyncio
+import math
+import os
+import time
+from bisect import bisect_right
+from typing import AsyncIterator, Sequence
+
+import numpy as np
+
+LIMITES = (18.0, 26.0)
+ROTULOS = ("Baixa", "Normal", "Alta")
+SEM_LEITURA = -1
+TAMANHO_LEITURA = 1024 * 1024  # bytes lidos do arquivo/socket de cada vez
+
+
+class Classificador:
+    """
+    limites: em ordem crescente; rotulos: um a mais que os limites.
+    limite_na_classe_de_cima: para cada limite, se o valor exato vai para a classe de cima. Sem ele,
+    todos vão para cima menos o último, que fica na de baixo (o [18, 26] fechado do exercício).
+    """
+
+    def __init__(self, limites: Sequence[float] = LIMITES, rotulos: Sequence[str] = ROTULOS,
+                 limite_na_classe_de_cima: Sequence[bool] | None = None):
+        if len(rotulos) != len(limites) + 1:
+            raise ValueError(f"São necessários {len(limites) + 1} rótulos para {len(limites)} limites")
+        if any(b <= a for a, b in zip(limites, limites[1:])):
+            raise ValueError(f"Os limites precisam ser crescentes: {limites}")
+        if limite_na_classe_de_cima is None:
+            limite_na_classe_de_cima = [True] * (len(limites) - 1) + [False]
+        elif len(limite_na_classe_de_cima) != len(limites):
+            raise ValueError(f"limite_na_classe_de_cima precisa de {len(limites)} valores, um por limite"
+                             f" (recebeu {len(limite_na_classe_de_cima)})")
+        self.limites = tuple(float(limite) for limite in limites)
+        self.rotulos = tuple(rotulos)
+        # np.digitize põe o valor igual ao corte na classe de cima; para o limite ficar na classe de
+        # baixo, o corte passa a ser o próximo float depois dele (x >= corte  <=>  x > limite)
+        self._cortes = np.array([limite if de_cima else np.nextafter(limite, np.inf)
+                                 for limite, de_cima in zip(self.limites, limite_na_classe_de_cima)])
+        self._cortes_lista = self._cortes.tolist()
+        self._rotulos_array = np.array(self.rotulos + ("Sem leitura",))  # índice -1 = sem leitura
+
+    def classificar(self, leituras) -> np.ndarray:
+        valores = np.asarray(leituras, dtype=np.float64)
+        codigos = np.digitize(valores, self._cortes).astype(np.int8)
+        codigos[np.isnan(valores)] = SEM_LEITURA  # o digitize mandaria NaN para a última classe
+        return codigos
+
+    def classificar_valor(self, leitura: float) -> str:
+        # Uma leitura só, sem NumPy: busca binária nos mesmos cortes
+        if leitura is None or math.isnan(leitura):
+            return "Sem leitura"
+        return self.rotulos[bisect_right(self._cortes_lista, leitura)]
+
+    def rotular(self, codigos: np.ndarray) -> np.ndarray:
+        return self._rotulos_array[codigos]
+
+    def como_categoria(self, codigos: np.ndarray):
+        # pd.Categorical guarda os códigos (int8) e os rótulos uma vez só; -1 vira NaN
+        import pandas as pd
+        return pd.Categorical.from_codes(codigos, categories=list(self.rotulos))
+
+    def como_intervalos_pandas(self) -> list[float]:
+        # Bins equivalentes para pd.cut(..., bins=..., right=False, labels=rotulos)
+        return [-math.inf, *self._cortes_lista, math.inf]
+
+    def contar(self, codigos: np.ndarray) -> dict[str, int]:
+        contagem = np.bincount(codigos[codigos >= 0], minlength=len(self.rotulos))
+        return dict(zip(self.rotulos, contagem.tolist()))
+
+
+CLASSIFICADOR_PADRAO = Classificador()
+
+
+def classificar(leituras) -> np.ndarray:
+    return CLASSIFICADOR_PADRAO.classificar(leituras)
+
+
+#------------------------------------------------------
+# Contagem por sensor em janela deslizante
+#------------------------------------------------------
+
+class JanelaPorSensor:
+    """
+    Contagem de leituras por sensor e classe nos últimos `janela` segundos, com precisão de
+    `resolucao` segundos. Leituras mais antigas que a janela (em relação à mais recente já vista)
+    são descartadas.
+    """
+
+    def __init__(self, n_classes: int, janela: float = 60.0, resolucao: float = 1.0, capacidade: int = 1024):
+        self.n_classes = n_classes
+        self.resolucao = resolucao
+        self.n_fatias = max(1, math.ceil(janela / resolucao))
+        self.contagens = np.zeros((capacidade, self.n_fatias, n_classes), dtype=np.int64)
+        self.sensores: dict = {}  # id do sensor -> linha em contagens
+        self.fatia_atual: int | None = None  # número absoluto (momento // resolucao) da fatia mais recente
+        self.descartadas = 0
+
+    def _linhas(self, sensores) -> np.ndarray:
+        # id -> linha em contagens; os ids novos ganham a próxima linha livre
+        ids = sensores.tolist() if isinstance(sensores, np.ndarray) else list(sensores)
+        try:
+            return np.fromiter(map(self.sensores.__getitem__, ids), dtype=np.int64, count=len(ids))
+        except KeyError:
+            pass
+        for sensor in dict.fromkeys(ids):
+            if sensor not in self.sensores:
+                self.sensores[sensor] = len(self.sensores)
+        if len(self.sensores) > self.contagens.shape[0]:
+            novas = np.zeros((max(len(self.sensores), 2 * self.contagens.shape[0]),) + self.contagens.shape[1:],
+                             dtype=np.int64)
+            novas[:self.contagens.shape[0]] = self.contagens
+            self.contagens = novas
+        return np.fromiter(map(self.sensores.__getitem__, ids), dtype=np.int64, count=len(ids))
+
+    def _avancar(self, ate: int) -> None:
+        # Zera as fatias que saem da janela quando o tempo anda
+        if self.fatia_atual is None or ate - self.fatia_atual >= self.n_fatias:
+            self.contagens[:] = 0
+        elif ate > self.fatia_atual:
+            posicoes = np.arange(self.fatia_atual + 1, ate + 1) % self.n_fatias
+            self.contagens[:, posicoes, :] = 0
+        else:
+            return
+        self.fatia_atual = ate
+
+    def adicionar(self, sensores, momentos, codigos: np.ndarray) -> None:
+        # sensores: array ou lista de ids (texto ou inteiros), um por leitura
+        sensores = sensores if isinstance(sensores, np.ndarray) else np.asarray(sensores, dtype=object)
+        fatias = np.floor_divide(np.asarray(momentos, dtype=np.float64), self.resolucao).astype(np.int64)
+        codigos = np.asarray(codigos)
+        if not fatias.size:
+            return
+        self._avancar(int(fatias.max()))
+        validas = (fatias > self.fatia_atual - self.n_fatias) & (codigos >= 0)
+        self.descartadas += int(fatias.size - np.count_nonzero(validas))
+        if not validas.all():
+            sensores, fatias, codigos = sensores[validas], fatias[validas], codigos[validas]
+        linhas = self._linhas(sensores)  # antes de usar self.contagens: pode crescer aqui
+        # Índice plano (sensor, fatia, classe): np.add.at num array 1-D é o caminho mais rápido
+        posicoes = (linhas * self.n_fatias + fatias % self.n_fatias) * self.n_classes + codigos
+        np.add.at(self.contagens.reshape(-1), posicoes, 1)
+
+    def contagem(self, sensor) -> np.ndarray:
+        linha = self.sensores.get(sensor)
+        if linha is None:
+            return np.zeros(self.n_classes, dtype=np.int64)
+        return self.contagens[linha].sum(axis=0)
+
+    def contagens_por_sensor(self) -> tuple[list, np.ndarray]:
+        # (ids, array sensores x classes) com a janela inteira somada
+        return list(self.sensores), self.contagens[:len(self.sensores)].sum(axis=1)
+
+
+#------------------------------------------------------
+# Ingestão com asyncio
+#------------------------------------------------------
+
+_SEM_SEPARADORES = bytes(c for c in range(256) if c not in b',\n')  # bytes.translate apaga estes
+
+
+def interpretar_linhas(dados: bytes) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # b"sensor,momento,temperatura\n..." (linhas completas) -> três colunas; temperatura vazia = NaN.
+    # ValueError se alguma linha estiver malformada (veja interpretar_linhas_tolerante)
+    corpo = dados.rstrip(b'\n')
+    # Só conferir o total de campos deixaria passar linhas que se compensam (uma com 2 campos e outra
+    # com 4). Tirando tudo menos vírgulas e quebras de linha, um lote válido é exatamente ",,\n,,\n...,,"
+    separadores = corpo.translate(None, _SEM_SEPARADORES)
+    if not corpo or separadores != (b',,\n' * (corpo.count(b'\n') + 1))[:-1]:
+        raise ValueError("Linha com número de campos diferente de 3 (sensor,momento,temperatura)")
+    campos = corpo.replace(b'\n', b',').split(b',')
+    temperaturas = [campo or b'nan' for campo in campos[2::3]]
+    sensores = b'\n'.join(campos[0::3]).decode().split('\n')  # decodifica todos os ids de uma vez
+    momentos = np.array(campos[1::3], dtype=np.float64)
+    if not np.isfinite(momentos).all():
+        raise ValueError("Momento ausente ou não finito")
+    return np.array(sensores, dtype=object), momentos, np.array(temperaturas, dtype=np.float64)
+
+
+def interpretar_linhas_tolerante(dados: bytes) -> tuple[tuple[np.ndarray, np.ndarray, np.ndarray], int]:
+    # Linha a linha, só quando o lote inteiro falhou: ((colunas das linhas boas), quantas malformadas).
+    # Linhas em branco são ignoradas sem contar
+    sensores, momentos, temperaturas = [], [], []
+    malformadas = 0
+    for linha in dados.split(b'\n'):
+        linha = linha.strip()
+        if not linha:
+            continue
+        campos = linha.split(b',')
+        try:
+            if len(campos) != 3:
+                raise ValueError
+            sensor, momento = campos[0].decode(), float(campos[1])
+            temperatura = float(campos[2]) if campos[2] else math.nan
+            if not math.isfinite(momento):
+                raise ValueError
+        except ValueError:  # inclui UnicodeDecodeError
+            malformadas += 1
+            continue
+        sensores.append(sensor)
+        momentos.append(momento)
+        temperaturas.append(temperatura)
+    colunas = (np.array(sensores, dtype=object), np.array(momentos, dtype=np.float64),
+               np.array(temperaturas, dtype=np.float64))
+    return colunas, malformadas
+
+
+class MonitorSensores:
+    def __init__(self, classificador: Classificador = CLASSIFICADOR_PADRAO, janela: float = 60.0,
+                 resolucao: float = 1.0):
+        self.classificador = classificador
+        self.janela = JanelaPorSensor(len(classificador.rotulos), janela, resolucao)
+        self.totais = np.zeros(len(classificador.rotulos), dtype=np.int64)
+        self.leituras = 0
+        self.linhas_malformadas = 0
+        self.inicio = time.perf_counter()
+
+    def adicionar_lote(self, sensores, momentos, temperaturas) -> np.ndarray:
+        codigos = self.classificador.classificar(temperaturas)
+        self.janela.adicionar(sensores, momentos, codigos)
+        self.totais += np.bincount(codigos[codigos >= 0], minlength=self.totais.size)
+        self.leituras += codigos.size
+        return codigos
+
+    def adicionar_linhas(self, dados: bytes) -> None:
+        if not dados:
+            return
+        try:
+            colunas = interpretar_linhas(dados)
+        except ValueError:
+            # Uma leitura ruim não pode parar a ingestão: o lote é refeito linha a linha
+            colunas, malformadas = interpretar_linhas_tolerante(dados)
+            self.linhas_malformadas += malformadas
+        self.adicionar_lote(*colunas)
+
+    def vazao(self) -> float:
+        return self.leituras / max(time.perf_counter() - self.inicio, 1e-9)
+
+    def resumo(self) -> dict:
+        return {"leituras": self.leituras, "leituras_por_segundo": round(self.vazao()),
+                "sensores": len(self.janela.sensores), "descartadas": self.janela.descartadas,
+                "linhas_malformadas": self.linhas_malformadas,
+                "totais": dict(zip(self.classificador.rotulos, self.totais.tolist()))}
+
+
+async def seguir_arquivo(caminho: str, intervalo: float = 0.2, do_inicio: bool = True,
+                         parar_quando_ocioso: float | None = None) -> AsyncIterator[bytes]:
+    """
+    Como tail -f: devolve blocos de linhas completas à medida que o arquivo cresce.
+    parar_quando_ocioso: encerra depois desse tempo (s) sem dados novos (None = segue para sempre).
+    """
+    with open(caminho, 'rb') as arquivo:
+        if not do_inicio:
+            arquivo.seek(0, os.SEEK_END)
+        resto = b''
+        ocioso_desde = time.monotonic()
+        while True:
+            lido = arquivo.read(TAMANHO_LEITURA)
+            if not lido:
+                if parar_quando_ocioso is not None and time.monotonic() - ocioso_desde > parar_quando_ocioso:
+                    return
+                await asyncio.sleep(intervalo)  # libera o loop para as outras tarefas
+                continue
+            ocioso_desde = time.monotonic()
+            dados = resto + lido
+            corte = dados.rfind(b'\n') + 1
+            resto = dados[corte:]  # linha ainda sendo escrita
+            if corte:
+                yield dados[:corte]
+
+
+async def ingerir(fonte: AsyncIterator[bytes], monitor: MonitorSensores) -> MonitorSensores:
+    async for dados in fonte:
+        monitor.adicionar_linhas(dados)
+    return monitor
+
+
+async def _ler_conexao(leitor: asyncio.StreamReader) -> AsyncIterator[bytes]:
+    resto = b''
+    while lido := await leitor.read(TAMANHO_LEITURA):
+        dados = resto + lido
+        corte = dados.rfind(b'\n') + 1
+        resto = dados[corte:]
+        if corte:
+            yield dados[:corte]
+    if resto:
+        yield resto + b'\n'
+
+
+async def servidor_sensores(monitor: MonitorSensores, host: str = '127.0.0.1', porta: int = 9999) -> asyncio.Server:
+    # Cada conexão manda linhas "sensor,momento,temperatura"; todas alimentam o mesmo monitor
+    async def atender(leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        try:
+            await ingerir(_ler_conexao(leitor), monitor)
+        finally:
+            escritor.close()
+
+    return await asyncio.start_server(atender, host, porta)
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: if/elif vs np.digitize vs pd.cut, janela por sensor e ingestão assíncrona
+#------------------------------------------------------
+
+def _classificar_como_exercicio(temp: float) -> str:
+    # Cópia do exercício 2 (04 - Controle de fluxo.py), devolvendo em vez de imprimir
+    if temp < 18:
+        return "Baixa"
+    elif temp >= 18 and temp <= 26:
+        return "Normal"
+    else:
+        return "Alta"
+
+
+def _gerar_linhas(n: int, n_sensores: int, inicio: float, duracao: float, semente: int = 0) -> bytes:
+    gerador = np.random.default_rng(semente)
+    sensores = gerador.integers(0, n_sensores, n)
+    momentos = inicio + np.sort(gerador.uniform(0, duracao, n))
+    temperaturas = np.round(gerador.normal(22, 5, n), 2)
+    return ''.join(f"sensor-{s},{m:.3f},{t}\n" for s, m, t in
+                   zip(sensores.tolist(), momentos.tolist(), temperaturas.tolist())).encode()
+
+
+def benchmark(n_leituras: int = 10_000_000, n_sensores: int = 1000, n_linhas: int = 2_000_000) -> None:
+    import tempfile
+
+    def medir(descricao: str, funcao, n: int):
+        comeco = time.perf_counter()
+        resultado = funcao()
+        duracao = time.perf_counter() - comeco
+        print(f"  {descricao:40s} | {duracao:6.3f}s | {n / duracao / 1e6:7.2f} M leituras/s")
+        return resultado
+
+    gerador = np.random.default_rng(1)
+    temperaturas = np.round(gerador.normal(22, 5, n_leituras), 2)
+    temperaturas[gerador.integers(0, n_leituras, n_leituras // 1000)] = np.nan
+    lista = temperaturas[:1_000_000].tolist()
+
+    print(f"Classificação ({n_leituras} leituras; o if/elif sobre 1 milhão)")
+    referencia = medir("exercício 2 (if/elif, um por vez)",
+                       lambda: [_classificar_como_exercicio(t) for t in lista if t == t], len(lista))
+    medir("classificar_valor (um por vez)",
+          lambda: [CLASSIFICADOR_PADRAO.classificar_valor(t) for t in lista], len(lista))
+    codigos = medir("classificar (np.digitize)", lambda: classificar(temperaturas), n_leituras)
+    rotulos = CLASSIFICADOR_PADRAO.rotular(codigos[:len(lista)])
+    print(f"  mesmo resultado que o exercício: {list(rotulos[codigos[:len(lista)] >= 0]) == referencia}")
+    try:
+        import pandas as pd
+        cortes = medir("pd.cut", lambda: pd.cut(temperaturas, CLASSIFICADOR_PADRAO.como_intervalos_pandas(),
+                                                right=False, labels=list(ROTULOS)), n_leituras)
+        categoria = CLASSIFICADOR_PADRAO.como_categoria(codigos)
+        print(f"  pd.cut == digitize: {np.array_equal(cortes.codes, categoria.codes)}")
+    except ImportError:
+        pass
+    print(f"  {CLASSIFICADOR_PADRAO.contar(codigos)}")
+    limites_proprios = Classificador((0, 18, 26, 35), ("Congelando", "Baixa", "Normal", "Alta", "Crítica"))
+    print(f"  limites configuráveis: {limites_proprios.contar(limites_proprios.classificar(temperaturas))}")
+
+    print(f"\nJanela de 60 s por sensor ({n_sensores} sensores, lotes de 100 mil)")
+    sensores = np.char.add("sensor-", gerador.integers(0, n_sensores, n_leituras).astype(str))
+    momentos = np.sort(gerador.uniform(0, 600, n_leituras))
+
+    def janela():
+        monitor = MonitorSensores()
+        for inicio in range(0, n_leituras, 100_000):
+            fatia = slice(inicio, inicio + 100_000)
+            monitor.adicionar_lote(sensores[fatia], momentos[fatia], temperaturas[fatia])
+        return monitor
+
+    monitor = medir("MonitorSensores.adicionar_lote", janela, n_leituras)
+    print(f"  sensor-0 nos últimos 60 s: {dict(zip(ROTULOS, monitor.janela.contagem('sensor-0').tolist()))}")
+
+    print(f"\nIngestão assíncrona ({n_linhas} linhas 'sensor,momento,temperatura')")
+    linhas = _gerar_linhas(n_linhas, n_sensores, time.time(), 60)
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'leituras.csv')
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write(linhas)
+        do_arquivo = medir("seguir_arquivo (tail do arquivo)", lambda: asyncio.run(
+            ingerir(seguir_arquivo(caminho, parar_quando_ocioso=0.0), MonitorSensores())), n_linhas)
+        print(f"  {do_arquivo.resumo()}")
+
+    async def pelo_socket():
+        monitor = MonitorSensores()
+        servidor = await servidor_sensores(monitor, porta=0)
+        porta = servidor.sockets[0].getsockname()[1]
+        leitor, escritor = await asyncio.open_connection('127.0.0.1', porta)
+        for inicio in range(0, len(linhas), TAMANHO_LEITURA):
+            escritor.write(linhas[inicio:inicio + TAMANHO_LEITURA])
+            await escritor.drain()
+        escritor.write_eof()
+        await leitor.read()  # o servidor fecha a conexão depois de processar tudo
+        escritor.close()
+        servidor.close()
+        await servidor.wait_closed()
+        return monitor
+
+    do_socket = medir("servidor_sensores (socket local)", lambda: asyncio.run(pelo_socket()), n_linhas)
+    print(f"  {do_socket.resumo()}")
+
+
+if __name__ == "__main__":
+    benchmark()
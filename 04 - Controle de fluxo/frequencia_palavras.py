@@ -0,0 +1,184 @@
+#%%
+# Frequência de palavras em textos grandes
+
+"""
+O exercício 6 (04 - Controle de fluxo.py) faz lower() + split() e conta num dicionário com if/else:
+a pontuação fica grudada na palavra ("python!" e "python" são contadas separadas) e tudo roda num
+único núcleo. Aqui:
+
+- tokenizar: normalização Unicode (NFKC), casefold e só as palavras (letras, com hífen ou
+  apóstrofo internos: "guarda-chuva", "d'água"); números e pontuação ficam de fora
+- contar_palavras / contar_em_blocos: primeiro um Counter dos pedaços do split() (contado em C),
+  depois a normalização só nos pedaços distintos, somando as contagens de "Python", "python!"
+  e "python" na mesma palavra. O vocabulário é muito menor que o texto, então a parte cara
+  (regex, casefold) roda poucas vezes
+- contar_arquivo: o arquivo é mapeado na memória (mmap) e dividido em blocos que terminam num
+  espaço em branco (nunca no meio de uma palavra nem de um caractere UTF-8); cada processo conta
+  os seus blocos (map) e os Counters parciais são somados (reduce)
+- mais_frequentes: top-k com heap (Counter.most_common(k)), sem ordenar o vocabulário inteiro
+"""
+
+import mmap
+import os
+import re
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+PALAVRA = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*")
+ESPACO = re.compile(rb"\s")  # em bytes: só espaço, \t, \n, \r, \v e \f
+TAMANHO_BLOCO = 16 * 1024 * 1024
+
+
+def tokenizar(texto: str, remover_acentos: bool = False) -> list[str]:
+    texto = unicodedata.normalize('NFKC', texto).casefold()
+    if remover_acentos:
+        texto = ''.join(c for c in unicodedata.normalize('NFD', texto) if not unicodedata.combining(c))
+    return PALAVRA.findall(texto)
+
+
+def _normalizar_contagem(brutos: Counter, remover_acentos: bool) -> Counter:
+    contagem = Counter()
+    for pedaco, quantidade in brutos.items():
+        for palavra in tokenizar(pedaco, remover_acentos):
+            contagem[palavra] += quantidade
+    return contagem
+
+
+def contar_palavras(texto: str, remover_acentos: bool = False) -> Counter:
+    return _normalizar_contagem(Counter(texto.split()), remover_acentos)
+
+
+def contar_em_blocos(textos: Iterable[str], remover_acentos: bool = False) -> Counter:
+    # Linhas de um arquivo, mensagens de uma fila...: um Counter só, atualizado bloco a bloco
+    brutos = Counter()
+    for texto in textos:
+        brutos.update(texto.split())
+    return _normalizar_contagem(brutos, remover_acentos)
+
+
+def mais_frequentes(contagem: Counter, k: int = 10) -> list[tuple[str, int]]:
+    return contagem.most_common(k)
+
+
+#------------------------------------------------------
+# Arquivos grandes: mmap + processos (map-reduce)
+#------------------------------------------------------
+
+def dividir_em_blocos(caminho: str, tamanho_bloco: int = TAMANHO_BLOCO) -> list[tuple[int, int]]:
+    # (inicio, fim) de cada bloco, com o fim avançado até o próximo espaço em branco
+    tamanho = os.path.getsize(caminho)
+    if not tamanho:
+        return []
+    blocos = []
+    with open(caminho, 'rb') as arquivo, mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        inicio = 0
+        while inicio < tamanho:
+            fim = min(inicio + tamanho_bloco, tamanho)
+            # A busca roda em C direto no mmap, sem copiar o arquivo nem andar byte a byte em Python
+            espaco = ESPACO.search(mapa, fim)
+            fim = espaco.start() if espaco else tamanho
+            blocos.append((inicio, fim))
+            inicio = fim
+    return blocos
+
+
+def _contar_bloco(caminho: str, inicio: int, fim: int, remover_acentos: bool) -> Counter:
+    with open(caminho, 'rb') as arquivo, mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        texto = mapa[inicio:fim].decode('utf-8', errors='replace')
+    return contar_palavras(texto, remover_acentos)
+
+
+def contar_arquivo(caminho: str, processos: int | None = None, tamanho_bloco: int = TAMANHO_BLOCO,
+                   remover_acentos: bool = False) -> Counter:
+    blocos = dividir_em_blocos(caminho, tamanho_bloco)
+    processos = processos or os.cpu_count() or 1
+    total = Counter()
+    if processos == 1 or len(blocos) == 1:
+        for inicio, fim in blocos:
+            total.update(_contar_bloco(caminho, inicio, fim, remover_acentos))
+        return total
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        parciais = executor.map(_contar_bloco, [caminho] * len(blocos), *zip(*blocos),
+                                [remover_acentos] * len(blocos))
+        for parcial in parciais:
+            total.update(parcial)  # reduce: soma dos Counters parciais
+    return total
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: MB/s do exercício 6 vs Counter vs mmap + processos
+#------------------------------------------------------
+
+def _contagem_exercicio(texto: str) -> dict:
+    # Cópia do exercício 6 (04 - Controle de fluxo.py)
+    texto = texto.lower()
+    palavras = texto.split()
+    contagem_palavras = {}
+    for palavra in palavras:
+        if palavra in contagem_palavras:
+            contagem_palavras[palavra] += 1
+        else:
+            contagem_palavras[palavra] = 1
+    return contagem_palavras
+
+
+def benchmark(tamanho_mb: int = 100) -> None:
+    import random
+    import tempfile
+    import time
+
+    texto_exemplo = "Esse é mais uma oportunidade de aprender python! python é uma ótima linguagem para se aprender"
+    print(f"exercício 6: python={_contagem_exercicio(texto_exemplo).get('python')}"
+          f" python!={_contagem_exercicio(texto_exemplo).get('python!')}"
+          f" | tokenizar: python={contar_palavras(texto_exemplo)['python']}")
+
+    aleatorio = random.Random(1)
+    vocabulario = [''.join(aleatorio.choices('abcdefghijklmnopqrstuvwxyzáéíóúãõç', k=aleatorio.randint(2, 10)))
+                   for _ in range(50_000)]
+    pesos = [1 / (i + 1) for i in range(len(vocabulario))]  # distribuição de Zipf, como em texto real
+    pontuacao = ['', '', '', '', ',', '.', '!', '?']
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'texto.txt')
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            escritos = 0
+            while escritos < tamanho_mb * 1024 * 1024:
+                palavras = aleatorio.choices(vocabulario, pesos, k=10_000)
+                linha = ' '.join(p.capitalize() + aleatorio.choice(pontuacao) if i % 7 == 0 else p
+                                 for i, p in enumerate(palavras)) + '\n'
+                escritos += arquivo.write(linha)
+        megabytes = os.path.getsize(caminho) / 1024 / 1024
+
+        def exercicio():
+            with open(caminho, encoding='utf-8') as arquivo:
+                return Counter(_contagem_exercicio(arquivo.read()))
+
+        def linhas():
+            with open(caminho, encoding='utf-8') as arquivo:
+                return contar_em_blocos(arquivo)
+
+        casos = [("exercício 6 (split + dict)", exercicio),
+                 ("contar_em_blocos, por linha", linhas),
+                 ("mmap, 1 processo", lambda: contar_arquivo(caminho, processos=1))]
+        if (os.cpu_count() or 1) > 1:
+            casos.append((f"mmap, {os.cpu_count()} processos", lambda: contar_arquivo(caminho)))
+
+        print(f"{megabytes:.0f} MB de texto, {os.cpu_count()} CPUs")
+        resultados = {}
+        for descricao, funcao in casos:
+            inicio = time.perf_counter()
+            resultados[descricao] = funcao()
+            duracao = time.perf_counter() - inicio
+            print(f"{descricao:32s} | {duracao:6.2f}s | {megabytes / duracao:6.1f} MB/s"
+                  f" | {len(resultados[descricao])} palavras distintas")
+
+        contagem = resultados["mmap, 1 processo"]
+        print(f"por linha == mmap: {resultados['contar_em_blocos, por linha'] == contagem}")
+        print(f"top 5: {mais_frequentes(contagem, 5)}")
+
+
+if __name__ == "__main__":
+    benchmark()
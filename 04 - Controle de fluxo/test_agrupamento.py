@@ -0,0 +1,66 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from agrupamento import AgrupadorStreaming, agrupar, agrupar_colunas, somar_por
+
+VENDAS = [
+    {"categoria": "eletronicos", "valor": 1200},
+    {"categoria": "livros", "valor": 80},
+    {"categoria": "eletronicos", "valor": 300},
+    {"categoria": "livros", "valor": None},
+]
+
+
+def test_agrupar_varias_agregacoes():
+    resultado = agrupar(VENDAS, "categoria", total=("valor", "sum"), media=("valor", "mean"),
+                        vendas=("valor", "count"), maior=("valor", "max"))
+    assert resultado["eletronicos"] == {"total": 1500, "media": 750, "vendas": 2, "maior": 1200}
+    assert resultado["livros"] == {"total": 80, "media": 80, "vendas": 1, "maior": 80}
+
+
+def test_mesclar_agrupadores_igual_a_uma_passada():
+    partes = [AgrupadorStreaming("categoria", total=("valor", "sum"), menor=("valor", "min"))
+              .adicionar_varios(VENDAS[i::2]) for i in range(2)]
+    assert partes[0].mesclar(partes[1]).resultado() == agrupar(VENDAS, "categoria", total=("valor", "sum"),
+                                                               menor=("valor", "min"))
+
+
+def test_somar_por_e_agregacao_invalida():
+    assert somar_por(VENDAS[:3], "categoria", "valor") == {"eletronicos": 1500, "livros": 80}
+    with pytest.raises(ValueError):
+        agrupar(VENDAS, "categoria", total=("valor", "mediana"))
+
+
+@pytest.mark.parametrize("dtype, menor, maior", [
+    (np.int16, -30_000, 30_000),  # a faixa não cabe no int16: a subtração estourava
+    (np.int64, -5, 50),
+    (np.uint8, 0, 255),
+    (np.int64, -10**12, 10**12),  # faixa longa: np.unique
+])
+def test_agrupar_colunas_igual_ao_streaming(dtype, menor, maior):
+    aleatorio = random.Random(1)
+    chaves = np.array([aleatorio.randint(menor, maior) for _ in range(40_000)], dtype=dtype)
+    valores = np.array([aleatorio.random() for _ in range(40_000)])
+    colunas = agrupar_colunas(chaves, {"v": valores}, total=("v", "sum"), maior=("v", "max"))
+    streaming = agrupar(zip(chaves.tolist(), valores.tolist()), 0, total=(1, "sum"), maior=(1, "max"))
+    assert colunas.keys() == streaming.keys()
+    for chave, esperado in streaming.items():
+        assert math.isclose(colunas[chave]["total"], esperado["total"])
+        assert colunas[chave]["maior"] == esperado["maior"]
+
+
+def test_agrupar_colunas_uint64_acima_do_int64():
+    # Faixa curta, mas acima do int64: não pode passar pelo caminho rápido
+    chaves = np.array([2**64 - 3, 2**64 - 1, 2**64 - 3], dtype=np.uint64)
+    resultado = agrupar_colunas(chaves, {"v": np.array([1.0, 2.0, np.nan])}, n=("v", "count"), total=("v", "sum"))
+    assert resultado == {2**64 - 3: {"n": 1, "total": 1.0}, 2**64 - 1: {"n": 1, "total": 2.0}}
+
+
+def test_agrupar_colunas_chave_composta_sem_dict():
+    rotulos, saida = agrupar_colunas((np.array([1, 1, 2]), np.array([7, 8, 7])), {"v": np.array([1.0, 2.0, 3.0])},
+                                     como_dict=False, total=("v", "sum"))
+    assert rotulos == [(1, 7), (1, 8), (2, 7)]
+    assert saida["total"].tolist() == [1.0, 2.0, 3.0]
@@ -0,0 +1,108 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from classificacao_sensores import (CLASSIFICADOR_PADRAO, Classificador, JanelaPorSensor, MonitorSensores,
+                                    SEM_LEITURA, classificar, ingerir, interpretar_linhas, seguir_arquivo,
+                                    servidor_sensores)
+
+# Campos a menos numa linha e a mais na outra: o total continua múltiplo de 3
+LINHAS_QUE_SE_COMPENSAM = b"1,100.0,20\n2,101.0\n3,102.0,21,7\n"
+LINHAS_COM_ERROS = b"s1,1.0,20\n\ns2,2.0,abc\ns3,3.0,\ns4,x,30\ns5,5,10,1\ns6,6,30\n" + LINHAS_QUE_SE_COMPENSAM
+
+
+def _como_exercicio(temp: float) -> str:
+    if temp < 18:
+        return "Baixa"
+    elif temp >= 18 and temp <= 26:
+        return "Normal"
+    return "Alta"
+
+
+def test_limites_iguais_ao_exercicio():
+    leituras = [-5, 17.99, 18, 22, 26, 26.0001, 40]
+    codigos = classificar(leituras)
+    assert CLASSIFICADOR_PADRAO.rotular(codigos).tolist() == [_como_exercicio(t) for t in leituras]
+    assert [CLASSIFICADOR_PADRAO.classificar_valor(t) for t in leituras] == [_como_exercicio(t) for t in leituras]
+    assert classificar([np.nan])[0] == SEM_LEITURA
+    assert CLASSIFICADOR_PADRAO.classificar_valor(None) == "Sem leitura"
+
+
+def test_pd_cut_e_categoria_equivalentes():
+    leituras = np.random.default_rng(0).normal(22, 5, 1000).round(0)
+    cortes = pd.cut(leituras, CLASSIFICADOR_PADRAO.como_intervalos_pandas(), right=False,
+                    labels=list(CLASSIFICADOR_PADRAO.rotulos))
+    assert np.array_equal(cortes.codes, CLASSIFICADOR_PADRAO.como_categoria(classificar(leituras)).codes)
+
+
+def test_classificador_configuravel_e_validado():
+    classificador = Classificador((10, 20), ("a", "b", "c"), [False, True])
+    assert classificador.rotular(classificador.classificar([10, 20])).tolist() == ["a", "c"]
+    with pytest.raises(ValueError):
+        Classificador((10, 20), ("a", "b", "c"), [True])
+    with pytest.raises(ValueError):
+        Classificador((10, 20), ("a", "b"))
+    with pytest.raises(ValueError):
+        Classificador((20, 10), ("a", "b", "c"))
+
+
+def test_janela_descarta_fatias_antigas():
+    janela = JanelaPorSensor(n_classes=3, janela=10, resolucao=1)
+    janela.adicionar(["a", "a", "b"], [0, 5, 5], np.array([0, 1, 2]))
+    assert janela.contagem("a").tolist() == [1, 1, 0]
+    janela.adicionar(["a"], [12], np.array([2]))
+    assert janela.contagem("a").tolist() == [0, 1, 1]  # a leitura do momento 0 saiu da janela
+    janela.adicionar(["a", "c"], [1, 12], np.array([0, SEM_LEITURA]))
+    assert janela.descartadas == 2
+    ids, contagens = janela.contagens_por_sensor()
+    assert ids == ["a", "b"] and contagens.tolist() == [[0, 1, 1], [0, 0, 1]]
+
+
+def test_interpretar_linhas():
+    sensores, momentos, temperaturas = interpretar_linhas(b"s1,1.5,20\ns2,2,\n")
+    assert sensores.tolist() == ["s1", "s2"] and momentos.tolist() == [1.5, 2.0]
+    assert temperaturas[0] == 20 and np.isnan(temperaturas[1])
+    for dados in (LINHAS_COM_ERROS, LINHAS_QUE_SE_COMPENSAM):
+        with pytest.raises(ValueError):
+            interpretar_linhas(dados)
+
+
+def test_monitor_descarta_linhas_malformadas():
+    monitor = MonitorSensores()
+    monitor.adicionar_linhas(LINHAS_COM_ERROS)
+    resumo = monitor.resumo()
+    assert resumo["linhas_malformadas"] == 5
+    assert resumo["totais"] == {"Baixa": 0, "Normal": 2, "Alta": 1}
+    monitor.adicionar_linhas(b"s7,7,10\n")
+    assert monitor.resumo()["totais"]["Baixa"] == 1
+
+
+def test_seguir_arquivo_continua_depois_de_linha_ruim(tmp_path):
+    caminho = tmp_path / "leituras.csv"
+    caminho.write_bytes(LINHAS_COM_ERROS + b"s7,7,10\nparcial,8")
+    monitor = asyncio.run(ingerir(seguir_arquivo(str(caminho), intervalo=0.01, parar_quando_ocioso=0.05),
+                                  MonitorSensores()))
+    assert monitor.resumo()["totais"] == {"Baixa": 1, "Normal": 2, "Alta": 1}
+
+
+def test_servidor_continua_depois_de_linha_ruim():
+    async def enviar() -> MonitorSensores:
+        monitor = MonitorSensores()
+        servidor = await servidor_sensores(monitor, porta=0)
+        porta = servidor.sockets[0].getsockname()[1]
+        leitor, escritor = await asyncio.open_connection('127.0.0.1', porta)
+        escritor.write(LINHAS_COM_ERROS)
+        await escritor.drain()
+        await asyncio.sleep(0.05)  # o primeiro lote chega sozinho ao servidor
+        escritor.write(b"s7,7,10\ns8,8,19")
+        escritor.write_eof()
+        await leitor.read()
+        escritor.close()
+        servidor.close()
+        await servidor.wait_closed()
+        return monitor
+
+    monitor = asyncio.run(enviar())
+    assert monitor.resumo()["totais"] == {"Baixa": 1, "Normal": 3, "Alta": 1}
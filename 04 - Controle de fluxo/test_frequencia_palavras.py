@@ -0,0 +1,45 @@
+from collections import Counter
+
+from frequencia_palavras import (contar_arquivo, contar_em_blocos, contar_palavras, dividir_em_blocos,
+                                 mais_frequentes, tokenizar)
+
+TEXTO = "Python é ótimo! python, PYTHON e d'água; guarda-chuva 2024 Ótimo ﬁm"
+
+
+def test_tokenizar_normaliza_e_descarta_pontuacao():
+    assert tokenizar(TEXTO) == ["python", "é", "ótimo", "python", "python", "e", "d'água", "guarda-chuva",
+                                "ótimo", "fim"]
+    assert tokenizar("Ótimo é", remover_acentos=True) == ["otimo", "e"]
+
+
+def test_contagem_soma_as_variantes_da_mesma_palavra():
+    contagem = contar_palavras(TEXTO)
+    assert contagem == Counter(tokenizar(TEXTO))
+    assert mais_frequentes(contagem, 2) == [("python", 3), ("ótimo", 2)]
+    assert contar_em_blocos(TEXTO.split(";")) == contagem
+
+
+def test_blocos_nao_cortam_palavras_nem_caracteres(tmp_path):
+    caminho = tmp_path / "texto.txt"
+    texto = " ".join(["ação", "coração", "python!"] * 500)
+    caminho.write_text(texto, encoding="utf-8")
+
+    blocos = dividir_em_blocos(str(caminho), tamanho_bloco=100)
+    assert blocos[0][0] == 0 and blocos[-1][1] == caminho.stat().st_size
+    assert all(fim == inicio for (_, fim), (inicio, _) in zip(blocos, blocos[1:]))
+
+    esperado = contar_palavras(texto)
+    assert contar_arquivo(str(caminho), processos=1, tamanho_bloco=100) == esperado
+    assert contar_arquivo(str(caminho), processos=2, tamanho_bloco=1000) == esperado
+
+
+def test_arquivo_vazio(tmp_path):
+    caminho = tmp_path / "vazio.txt"
+    caminho.write_bytes(b"")
+    assert dividir_em_blocos(str(caminho)) == [] and contar_arquivo(str(caminho)) == Counter()
+
+
+def test_bloco_sem_espaco_vai_ate_o_fim_do_arquivo(tmp_path):
+    caminho = tmp_path / "palavra.txt"
+    caminho.write_bytes(b"a\tb" + b"x" * 300)
+    assert dividir_em_blocos(str(caminho), tamanho_bloco=1) == [(0, 1), (1, 303)]
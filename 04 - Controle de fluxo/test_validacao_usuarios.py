@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import validacao_usuarios
+from validacao_usuarios import (ErroUsuario, descrever, separar_validos, validar_emails, validar_idades,
+                                validar_registros, validar_usuario, validar_usuarios)
+
+IDADES = [30, None, 17, 70, 25.5, "abc", "40", float("nan")]
+ESPERADO_IDADES = [0, ErroUsuario.IDADE_AUSENTE, ErroUsuario.IDADE_FORA_DA_FAIXA, ErroUsuario.IDADE_FORA_DA_FAIXA,
+                   ErroUsuario.IDADE_INVALIDA, ErroUsuario.IDADE_INVALIDA, 0, ErroUsuario.IDADE_AUSENTE]
+EMAILS = ["ana@exemplo.com", "", None, "a@b", "@.", "ana..silva@exemplo.com", "x" * 250 + "@a.com", 42]
+ESPERADO_EMAILS = [0, ErroUsuario.EMAIL_AUSENTE, ErroUsuario.EMAIL_AUSENTE] + [ErroUsuario.EMAIL_INVALIDO] * 5
+
+
+def test_validar_idades():
+    assert validar_idades(IDADES).tolist() == ESPERADO_IDADES
+    assert validar_idades(np.array([18, 65, 66])).tolist() == [0, 0, ErroUsuario.IDADE_FORA_DA_FAIXA]
+
+
+def test_colunas_aceitam_geradores():
+    assert validar_idades(idade for idade in IDADES).tolist() == ESPERADO_IDADES
+    assert validar_emails(email for email in EMAILS).tolist() == ESPERADO_EMAILS
+
+
+@pytest.mark.parametrize("com_arrow", [True, False])
+def test_validar_emails(monkeypatch, com_arrow):
+    if not com_arrow:
+        monkeypatch.setattr(validacao_usuarios, "pa", None)
+    assert validar_emails(EMAILS).tolist() == ESPERADO_EMAILS
+    assert validar_emails(EMAILS[:2]).tolist() == ESPERADO_EMAILS[:2]  # só texto: caminho do pyarrow
+
+
+def test_usuario_igual_ao_lote():
+    codigos = validar_usuarios(IDADES, EMAILS)
+    assert [validar_usuario(idade, email) for idade, email in zip(IDADES, EMAILS)] == codigos.tolist()
+    assert descrever(codigos[1]) == ["Idade não informada", "E-mail não informado"]
+    with pytest.raises(ValueError):
+        validar_usuarios(IDADES, EMAILS[:-1])
+
+
+def test_registros_e_dataframe():
+    registros = [{"idade": idade, "email": email} for idade, email in zip(IDADES, EMAILS)]
+    assert validar_registros(iter(registros)).tolist() == validar_usuarios(IDADES, EMAILS).tolist()
+    quadro = pd.DataFrame({"idade": [30, 10], "email": ["ana@exemplo.com", "ruim"]})
+    validos, rejeitados = separar_validos(quadro)
+    assert validos.index.tolist() == [0]
+    assert rejeitados["erros"].tolist() == [ErroUsuario.IDADE_FORA_DA_FAIXA | ErroUsuario.EMAIL_INVALIDO]
@@ -0,0 +1,261 @@
+#%%
+# Validação de dados de usuários em lote (idade e e-mail)
+
+"""
+O exercício 4 (04 - Controle de fluxo.py) valida um usuário por vez, e "@" in email aceita
+"a@b" e "@.". Aqui a validação roda por colunas e devolve, para cada linha, um código de erro
+(ErroUsuario, com um bit por problema; 0 = válido), para o pipeline de recomendação descartar as
+linhas ruins de uma vez:
+
+    codigos = validar_usuarios(idades, emails)      # array uint8, um código por usuário
+    validos, rejeitados = separar_validos(quadro)   # DataFrame com a coluna "erros"
+
+- idades: convertidas para um array float (None vira NaN) e checadas com operações vetorizadas
+  do NumPy: ausente, não inteira/não numérica, fora de [IDADE_MINIMA, IDADE_MAXIMA]
+- e-mails: um regex compilado (EMAIL); com pyarrow instalado, o regex roda na coluna inteira em
+  C++ (pyarrow.compute), sem laço em Python. Sem pyarrow, o mesmo regex é aplicado item a item
+"""
+
+import enum
+import math
+import re
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # sem pyarrow, os e-mails são validados item a item com o re
+    pa = pc = None
+
+IDADE_MINIMA = 18
+IDADE_MAXIMA = 65
+TAMANHO_MAXIMO_EMAIL = 254
+
+# Parte local com os caracteres permitidos (sem ponto no começo, no fim ou repetido) + domínio com
+# rótulos de até 63 caracteres e terminação só com letras. Compatível com o re e com o RE2 (pyarrow).
+_LOCAL = r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+_ROTULO = r"[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?"
+EMAIL = re.compile(rf"{_LOCAL}@(?:{_ROTULO}\.)+[A-Za-z]{{2,63}}")
+
+
+class ErroUsuario(enum.IntFlag):
+    NENHUM = 0
+    IDADE_AUSENTE = 1
+    IDADE_INVALIDA = 2  # não numérica ou com casas decimais
+    IDADE_FORA_DA_FAIXA = 4
+    EMAIL_AUSENTE = 8
+    EMAIL_INVALIDO = 16
+
+
+# Os mesmos códigos como int: operações com IntFlag criam um objeto novo a cada "|", caro no laço
+_IDADE_AUSENTE, _IDADE_INVALIDA, _IDADE_FORA_DA_FAIXA, _EMAIL_AUSENTE, _EMAIL_INVALIDO = (
+    erro.value for erro in (ErroUsuario.IDADE_AUSENTE, ErroUsuario.IDADE_INVALIDA, ErroUsuario.IDADE_FORA_DA_FAIXA,
+                            ErroUsuario.EMAIL_AUSENTE, ErroUsuario.EMAIL_INVALIDO))
+
+MENSAGENS = {
+    ErroUsuario.IDADE_AUSENTE: "Idade não informada",
+    ErroUsuario.IDADE_INVALIDA: "Idade inválida",
+    ErroUsuario.IDADE_FORA_DA_FAIXA: "Idade fora do intervalo permitido",
+    ErroUsuario.EMAIL_AUSENTE: "E-mail não informado",
+    ErroUsuario.EMAIL_INVALIDO: "forneça um e-mail válido",
+}
+
+
+def descrever(codigo: int) -> list[str]:
+    # Mensagens de cada bit ligado no código
+    return [mensagem for erro, mensagem in MENSAGENS.items() if codigo & erro]
+
+
+#------------------------------------------------------
+# Idades
+#------------------------------------------------------
+
+def _materializar(coluna: Iterable):
+    # Geradores e outros iteráveis sem len viram lista: as colunas são percorridas mais de uma vez
+    return coluna if hasattr(coluna, '__len__') else list(coluna)
+
+
+def _idades_para_float(idades: Iterable) -> tuple[np.ndarray, np.ndarray]:
+    # (idades em float, máscara das não numéricas); None e NaN viram NaN
+    idades = _materializar(idades)
+    try:
+        return np.asarray(idades, dtype=np.float64).ravel(), None
+    except (TypeError, ValueError):
+        pass
+    # Algum item não converte ("abc", "30 anos"): item a item só neste caso
+    valores = np.empty(len(idades), dtype=np.float64)
+    nao_numericas = np.zeros(len(idades), dtype=bool)
+    for indice, idade in enumerate(idades):
+        try:
+            valores[indice] = math.nan if idade is None else float(idade)
+        except (TypeError, ValueError):
+            valores[indice] = math.nan
+            nao_numericas[indice] = True
+    return valores, nao_numericas
+
+
+def validar_idades(idades: Iterable, idade_minima: int = IDADE_MINIMA,
+                   idade_maxima: int = IDADE_MAXIMA) -> np.ndarray:
+    valores, nao_numericas = _idades_para_float(idades)
+    codigos = np.zeros(valores.size, dtype=np.uint8)
+    ausentes = np.isnan(valores)
+    if nao_numericas is not None:
+        ausentes &= ~nao_numericas
+        codigos[nao_numericas] |= _IDADE_INVALIDA
+    presentes = ~np.isnan(valores)
+    codigos[ausentes] |= _IDADE_AUSENTE
+    with np.errstate(invalid='ignore'):
+        codigos[presentes & (valores != np.floor(valores))] |= _IDADE_INVALIDA
+        # Fora da faixa: menor que o mínimo OU maior que o máximo (o exercício usava "and")
+        fora_da_faixa = (valores < idade_minima) | (valores > idade_maxima)
+        codigos[presentes & fora_da_faixa] |= _IDADE_FORA_DA_FAIXA
+    return codigos
+
+
+def _erro_idade(idade: Any, idade_minima: int = IDADE_MINIMA, idade_maxima: int = IDADE_MAXIMA) -> int:
+    # As mesmas regras de validar_idades, para um valor só
+    try:
+        valor = math.nan if idade is None else float(idade)
+    except (TypeError, ValueError):
+        return _IDADE_INVALIDA
+    if valor != valor:
+        return _IDADE_AUSENTE
+    erro = 0
+    if math.isfinite(valor) and valor != math.floor(valor):
+        erro = _IDADE_INVALIDA
+    if valor < idade_minima or valor > idade_maxima:
+        erro |= _IDADE_FORA_DA_FAIXA
+    return erro
+
+
+#------------------------------------------------------
+# E-mails
+#------------------------------------------------------
+
+def _erro_email(email: Any) -> int:
+    if email is None or email == "" or (isinstance(email, float) and math.isnan(email)):
+        return _EMAIL_AUSENTE
+    if not isinstance(email, str) or len(email) > TAMANHO_MAXIMO_EMAIL or EMAIL.fullmatch(email) is None:
+        return _EMAIL_INVALIDO
+    return 0
+
+
+def _validar_emails_python(emails: Iterable) -> np.ndarray:
+    return np.fromiter(map(_erro_email, emails), dtype=np.uint8)
+
+
+def _validar_emails_arrow(emails) -> np.ndarray:
+    coluna = emails if isinstance(emails, (pa.Array, pa.ChunkedArray)) else pa.array(emails, type=pa.string(),
+                                                                                      from_pandas=True)
+    tamanho = pc.utf8_length(coluna)
+    ausentes = pc.fill_null(pc.equal(tamanho, 0), True)
+    validos = pc.and_(pc.match_substring_regex(coluna, f"^(?:{EMAIL.pattern})$"),
+                      pc.less_equal(tamanho, TAMANHO_MAXIMO_EMAIL))
+    invalidos = pc.and_not(pc.invert(pc.fill_null(validos, False)), ausentes)
+    codigos = np.zeros(len(coluna), dtype=np.uint8)
+    codigos[ausentes.to_numpy(zero_copy_only=False)] = _EMAIL_AUSENTE
+    codigos[invalidos.to_numpy(zero_copy_only=False)] = _EMAIL_INVALIDO
+    return codigos
+
+
+def validar_emails(emails: Iterable) -> np.ndarray:
+    emails = _materializar(emails)
+    if pa is not None:
+        try:
+            return _validar_emails_arrow(emails)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+            pass  # coluna com itens que não são texto: cada item recebe o seu código no caminho em Python
+    return _validar_emails_python(emails)
+
+
+#------------------------------------------------------
+# Usuários
+#------------------------------------------------------
+
+def validar_usuarios(idades: Sequence, emails: Sequence, idade_minima: int = IDADE_MINIMA,
+                     idade_maxima: int = IDADE_MAXIMA) -> np.ndarray:
+    # Código de erro por linha (0 = válido); idades e emails são colunas do mesmo tamanho
+    if len(idades) != len(emails):
+        raise ValueError(f"Colunas de tamanhos diferentes: {len(idades)} idades e {len(emails)} e-mails")
+    return validar_idades(idades, idade_minima, idade_maxima) | validar_emails(emails)
+
+
+def validar_usuario(idade: Any, email: Any) -> ErroUsuario:
+    # Um usuário só, como no exercício 4 (as mesmas regras, sem montar arrays)
+    return ErroUsuario(_erro_idade(idade) | _erro_email(email))
+
+
+def validar_registros(usuarios: Iterable[dict], campo_idade: str = "idade", campo_email: str = "email") -> np.ndarray:
+    # Lista de dicionários (como em 04 - Controle de fluxo.py): separa as colunas e valida em lote
+    usuarios = usuarios if isinstance(usuarios, list) else list(usuarios)
+    return validar_usuarios([usuario.get(campo_idade) for usuario in usuarios],
+                            [usuario.get(campo_email) for usuario in usuarios])
+
+
+def separar_validos(quadro, coluna_idade: str = "idade", coluna_email: str = "email"):
+    # DataFrame do pandas -> (válidos, rejeitados com a coluna "erros")
+    codigos = validar_usuarios(quadro[coluna_idade].to_numpy(), quadro[coluna_email])
+    validos = codigos == 0
+    return quadro[validos], quadro[~validos].assign(erros=codigos[~validos])
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: exercício 4 vs regex item a item vs colunas
+#------------------------------------------------------
+
+def _validar_como_exercicio(idade: int, email: str) -> str:
+    # Cópia do exercício 4 (04 - Controle de fluxo.py), com a condição original
+    if idade < 18 and idade > 65:
+        return "Idade fora do intervalo permitido"
+    elif "@" not in email or "." not in email:
+        return "forneça um e-mail válido"
+    else:
+        return "Dados de usuário válidos"
+
+
+def benchmark(n_usuarios: int = 2_000_000) -> None:
+    import random
+    import time
+
+    aleatorio = random.Random(4)
+    dominios = ["gmail.com", "exemplo.com.br", "empresa.io", "uol.com.br"]
+    ruins = ["sem-arroba.com", "a@b", "@.", "nome@dominio.", "x@@y.com", "nome @dominio.com", "", None]
+    idades = [aleatorio.choice([aleatorio.randint(10, 90), None]) if aleatorio.random() < 0.05
+              else aleatorio.randint(18, 65) for _ in range(n_usuarios)]
+    emails = [aleatorio.choice(ruins) if aleatorio.random() < 0.05
+              else f"usuario.{aleatorio.randint(0, 10**7)}@{aleatorio.choice(dominios)}" for _ in range(n_usuarios)]
+
+    def medir(descricao: str, funcao):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        duracao = time.perf_counter() - inicio
+        print(f"{descricao:40s} | {duracao:6.3f}s | {n_usuarios / duracao / 1e6:6.2f} M usuários/s")
+        return resultado
+
+    print(f"{n_usuarios} usuários (~5% de idades e ~5% de e-mails ruins)")
+    exercicio = medir("exercício 4 (um por vez)",
+                      lambda: [_validar_como_exercicio(idade or 0, email or "") for idade, email in zip(idades, emails)])
+    item_a_item = medir("validar_usuario (um por vez)",
+                        lambda: [validar_usuario(idade, email) for idade, email in zip(idades, emails)])
+    em_lote = medir("validar_usuarios (listas)", lambda: validar_usuarios(idades, emails))
+    colunas = (np.array([math.nan if idade is None else idade for idade in idades]),
+               pa.array(emails, type=pa.string()) if pa is not None else emails)
+    colunar = medir("validar_usuarios (colunas prontas)", lambda: validar_usuarios(*colunas))
+
+    print(f"mesmo resultado: {np.array_equal(np.array(item_a_item, dtype=np.uint8), em_lote)}"
+          f" {np.array_equal(em_lote, colunar)}")
+    fora_da_faixa = sum(1 for idade in idades if idade is not None and not IDADE_MINIMA <= idade <= IDADE_MAXIMA)
+    aceitos = sum(1 for idade, resposta in zip(idades, exercicio)
+                  if idade is not None and not IDADE_MINIMA <= idade <= IDADE_MAXIMA
+                  and resposta != "Idade fora do intervalo permitido")
+    print(f"idades fora da faixa: {fora_da_faixa}; o exercício (idade < 18 and idade > 65) deixou passar {aceitos}")
+    erros, quantidades = np.unique(em_lote, return_counts=True)
+    for codigo, quantidade in zip(erros.tolist(), quantidades.tolist()):
+        print(f"  {codigo:3d} {quantidade:8d}  {', '.join(descrever(codigo)) or 'válido'}")
+
+
+if __name__ == "__main__":
+    benchmark()
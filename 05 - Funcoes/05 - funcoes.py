@@ -61,6 +61,10 @@ print(calcular_media(lista))
 def contar_valores_unicos(lista: List[int]) -> int:
     return len(set(lista)) # a função set já retorna valores unicos
 
+# Para fluxos grandes demais para um set: contagem aproximada com memória fixa (sketches.py)
+from sketches import ContadorDistintos
+print(len(ContadorDistintos(erro=0.02).adicionar_varios([1, 2, 2, 3, 3, 3])))
+
 #%%
 
 # Calcular Desvio Padrão de uma Lista
@@ -76,6 +80,10 @@ def calcular_desvio_padrao(valores: List[float]) -> float:
 dados = [10, 12, 23, 23, 16, 23, 21, 16]
 print(calcular_desvio_padrao(dados))
 
+# Em uma passada só, aceitando iteradores e blocos: estatisticas.py
+from estatisticas import estatisticas
+print(estatisticas(dados).resumo())
+
 #%%
 
 # Encontrar Valores Ausentes em uma Sequência
@@ -88,4 +96,8 @@ def encontrar_valores_ausentes(sequencia: List[int]) -> List[int]:
 numero = [1,3,6,12]
 print(encontrar_valores_ausentes(numero))
 
+# Intervalos faltantes em uma passada, sem montar o range inteiro (lacunas.py)
+from lacunas import encontrar_lacunas
+print(list(encontrar_lacunas(numero)))
+
 
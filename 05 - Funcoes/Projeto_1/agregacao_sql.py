@@ -0,0 +1,181 @@
+#Agregações feitas pelo banco (SQLite) em vez de loops em Python
+
+"""
+O etl.py soma os preços num for, o exercício de 04 - Controle de fluxo soma vendas por categoria
+com um dicionário e a ETL de 07 - criando uma etl multiplica Venda * Quantidade no pandas.
+Aqui os registros de venda (CSV deste projeto ou JSON da ETL) são carregados uma vez numa tabela
+SQLite e os totais saem de consultas SQL, como no consulta.sql de 09 - SQL:
+
+    SELECT categoria, SUM(preco * quantidade) FROM vendas GROUP BY categoria
+
+Depois da carga, cada nova pergunta (outro filtro, outra categoria) é só mais uma consulta,
+sem percorrer a lista de dicionários de novo.
+"""
+
+import csv
+import glob
+import json
+import os
+import sqlite3
+from typing import Iterable, Iterator
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS vendas (
+    produto    TEXT,
+    categoria  TEXT,
+    quantidade INTEGER NOT NULL DEFAULT 1,
+    preco      NUMERIC NOT NULL,
+    entregue   INTEGER,          -- 1/0; NULL quando a origem não informa (JSON da ETL)
+    data       TEXT
+);
+-- índices de cobertura: as somas por categoria/entrega leem só o índice, sem visitar a tabela
+CREATE INDEX IF NOT EXISTS ix_vendas_categoria ON vendas (categoria, preco, quantidade);
+CREATE INDEX IF NOT EXISTS ix_vendas_entregue ON vendas (entregue, preco, quantidade);
+"""
+
+INSERIR = "INSERT INTO vendas (produto, categoria, quantidade, preco, entregue, data) VALUES (?, ?, ?, ?, ?, ?)"
+
+
+def abrir_banco(caminho: str = ':memory:') -> sqlite3.Connection:
+    #abre (ou cria) o banco de staging com a tabela vendas.
+    conexao = sqlite3.connect(caminho)
+    conexao.execute("PRAGMA journal_mode=WAL" if caminho != ':memory:' else "PRAGMA journal_mode=MEMORY")
+    conexao.execute("PRAGMA synchronous=OFF")  # staging: dá para recarregar dos arquivos se algo falhar
+    conexao.executescript(ESQUEMA)
+    return conexao
+
+
+def _para_bool(valor: str) -> int | None:
+    # mesma regra do etl.py (entregue == 'True'): 'true' ou '1' não contam como entregue
+    if valor == 'True':
+        return 1
+    if valor == 'False':
+        return 0
+    return None
+
+
+def _linhas_csv(nome_arquivo_csv: str) -> Iterator[tuple]:
+    # mesmo formato do vendas.csv: produto,preco,categoria,entregue
+    with open(nome_arquivo_csv, mode='r', encoding='utf-8', newline='') as arquivo:
+        for linha in csv.DictReader(arquivo):
+            yield (linha["produto"], linha["categoria"], 1, int(linha["preco"]), _para_bool(linha["entregue"]), None)
+
+
+def _linhas_json(arquivos: Iterable[str]) -> Iterator[tuple]:
+    # mesmo formato dos arquivos da ETL: Produto, Categoria, Quantidade, Venda, Data
+    for nome_arquivo in arquivos:
+        with open(nome_arquivo, mode='r', encoding='utf-8') as arquivo:
+            for venda in json.load(arquivo):
+                yield (venda["Produto"], venda["Categoria"], venda["Quantidade"], venda["Venda"], None, venda.get("Data"))
+
+
+def carregar_csv(conexao: sqlite3.Connection, nome_arquivo_csv: str) -> int:
+    #carrega o CSV na tabela vendas, linha a linha, sem montar a lista inteira na memória.
+    with conexao:
+        return conexao.executemany(INSERIR, _linhas_csv(nome_arquivo_csv)).rowcount
+
+
+def carregar_json(conexao: sqlite3.Connection, pasta: str) -> int:
+    #carrega todos os arquivos .json da pasta (mesma entrada do extrair_dados da ETL).
+    arquivos = sorted(glob.glob(os.path.join(pasta, '*.json')))
+    with conexao:
+        return conexao.executemany(INSERIR, _linhas_json(arquivos)).rowcount
+
+
+def _filtros(entregue: bool | None, categoria: str | None) -> tuple[str, list]:
+    condicoes, parametros = [], []
+    if entregue is not None:
+        condicoes.append("entregue = ?")
+        parametros.append(int(entregue))
+    if categoria is not None:
+        condicoes.append("categoria = ?")
+        parametros.append(categoria)
+    return (" WHERE " + " AND ".join(condicoes)) if condicoes else "", parametros
+
+
+def total_vendas(conexao: sqlite3.Connection, entregue: bool | None = None, categoria: str | None = None) -> float:
+    #equivalente a soma_valores_dos_produtos(filtrar_produtos_N_entregues(...)) com total_vendas(conexao, entregue=True).
+    where, parametros = _filtros(entregue, categoria)
+    return conexao.execute(f"SELECT COALESCE(SUM(preco * quantidade), 0) FROM vendas{where}", parametros).fetchone()[0]
+
+
+def total_por_categoria(conexao: sqlite3.Connection, entregue: bool | None = None) -> dict[str, float]:
+    #mesmo resultado do total_categoria de 04 - Controle de fluxo.
+    where, parametros = _filtros(entregue, None)
+    consulta = f"SELECT categoria, SUM(preco * quantidade) FROM vendas{where} GROUP BY categoria ORDER BY categoria"
+    return dict(conexao.execute(consulta, parametros).fetchall())
+
+
+def resumo_por_categoria(conexao: sqlite3.Connection, entregue: bool | None = None) -> list[dict]:
+    #vendas, itens, total, ticket médio, menor e maior preço por categoria, numa única consulta.
+    where, parametros = _filtros(entregue, None)
+    consulta = f"""
+        SELECT categoria, COUNT(*), SUM(quantidade), SUM(preco * quantidade), AVG(preco * quantidade), MIN(preco), MAX(preco)
+        FROM vendas{where}
+        GROUP BY categoria
+        ORDER BY SUM(preco * quantidade) DESC
+    """
+    campos = ("categoria", "vendas", "itens", "total", "ticket_medio", "menor_preco", "maior_preco")
+    return [dict(zip(campos, linha)) for linha in conexao.execute(consulta, parametros)]
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: loops em Python vs agregação no SQLite
+#------------------------------------------------------
+
+def benchmark(n_vendas: int = 300_000, consultas: int = 10) -> None:
+    """
+    Python: ler_csv + filtrar + somar (etl.py) e o dicionário por categoria, refeitos a cada pergunta.
+    SQL: uma carga (medida à parte) e depois as mesmas perguntas como consultas.
+    """
+    import random
+    import tempfile
+    import time
+
+    from etl import filtrar_produtos_N_entregues, ler_csv, soma_valores_dos_produtos
+
+    categorias = ["escritorio", "acessorios", "eletronicos", "livros", "moveis"]
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivo_csv = os.path.join(pasta, 'vendas.csv')
+        aleatorio = random.Random(42)
+        with open(arquivo_csv, 'w', encoding='utf-8', newline='') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(["produto", "preco", "categoria", "entregue"])
+            for i in range(n_vendas):
+                escritor.writerow([f"produto{i}", aleatorio.randint(1, 1000), aleatorio.choice(categorias),
+                                   aleatorio.random() < 0.7])
+
+        def em_python() -> tuple:
+            lista = ler_csv(arquivo_csv)
+            total = soma_valores_dos_produtos(filtrar_produtos_N_entregues(lista))
+            total_categoria = {}
+            for venda in lista:
+                categoria = venda["categoria"]
+                total_categoria[categoria] = total_categoria.get(categoria, 0) + int(venda["preco"])
+            return total, total_categoria
+
+        inicio = time.perf_counter()
+        for _ in range(consultas):
+            resultado_python = em_python()
+        tempo_python = time.perf_counter() - inicio
+
+        conexao = abrir_banco(os.path.join(pasta, 'vendas.db'))
+        inicio = time.perf_counter()
+        carregar_csv(conexao, arquivo_csv)
+        tempo_carga = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        for _ in range(consultas):
+            resultado_sql = (total_vendas(conexao, entregue=True), total_por_categoria(conexao))
+        tempo_sql = time.perf_counter() - inicio
+        conexao.close()
+
+    iguais = resultado_python[0] == resultado_sql[0] and resultado_python[1] == resultado_sql[1]
+    print(f"{n_vendas} vendas, {consultas} rodadas de (total entregue + total por categoria)")
+    print(f"Python (ler_csv + loops): {tempo_python:6.2f}s | {tempo_python / consultas * 1000:8.1f} ms por rodada")
+    print(f"SQLite: carga {tempo_carga:6.2f}s + consultas {tempo_sql:6.2f}s | {tempo_sql / consultas * 1000:8.1f} ms por rodada")
+    print(f"resultados iguais: {iguais}")
+
+
+if __name__ == "__main__":
+    benchmark()
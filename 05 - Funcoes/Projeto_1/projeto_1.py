@@ -15,4 +15,13 @@ file_path = r'D:\Estudos\Python\Estudo-Python\05 - Funcoes\Projeto_1\vendas.csv'
 lista_de_produtos = ler_csv(file_path)
 produtos_nao_entregues = filtrar_produtos_N_entregues(lista_de_produtos)
 valor_produtos_entregues = soma_valores_dos_produtos(produtos_nao_entregues)
-print(valor_produtos_entregues)
\ No newline at end of file
+print(valor_produtos_entregues)
+
+#%%
+# O mesmo total (e o total por categoria) calculado pelo SQLite: agregacao_sql.py
+from agregacao_sql import abrir_banco, carregar_csv, total_vendas, total_por_categoria
+
+conexao = abrir_banco()
+carregar_csv(conexao, file_path)
+print(total_vendas(conexao, entregue=True))
+print(total_por_categoria(conexao))
@@ -0,0 +1,47 @@
+import json
+import os
+
+from agregacao_sql import (abrir_banco, carregar_csv, carregar_json, resumo_por_categoria, total_por_categoria,
+                           total_vendas)
+from etl import filtrar_produtos_N_entregues, ler_csv, soma_valores_dos_produtos
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_csv_igual_ao_etl():
+    arquivo = os.path.join(PASTA, 'vendas.csv')
+    conexao = abrir_banco()
+    assert carregar_csv(conexao, arquivo) == len(ler_csv(arquivo))
+    esperado = soma_valores_dos_produtos(filtrar_produtos_N_entregues(ler_csv(arquivo)))
+    assert total_vendas(conexao, entregue=True) == esperado
+    por_categoria = {}
+    for venda in ler_csv(arquivo):
+        por_categoria[venda["categoria"]] = por_categoria.get(venda["categoria"], 0) + int(venda["preco"])
+    assert total_por_categoria(conexao) == por_categoria
+    conexao.close()
+
+
+def test_entregue_segue_a_regra_do_etl(tmp_path):
+    arquivo = tmp_path / "vendas.csv"
+    arquivo.write_text("produto,preco,categoria,entregue\n"
+                       "a,10,x,True\nb,20,x,true\nc,40,y,1\nd,80,y,False\n", encoding='utf-8')
+    conexao = abrir_banco()
+    carregar_csv(conexao, str(arquivo))
+    assert total_vendas(conexao, entregue=True) == soma_valores_dos_produtos(filtrar_produtos_N_entregues(
+        ler_csv(str(arquivo)))) == 10
+    assert total_vendas(conexao, entregue=False) == 80
+    conexao.close()
+
+
+def test_json_da_etl_com_quantidade(tmp_path):
+    vendas = [{"Produto": "a", "Categoria": "x", "Quantidade": 2, "Venda": 10},
+              {"Produto": "b", "Categoria": "y", "Quantidade": 1, "Venda": 5},
+              {"Produto": "c", "Categoria": "x", "Quantidade": 3, "Venda": 1}]
+    (tmp_path / "vendas.json").write_text(json.dumps(vendas), encoding='utf-8')
+    conexao = abrir_banco()
+    assert carregar_json(conexao, str(tmp_path)) == 3
+    assert total_vendas(conexao) == 28
+    assert total_vendas(conexao, categoria="x") == 23
+    resumo = resumo_por_categoria(conexao)
+    assert [(r["categoria"], r["vendas"], r["itens"], r["total"]) for r in resumo] == [("x", 2, 5, 23), ("y", 1, 1, 5)]
+    conexao.close()
@@ -0,0 +1,226 @@
+# Estatísticas em uma única passada (média, variância, desvio padrão, mínimo e máximo)
+
+"""
+calcular_media e calcular_desvio_padrao (05 - funcoes.py) recebem a lista inteira, e o desvio
+padrão percorre os dados duas vezes (uma para a média e outra para a variância). Não funcionam com
+um iterador nem com dados maiores que a memória.
+
+O EstatisticasStreaming guarda só cinco números (n, média, soma dos quadrados dos desvios M2,
+mínimo e máximo) e é atualizado valor a valor pelo algoritmo de Welford, que não sofre o
+cancelamento numérico da fórmula "média dos quadrados - quadrado da média". Dois acumuladores
+(de blocos diferentes, ou de processos diferentes) se juntam pela fórmula de Chan:
+
+    delta = media_b - media_a
+    n     = n_a + n_b
+    media = media_a + delta * n_b / n
+    M2    = M2_a + M2_b + delta² * n_a * n_b / n
+
+Com NumPy, blocos de valores são resumidos de forma vetorizada e depois mesclados.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable
+
+try:
+    import numpy as np
+except ImportError:  # o caminho em Python puro continua funcionando
+    np = None
+
+TAMANHO_BLOCO = 65_536
+
+
+class EstatisticasStreaming:
+    __slots__ = ("n", "media", "m2", "minimo", "maximo")
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def adicionar(self, valor: float) -> None:
+        # Welford: atualiza a média e o M2 com um valor
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (valor - self.media)
+        if valor != valor:
+            # NaN: as comparações abaixo seriam sempre falsas e o NaN sumiria do mínimo e do
+            # máximo; propaga como o min()/max() do NumPy no adicionar_array
+            self.minimo = self.maximo = math.nan
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def adicionar_varios(self, valores: Iterable[float], tamanho_bloco: int = TAMANHO_BLOCO) -> "EstatisticasStreaming":
+        # Aceita lista, gerador ou array; com NumPy disponível, processa em blocos vetorizados
+        if np is not None and isinstance(valores, np.ndarray):
+            return self.adicionar_array(valores)
+        if np is None:
+            for valor in valores:
+                self.adicionar(valor)
+            return self
+        iterador = iter(valores)
+        while True:
+            bloco = np.fromiter(islice(iterador, tamanho_bloco), dtype=np.float64)
+            if not bloco.size:
+                return self
+            self.adicionar_array(bloco)
+
+    def adicionar_array(self, valores) -> "EstatisticasStreaming":
+        valores = np.asarray(valores, dtype=np.float64).ravel()
+        if not valores.size:
+            return self
+        bloco = EstatisticasStreaming()
+        bloco.n = int(valores.size)
+        bloco.media = float(valores.mean())
+        # Desvios em relação à média do próprio bloco: estável mesmo com valores grandes
+        desvios = valores - bloco.media
+        bloco.m2 = float(np.dot(desvios, desvios))
+        bloco.minimo = float(valores.min())
+        bloco.maximo = float(valores.max())
+        return self.mesclar(bloco)
+
+    def mesclar(self, outro: "EstatisticasStreaming") -> "EstatisticasStreaming":
+        # Chan: junta o estado de outro acumulador neste
+        if not outro.n:
+            return self
+        if not self.n:
+            self.n, self.media, self.m2 = outro.n, outro.media, outro.m2
+            self.minimo, self.maximo = outro.minimo, outro.maximo
+            return self
+        n = self.n + outro.n
+        delta = outro.media - self.media
+        self.media += delta * outro.n / n
+        self.m2 += outro.m2 + delta * delta * self.n * outro.n / n
+        self.n = n
+        if outro.minimo != outro.minimo:
+            self.minimo = self.maximo = math.nan
+        # min()/max() devolvem o primeiro argumento quando ele é NaN, então um NaN aqui se mantém
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        return self
+
+    def __add__(self, outro: "EstatisticasStreaming") -> "EstatisticasStreaming":
+        return EstatisticasStreaming().mesclar(self).mesclar(outro)
+
+    def __getstate__(self) -> tuple:
+        return self.n, self.media, self.m2, self.minimo, self.maximo
+
+    def __setstate__(self, estado: tuple) -> None:
+        self.n, self.media, self.m2, self.minimo, self.maximo = estado
+
+    def variancia(self, ddof: int = 0) -> float:
+        # ddof=0: variância populacional, como calcular_desvio_padrao; ddof=1: amostral
+        if self.n - ddof <= 0:
+            return math.nan
+        return self.m2 / (self.n - ddof)
+
+    def desvio_padrao(self, ddof: int = 0) -> float:
+        return math.sqrt(self.variancia(ddof))
+
+    def resumo(self, ddof: int = 0) -> dict:
+        return {
+            "n": self.n,
+            "media": self.media if self.n else math.nan,
+            "variancia": self.variancia(ddof),
+            "desvio_padrao": self.desvio_padrao(ddof),
+            "minimo": self.minimo if self.n else math.nan,
+            "maximo": self.maximo if self.n else math.nan,
+        }
+
+    def __repr__(self) -> str:
+        return f"EstatisticasStreaming({self.resumo()})"
+
+
+def estatisticas(valores: Iterable[float], tamanho_bloco: int = TAMANHO_BLOCO) -> EstatisticasStreaming:
+    return EstatisticasStreaming().adicionar_varios(valores, tamanho_bloco)
+
+
+def estatisticas_em_paralelo(blocos: Iterable, processos: int | None = None) -> EstatisticasStreaming:
+    # Cada bloco (lista ou array) é resumido num processo; os estados parciais são mesclados aqui
+    total = EstatisticasStreaming()
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        for parcial in executor.map(estatisticas, blocos):
+            total.mesclar(parcial)
+    return total
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: precisão e velocidade contra as funções de 05 - funcoes.py
+#------------------------------------------------------
+
+# Cópias das funções do exercício (05 - funcoes.py não pode ser importado: o nome tem espaços)
+def calcular_media(valores: list[float]) -> float:
+    return sum(valores) / len(valores)
+
+
+def calcular_desvio_padrao(valores: list[float]) -> float:
+    media = sum(valores) / len(valores)
+    variancia = sum((x - media) ** 2 for x in valores) / len(valores)
+    return variancia ** 0.5
+
+
+def benchmark(n_valores: int = 5_000_000) -> None:
+    import random
+    import statistics
+    import time
+    from fractions import Fraction
+
+    # Precisão: valores grandes com pouca variação (o caso difícil para fórmulas de uma passada)
+    aleatorio = random.Random(7)
+    amostra = [1e9 + aleatorio.gauss(0, 1) for _ in range(100_000)]
+    exata = Fraction(statistics.pvariance([Fraction(x) for x in amostra]))
+    desvio_exato = math.sqrt(exata)
+    acumulador = EstatisticasStreaming()
+    for x in amostra:
+        acumulador.adicionar(x)
+    soma_dos_quadrados = sum(x * x for x in amostra) / len(amostra) - (sum(amostra) / len(amostra)) ** 2
+    print("Precisão (100 mil valores em torno de 1e9, desvio ~1): erro relativo do desvio padrão")
+    for descricao, desvio in [("calcular_desvio_padrao (2 passadas)", calcular_desvio_padrao(amostra)),
+                              ("Welford (valor a valor)", acumulador.desvio_padrao()),
+                              ("NumPy em blocos + Chan", estatisticas(amostra, tamanho_bloco=4096).desvio_padrao()),
+                              ("média dos quadrados - quadrado da média", math.sqrt(max(soma_dos_quadrados, 0.0)))]:
+        print(f"  {descricao:40s} | {abs(desvio - desvio_exato) / desvio_exato:.2e}")
+
+    # Velocidade
+    dados = [aleatorio.uniform(0, 100) for _ in range(n_valores)]
+    array = np.array(dados) if np is not None else None
+
+    def referencia():
+        return calcular_media(dados), calcular_desvio_padrao(dados), min(dados), max(dados)
+
+    def welford():
+        acumulador = EstatisticasStreaming()
+        for x in dados:
+            acumulador.adicionar(x)
+        return acumulador
+
+    casos = [("referência (média + desvio + min + max)", referencia),
+             ("Welford valor a valor", welford),
+             ("lista -> blocos NumPy", lambda: estatisticas(dados)),
+             ("gerador -> blocos NumPy", lambda: estatisticas(x for x in dados))]
+    if array is not None:
+        casos.append(("array NumPy", lambda: estatisticas(array)))
+
+    print(f"\nVelocidade ({n_valores} valores)")
+    for descricao, funcao in casos:
+        inicio = time.perf_counter()
+        funcao()
+        duracao = time.perf_counter() - inicio
+        print(f"  {descricao:40s} | {duracao:6.3f}s | {n_valores / duracao / 1e6:7.1f} M valores/s")
+
+    # Mesclar blocos calculados em processos diferentes dá o mesmo resultado de uma passada só
+    blocos = [dados[i:i + 1_000_000] for i in range(0, n_valores, 1_000_000)]
+    paralelo = estatisticas_em_paralelo(blocos)
+    print(f"\nem paralelo ({len(blocos)} blocos): desvio {paralelo.desvio_padrao():.12f}"
+          f" | referência {calcular_desvio_padrao(dados):.12f}")
+
+
+if __name__ == "__main__":
+    benchmark()
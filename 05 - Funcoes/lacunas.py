@@ -0,0 +1,205 @@
+# Lacunas em sequências numéricas: intervalos faltantes em vez de cada valor faltante
+
+"""
+encontrar_valores_ausentes (05 - funcoes.py) monta set(range(min, max + 1)) e um segundo set com a
+entrada: para [1, 10**9] isso são um bilhão de inteiros na memória, para devolver uma lista com
+quase um bilhão de valores. Aqui o resultado são intervalos (inicio, fim), inclusivos:
+
+    encontrar_lacunas([1, 2, 5, 6, 10])  ->  (3, 4), (7, 9)
+
+- encontrar_lacunas: uma passada sobre a entrada ordenada (lista, gerador, arquivo lido linha a
+  linha), memória constante; usado para achar números de sequência perdidos num feed de ingestão
+- encontrar_lacunas_bitmap: para IDs densos fora de ordem; um bit por valor do intervalo
+  (10 milhões de IDs -> 1.2 MB), sem precisar ordenar
+"""
+
+from itertools import takewhile
+from typing import Iterable, Iterator
+
+try:
+    import numpy as np
+except ImportError:  # o caminho em Python puro continua funcionando
+    np = None
+
+Lacuna = tuple[int, int]
+
+
+def encontrar_lacunas(sequencia_ordenada: Iterable[int], inicio: int | None = None,
+                      fim: int | None = None) -> Iterator[Lacuna]:
+    """
+    inicio/fim: faixa esperada; sem eles, vale do primeiro ao último valor recebido.
+    Valores repetidos são aceitos; fora de ordem gera ValueError (a entrada precisa estar ordenada).
+    """
+    if inicio is not None and fim is not None and fim < inicio:
+        return
+    valores = iter(sequencia_ordenada)
+    if fim is not None:
+        valores = takewhile(lambda valor: valor <= fim, valores)
+    esperado = inicio
+    for valor in valores:
+        # Caso comum (sequência sem buracos): uma comparação por valor
+        if valor == esperado:
+            esperado = valor + 1
+            continue
+        if esperado is None:
+            esperado = valor + 1
+        elif valor > esperado:
+            yield (esperado, valor - 1)
+            esperado = valor + 1
+        elif inicio is not None and valor < inicio:
+            continue
+        elif valor != esperado - 1:
+            raise ValueError(f"Sequência fora de ordem: {valor} depois de {esperado - 1}")
+    if fim is not None and esperado is not None and esperado <= fim:
+        yield (esperado, fim)
+
+
+def _lacunas_em_bits(bits: bytearray, n: int, base: int) -> Iterator[Lacuna]:
+    # Percorre o bitmap byte a byte, pulando de uma vez os bytes cheios (0xFF)
+    lacuna_inicio = None
+    for indice_byte, byte in enumerate(bits):
+        if byte == 0xFF and lacuna_inicio is None:
+            continue
+        for bit in range(8):
+            posicao = indice_byte * 8 + bit
+            if posicao >= n:
+                break
+            presente = byte >> bit & 1
+            if not presente and lacuna_inicio is None:
+                lacuna_inicio = posicao
+            elif presente and lacuna_inicio is not None:
+                yield (base + lacuna_inicio, base + posicao - 1)
+                lacuna_inicio = None
+    if lacuna_inicio is not None:
+        yield (base + lacuna_inicio, base + n - 1)
+
+
+def _lacunas_em_bits_numpy(bits: "np.ndarray", n: int, base: int, bloco: int = 1 << 23) -> Iterator[Lacuna]:
+    # Desempacota o bitmap em blocos e acha as sequências de zeros com np.diff
+    lacuna_inicio = None
+    for deslocamento in range(0, n, bloco):
+        tamanho = min(bloco, n - deslocamento)
+        presentes = np.unpackbits(bits[deslocamento // 8:(deslocamento + tamanho + 7) // 8],
+                                  bitorder='little')[:tamanho].astype(np.int8)
+        mudancas = np.flatnonzero(np.diff(presentes)) + 1  # posições onde o bit muda
+        posicoes = np.concatenate(([0], mudancas))
+        for posicao in posicoes.tolist():
+            absoluta = deslocamento + posicao
+            if presentes[posicao] == 0:
+                if lacuna_inicio is None:
+                    lacuna_inicio = absoluta
+            elif lacuna_inicio is not None:
+                yield (base + lacuna_inicio, base + absoluta - 1)
+                lacuna_inicio = None
+    if lacuna_inicio is not None:
+        yield (base + lacuna_inicio, base + n - 1)
+
+
+def encontrar_lacunas_bitmap(ids: Iterable[int], inicio: int | None = None, fim: int | None = None,
+                             bloco: int = 1 << 20) -> list[Lacuna]:
+    """
+    IDs em qualquer ordem. Sem inicio/fim, a faixa vai do menor ao maior ID. IDs fora da faixa
+    são ignorados.
+    """
+    if np is None:
+        return _lacunas_bitmap_python(ids, inicio, fim)
+    if not isinstance(ids, np.ndarray):
+        ids = np.fromiter(ids, dtype=np.int64)
+    ids = ids.ravel()
+    if not ids.size and (inicio is None or fim is None):
+        return []
+    inicio = int(ids.min()) if inicio is None else inicio
+    fim = int(ids.max()) if fim is None else fim
+    if fim < inicio:
+        return []
+    n = fim - inicio + 1
+    bits = np.zeros((n + 7) // 8, dtype=np.uint8)
+    # Marca os bits em blocos: os temporários não crescem com o tamanho da entrada
+    for deslocamento in range(0, ids.size, bloco):
+        parte = ids[deslocamento:deslocamento + bloco].astype(np.int64)
+        parte = parte[(parte >= inicio) & (parte <= fim)] - inicio
+        np.bitwise_or.at(bits, parte >> 3, np.left_shift(1, parte & 7).astype(np.uint8))
+    return list(_lacunas_em_bits_numpy(bits, n, inicio))
+
+
+def _lacunas_bitmap_python(ids: Iterable[int], inicio: int | None, fim: int | None) -> list[Lacuna]:
+    if inicio is None or fim is None:
+        ids = list(ids)  # menor e maior ID: precisa de duas passadas
+        if not ids:
+            return []
+        inicio = min(ids) if inicio is None else inicio
+        fim = max(ids) if fim is None else fim
+    if fim < inicio:
+        return []
+    n = fim - inicio + 1
+    bits = bytearray((n + 7) // 8)
+    for valor in ids:
+        if inicio <= valor <= fim:
+            posicao = valor - inicio
+            bits[posicao >> 3] |= 1 << (posicao & 7)
+    return list(_lacunas_em_bits(bits, n, inicio))
+
+
+def total_ausentes(lacunas: Iterable[Lacuna]) -> int:
+    return sum(fim - inicio + 1 for inicio, fim in lacunas)
+
+
+def expandir(lacunas: Iterable[Lacuna]) -> Iterator[int]:
+    # Os valores faltantes um a um, como em encontrar_valores_ausentes (só para lacunas pequenas)
+    for inicio, fim in lacunas:
+        yield from range(inicio, fim + 1)
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: set(range(...)) vs varredura ordenada vs bitmap
+#------------------------------------------------------
+
+# Cópia da função do exercício (05 - funcoes.py não pode ser importado: o nome tem espaços)
+def encontrar_valores_ausentes(sequencia: list[int]) -> list[int]:
+    lista_completa = set(range(min(sequencia), max(sequencia) + 1))
+    return list(lista_completa - set(sequencia))
+
+
+def benchmark(n_ids: int = 10_000_000, taxa_perda: float = 0.001) -> None:
+    import random
+    import time
+    import tracemalloc
+
+    def medir(descricao: str, funcao):
+        # Tempo numa execução e memória em outra (o tracemalloc deixa tudo mais lento)
+        inicio = time.perf_counter()
+        resultado = funcao()
+        duracao = time.perf_counter() - inicio
+        tracemalloc.start()
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{descricao:34s} | {duracao:6.2f}s | pico {pico / 1024 / 1024:8.1f} MB")
+        return resultado
+
+    print("Sequência esparsa [1, 10**9]:")
+    print(f"  encontrar_lacunas -> {list(encontrar_lacunas([1, 10**9]))}"
+          f" (o set(range(...)) teria 10**9 inteiros: dezenas de GB)")
+
+    aleatorio = random.Random(3)
+    perdidos = set(aleatorio.sample(range(2, n_ids), int(n_ids * taxa_perda)))
+    recebidos = [i for i in range(1, n_ids + 1) if i not in perdidos]
+    embaralhados = recebidos[:]
+    aleatorio.shuffle(embaralhados)
+
+    print(f"\n{n_ids} IDs, {len(perdidos)} perdidos:")
+    ausentes = medir("encontrar_valores_ausentes", lambda: encontrar_valores_ausentes(embaralhados))
+    ordenados = medir("encontrar_lacunas (ordenados)", lambda: list(encontrar_lacunas(recebidos)))
+    medir("sorted + encontrar_lacunas", lambda: list(encontrar_lacunas(sorted(embaralhados))))
+    bitmap = medir("bitmap em Python puro", lambda: _lacunas_bitmap_python(embaralhados, None, None))
+    if np is not None:
+        medir("bitmap NumPy (lista)", lambda: encontrar_lacunas_bitmap(embaralhados))
+        array = np.array(embaralhados, dtype=np.int64)
+        medir("bitmap NumPy (array)", lambda: encontrar_lacunas_bitmap(array))
+    print(f"mesmo resultado: {sorted(ausentes) == list(expandir(ordenados)) == list(expandir(bitmap))}"
+          f" | {len(ordenados)} lacunas, {total_ausentes(ordenados)} valores")
+
+
+if __name__ == "__main__":
+    benchmark()
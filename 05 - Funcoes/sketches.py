@@ -0,0 +1,431 @@
+# Contagem aproximada de distintos e dos mais frequentes com memória fixa (sketches)
+
+"""
+contar_valores_unicos (05 - funcoes.py) monta um set com todos os valores: a memória cresce com
+o número de distintos, o que não cabe em fluxos de eventos com bilhões de IDs. Aqui:
+
+- HyperLogLog: número aproximado de distintos com erro relativo configurável (~1.04/sqrt(m),
+  com m registradores de 1 byte; erro de 2% -> 4 KB)
+- ContadorDistintos: exato (set) até um limite de itens e, passando disso, vira HyperLogLog
+- CountMin: frequência aproximada de qualquer item (nunca subestima), em largura x profundidade
+  contadores de 8 bytes (com o padrão epsilon=0.001, delta=0.01: 2719 x 5, ~106 KB)
+- SpaceSaving: os k mais frequentes, com o erro máximo de cada contagem
+
+Todos são mescláveis: cada shard/processo monta o seu e o resultado de mesclar é o mesmo que se
+tivesse visto o fluxo inteiro. Por isso o hash é estável entre processos (splitmix64 para inteiros,
+blake2b para o resto) e não o hash() do Python, que muda a cada execução.
+"""
+
+import hashlib
+import math
+from array import array
+from collections import Counter
+from itertools import islice
+from typing import Hashable, Iterable
+
+try:
+    import numpy as np
+except ImportError:  # o caminho em Python puro continua funcionando
+    np = None
+
+MASCARA_64 = (1 << 64) - 1
+TAMANHO_BLOCO = 65_536
+
+
+#------------------------------------------------------
+# Hash estável de 64 bits
+#------------------------------------------------------
+
+def _splitmix64(x: int) -> int:
+    x = (x + 0x9E3779B97F4A7C15) & MASCARA_64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASCARA_64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASCARA_64
+    return x ^ (x >> 31)
+
+
+def hash64(item: Hashable) -> int:
+    if np is not None and isinstance(item, np.integer):
+        item = int(item)  # mesmo hash do caminho vetorizado
+    # Inteiros com sinal ou sem sinal de 64 bits: os bits que o caminho vetorizado vê (um uint64
+    # >= 2^63 e o int64 negativo com os mesmos bits têm o mesmo hash, como nos arrays)
+    if isinstance(item, int) and -(1 << 63) <= item < (1 << 64):
+        return _splitmix64(item & MASCARA_64)
+    if isinstance(item, str):
+        dados = item.encode('utf-8')
+    elif isinstance(item, bytes):
+        dados = item
+    else:
+        dados = repr(item).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(dados, digest_size=8).digest(), 'little')
+
+
+def _splitmix64_array(valores) -> "np.ndarray":
+    # Mesmo resultado de _splitmix64, para um array de inteiros de 64 bits (multiplicação com overflow)
+    x = valores.astype(np.int64, copy=False).view(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _inteiros_numpy(valores) -> bool:
+    return np is not None and isinstance(valores, np.ndarray) and valores.dtype.kind in 'iu' and valores.dtype.itemsize <= 8
+
+
+def _blocos(valores: Iterable, tamanho: int) -> Iterable[list]:
+    iterador = iter(valores)
+    while bloco := list(islice(iterador, tamanho)):
+        yield bloco
+
+
+def _blocos_hash(itens: Iterable[Hashable], tamanho: int = TAMANHO_BLOCO) -> Iterable:
+    """
+    Hashes em blocos de tamanho fixo (a memória não cresce com a entrada). Arrays e blocos só de
+    inteiros passam pelo splitmix64 vetorizado; o resto, item a item.
+    """
+    if _inteiros_numpy(itens):
+        itens = itens.ravel()
+        for inicio in range(0, itens.size, tamanho):
+            yield _splitmix64_array(itens[inicio:inicio + tamanho])
+        return
+    for bloco in _blocos(itens, tamanho):
+        if np is not None and all(type(item) is int for item in bloco):
+            try:
+                yield _splitmix64_array(np.array(bloco, dtype=np.int64))
+                continue
+            except OverflowError:  # inteiros maiores que 64 bits
+                pass
+        hashes = [hash64(item) for item in bloco]
+        yield np.array(hashes, dtype=np.uint64) if np is not None else hashes
+
+
+#------------------------------------------------------
+# HyperLogLog
+#------------------------------------------------------
+
+class HyperLogLog:
+    def __init__(self, erro: float = 0.02, precisao: int | None = None):
+        # precisao p: m = 2^p registradores; erro relativo ~ 1.04 / sqrt(m)
+        if precisao is None:
+            precisao = math.ceil(math.log2((1.04 / erro) ** 2))
+        if not 4 <= precisao <= 18:
+            raise ValueError("A precisão do HyperLogLog deve ficar entre 4 e 18")
+        self.p = precisao
+        self.m = 1 << precisao
+        self.registradores = bytearray(self.m)
+
+    @property
+    def erro_padrao(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def _registrar_hash(self, h: int) -> None:
+        indice = h >> (64 - self.p)
+        resto = h & ((1 << (64 - self.p)) - 1)
+        posto = (64 - self.p) - resto.bit_length() + 1  # posição do primeiro bit 1
+        if posto > self.registradores[indice]:
+            self.registradores[indice] = posto
+
+    def adicionar(self, item: Hashable) -> None:
+        self._registrar_hash(hash64(item))
+
+    def adicionar_varios(self, itens: Iterable[Hashable]) -> "HyperLogLog":
+        for hashes in _blocos_hash(itens):
+            if np is not None:
+                self._adicionar_hashes_numpy(hashes)
+            else:
+                for h in hashes:
+                    self._registrar_hash(h)
+        return self
+
+    def _adicionar_hashes_numpy(self, hashes) -> None:
+        bits_resto = 64 - self.p
+        indices = (hashes >> np.uint64(bits_resto)).astype(np.intp)
+        resto = hashes & np.uint64((1 << bits_resto) - 1)
+        # bit_length vetorizado: frexp dá o expoente do float, corrigido quando o arredondamento sobe uma potência de 2
+        _, expoente = np.frexp(resto.astype(np.float64))
+        expoente = expoente.astype(np.int64)
+        acima = (expoente > 0) & (np.left_shift(np.uint64(1), np.maximum(expoente - 1, 0).astype(np.uint64)) > resto)
+        expoente -= acima
+        postos = (bits_resto - expoente + 1).astype(np.uint8)
+        np.maximum.at(np.frombuffer(self.registradores, dtype=np.uint8), indices, postos)
+
+    def estimar(self) -> float:
+        m = self.m
+        alfa = 0.7213 / (1 + 1.079 / m) if m >= 128 else {16: 0.673, 32: 0.697, 64: 0.709}[m]
+        soma = sum(2.0 ** -r for r in self.registradores)
+        estimativa = alfa * m * m / soma
+        zeros = self.registradores.count(0)
+        if estimativa <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # contagem linear para cardinalidades pequenas
+        return estimativa
+
+    def __len__(self) -> int:
+        return round(self.estimar())
+
+    def mesclar(self, outro: "HyperLogLog") -> "HyperLogLog":
+        if outro.p != self.p:
+            raise ValueError("Só é possível mesclar HyperLogLogs com a mesma precisão")
+        self.registradores = bytearray(map(max, self.registradores, outro.registradores))
+        return self
+
+    def __getstate__(self) -> tuple:
+        return self.p, bytes(self.registradores)
+
+    def __setstate__(self, estado: tuple) -> None:
+        self.p, registradores = estado
+        self.m = 1 << self.p
+        self.registradores = bytearray(registradores)
+
+
+class ContadorDistintos:
+    """
+    Exato enquanto couber em limite_exato itens; a partir daí passa para um HyperLogLog
+    com o erro pedido (e o set é descartado).
+    """
+
+    def __init__(self, erro: float = 0.02, limite_exato: int = 10_000):
+        self.erro = erro
+        self.limite_exato = limite_exato
+        self.exatos: set | None = set()
+        self.hll: HyperLogLog | None = None
+
+    @property
+    def exato(self) -> bool:
+        return self.hll is None
+
+    def _promover(self) -> None:
+        self.hll = HyperLogLog(self.erro).adicionar_varios(self.exatos)
+        self.exatos = None
+
+    def adicionar(self, item: Hashable) -> None:
+        if self.hll is not None:
+            self.hll.adicionar(item)
+            return
+        self.exatos.add(item)
+        if len(self.exatos) > self.limite_exato:
+            self._promover()
+
+    def adicionar_varios(self, itens: Iterable[Hashable]) -> "ContadorDistintos":
+        if _inteiros_numpy(itens):
+            if self.hll is None and len(self.exatos) + itens.size <= self.limite_exato:
+                self.exatos.update(itens.ravel().tolist())
+                return self
+            if self.hll is None:
+                self._promover()
+            self.hll.adicionar_varios(itens)
+            return self
+        for bloco in _blocos(itens, TAMANHO_BLOCO):
+            if self.hll is not None:
+                self.hll.adicionar_varios(bloco)
+                continue
+            self.exatos.update(bloco)
+            if len(self.exatos) > self.limite_exato:
+                self._promover()
+        return self
+
+    def __len__(self) -> int:
+        return len(self.exatos) if self.hll is None else len(self.hll)
+
+    def mesclar(self, outro: "ContadorDistintos") -> "ContadorDistintos":
+        if self.hll is None and outro.hll is None:
+            self.exatos |= outro.exatos
+            if len(self.exatos) > self.limite_exato:
+                self._promover()
+            return self
+        if self.hll is None:
+            self._promover()
+        self.hll.mesclar(outro.hll if outro.hll is not None else HyperLogLog(self.erro).adicionar_varios(outro.exatos))
+        return self
+
+
+#------------------------------------------------------
+# Count-Min
+#------------------------------------------------------
+
+class CountMin:
+    """
+    Frequência estimada >= frequência real, e no máximo real + epsilon * total
+    com probabilidade 1 - delta. Memória: ceil(e / epsilon) x ceil(ln(1 / delta)) contadores de
+    8 bytes; o padrão ocupa ~106 KB, e epsilon=0.01 baixa para ~11 KB.
+    """
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01):
+        self.largura = math.ceil(math.e / epsilon)
+        self.profundidade = math.ceil(math.log(1 / delta))
+        self.tabela = [array('q', bytes(8 * self.largura)) for _ in range(self.profundidade)]
+        self.total = 0
+
+    def _posicoes(self, h: int) -> list[int]:
+        # Hash duplo: as d posições saem de duas metades de um hash de 64 bits
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.largura for i in range(self.profundidade)]
+
+    def adicionar(self, item: Hashable, quantidade: int = 1) -> None:
+        for linha, posicao in zip(self.tabela, self._posicoes(hash64(item))):
+            linha[posicao] += quantidade
+        self.total += quantidade
+
+    def adicionar_varios(self, itens: Iterable[Hashable]) -> "CountMin":
+        if np is None:
+            # Contagem exata de cada bloco primeiro: itens repetidos atualizam a tabela uma vez só
+            for bloco in _blocos(itens, TAMANHO_BLOCO):
+                for item, quantidade in Counter(bloco).items():
+                    self.adicionar(item, quantidade)
+            return self
+        for hashes in _blocos_hash(itens):
+            h1 = hashes & np.uint64(0xFFFFFFFF)
+            h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+            for i, linha in enumerate(self.tabela):
+                posicoes = ((h1 + np.uint64(i) * h2) % np.uint64(self.largura)).astype(np.intp)
+                np.add.at(np.frombuffer(linha, dtype=np.int64), posicoes, 1)
+            self.total += int(hashes.size)
+        return self
+
+    def estimar(self, item: Hashable) -> int:
+        return min(linha[posicao] for linha, posicao in zip(self.tabela, self._posicoes(hash64(item))))
+
+    def mesclar(self, outro: "CountMin") -> "CountMin":
+        if (outro.largura, outro.profundidade) != (self.largura, self.profundidade):
+            raise ValueError("Só é possível mesclar CountMins com as mesmas dimensões")
+        for linha, linha_outro in zip(self.tabela, outro.tabela):
+            for posicao, valor in enumerate(linha_outro):
+                if valor:
+                    linha[posicao] += valor
+        self.total += outro.total
+        return self
+
+
+#------------------------------------------------------
+# Space-Saving (top-k)
+#------------------------------------------------------
+
+class SpaceSaving:
+    """
+    Guarda no máximo k itens. Cada contagem superestima a real em no máximo `erro` do item,
+    e qualquer item com frequência maior que total / k certamente está entre os guardados.
+    """
+
+    def __init__(self, k: int = 100):
+        self.k = k
+        self.contagens: dict = {}
+        self.erros: dict = {}
+        self.total = 0
+
+    def adicionar(self, item: Hashable, quantidade: int = 1) -> None:
+        self.total += quantidade
+        if item in self.contagens:
+            self.contagens[item] += quantidade
+            return
+        if len(self.contagens) < self.k:
+            self.contagens[item] = quantidade
+            self.erros[item] = 0
+            return
+        # Substitui o item com a menor contagem; o novo herda essa contagem como erro
+        menor = min(self.contagens, key=self.contagens.get)
+        minimo = self.contagens.pop(menor)
+        del self.erros[menor]
+        self.contagens[item] = minimo + quantidade
+        self.erros[item] = minimo
+
+    def adicionar_varios(self, itens: Iterable[Hashable]) -> "SpaceSaving":
+        # Cada bloco vira um resumo exato (Counter) e é mesclado: evita a troca item a item
+        iterador = (itens.ravel().tolist() if np is not None and isinstance(itens, np.ndarray) else itens)
+        for bloco in _blocos(iterador, TAMANHO_BLOCO):
+            self._mesclar_contagens(Counter(bloco), {}, len(bloco), cheio=False)
+        return self
+
+    def _minimo(self) -> int:
+        return min(self.contagens.values()) if len(self.contagens) >= self.k else 0
+
+    def _mesclar_contagens(self, contagens: dict, erros: dict, total: int, cheio: bool) -> None:
+        # Itens ausentes de um resumo cheio podem ter até a menor contagem dele
+        minimo_a = self._minimo()
+        minimo_b = min(contagens.values()) if cheio and contagens else 0
+        juntas, erros_juntos = {}, {}
+        for item in self.contagens.keys() | contagens.keys():
+            juntas[item] = self.contagens.get(item, minimo_a) + contagens.get(item, minimo_b)
+            erros_juntos[item] = self.erros.get(item, minimo_a) + erros.get(item, minimo_b)
+        mantidos = sorted(juntas, key=juntas.get, reverse=True)[:self.k]
+        self.contagens = {item: juntas[item] for item in mantidos}
+        self.erros = {item: erros_juntos[item] for item in mantidos}
+        self.total += total
+
+    def mesclar(self, outro: "SpaceSaving") -> "SpaceSaving":
+        self._mesclar_contagens(outro.contagens, outro.erros, outro.total, cheio=len(outro.contagens) >= outro.k)
+        return self
+
+    def mais_frequentes(self, n: int | None = None) -> list[tuple]:
+        # (item, contagem estimada, erro máximo), do mais para o menos frequente
+        ordenados = sorted(self.contagens, key=self.contagens.get, reverse=True)[:n]
+        return [(item, self.contagens[item], self.erros[item]) for item in ordenados]
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: set/Counter exatos vs sketches
+#------------------------------------------------------
+
+def benchmark(n_eventos: int = 2_000_000, n_ids: int = 10_000_000, shards: int = 4) -> None:
+    """
+    Distintos: IDs uniformes (muitos distintos, o caso em que o set cresce). Mais frequentes: IDs
+    com distribuição de Zipf (poucos muito frequentes, muitos raros). O pico de memória dos
+    sketches inclui os temporários de um bloco de hashes; o estado em si tem tamanho fixo.
+    """
+    import pickle
+    import random
+    import time
+    import tracemalloc
+
+    if np is not None:
+        gerador = np.random.default_rng(42)
+        ids = gerador.integers(0, n_ids, n_eventos, dtype=np.int64)
+        zipf = (gerador.zipf(1.3, n_eventos) % n_ids).astype(np.int64)
+        lista_ids, lista_zipf = ids.tolist(), zipf.tolist()
+    else:
+        aleatorio = random.Random(42)
+        lista_ids = ids = [aleatorio.randrange(n_ids) for _ in range(n_eventos)]
+        lista_zipf = zipf = [int(aleatorio.paretovariate(0.3)) % n_ids for _ in range(n_eventos)]
+
+    def medir(descricao: str, funcao):
+        # Tempo numa execução e memória em outra (o tracemalloc deixa tudo mais lento)
+        inicio = time.perf_counter()
+        resultado = funcao()
+        duracao = time.perf_counter() - inicio
+        tracemalloc.start()
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{descricao:36s} | {duracao:6.2f}s | pico {pico / 1024:9.0f} KB")
+        return resultado
+
+    print(f"{n_eventos} eventos")
+    exato = medir("set (contar_valores_unicos)", lambda: len(set(lista_ids)))
+    hll = medir("HyperLogLog 2% (lista)", lambda: HyperLogLog(0.02).adicionar_varios(lista_ids))
+    if np is not None:
+        hll = medir("HyperLogLog 2% (array NumPy)", lambda: HyperLogLog(0.02).adicionar_varios(ids))
+    print(f"  distintos: exato {exato} | HLL {len(hll)} ({(len(hll) - exato) / exato:+.2%})"
+          f" | estado serializado {len(pickle.dumps(hll)) / 1024:.1f} KB")
+
+    contagem = medir("Counter", lambda: Counter(lista_zipf))
+    topk = medir("SpaceSaving k=100", lambda: SpaceSaving(100).adicionar_varios(lista_zipf))
+    cm = medir("CountMin eps=0.001", lambda: CountMin(0.001, 0.01).adicionar_varios(zipf))
+    acertos = len({i for i, _ in contagem.most_common(10)} & {i for i, _, _ in topk.mais_frequentes(10)})
+    print(f"  top 10 em comum com o exato: {acertos}/10 | CountMin: {cm.largura}x{cm.profundidade} contadores")
+    for item, real in contagem.most_common(3):
+        print(f"  id {item}: real {real} | CountMin {cm.estimar(item)} | SpaceSaving {topk.contagens.get(item)}")
+
+    # Shards: cada parte do fluxo num sketch, depois a mescla
+    tamanho = n_eventos // shards
+    hll_mesclado = HyperLogLog(0.02)
+    topk_mesclado = SpaceSaving(100)
+    for i in range(shards):
+        hll_mesclado.mesclar(HyperLogLog(0.02).adicionar_varios(ids[i * tamanho:(i + 1) * tamanho]))
+        topk_mesclado.mesclar(SpaceSaving(100).adicionar_varios(zipf[i * tamanho:(i + 1) * tamanho]))
+    exato_partes = len(set(lista_ids[:shards * tamanho]))
+    acertos = len({i for i, _ in Counter(lista_zipf[:shards * tamanho]).most_common(10)}
+                  & {i for i, _, _ in topk_mesclado.mais_frequentes(10)})
+    print(f"{shards} shards mesclados: HLL {len(hll_mesclado)} vs exato {exato_partes}"
+          f" ({(len(hll_mesclado) - exato_partes) / exato_partes:+.2%}) | top 10 em comum: {acertos}/10")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,69 @@
+import math
+import pickle
+import random
+import statistics
+
+import numpy as np
+import pytest
+
+import estatisticas as modulo
+from estatisticas import EstatisticasStreaming, estatisticas, estatisticas_em_paralelo
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def com_numpy(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(modulo, "np", None)
+    return request.param
+
+
+def test_bate_com_statistics(com_numpy):
+    aleatorio = random.Random(41)
+    valores = [aleatorio.gauss(10, 3) for _ in range(5_000)]
+    resultado = estatisticas(iter(valores), tamanho_bloco=777)
+    assert resultado.n == 5_000
+    assert resultado.media == pytest.approx(statistics.fmean(valores))
+    assert resultado.desvio_padrao() == pytest.approx(statistics.pstdev(valores))
+    assert resultado.variancia(ddof=1) == pytest.approx(statistics.variance(valores))
+    assert (resultado.minimo, resultado.maximo) == (min(valores), max(valores))
+
+
+def test_estavel_com_deslocamento_grande():
+    # A fórmula "média dos quadrados - quadrado da média" perde todos os dígitos aqui
+    valores = [1e9 + x for x in (4, 7, 13, 16)]
+    assert estatisticas(valores).variancia() == pytest.approx(22.5)
+    assert EstatisticasStreaming().adicionar_array(np.array(valores)).variancia() == pytest.approx(22.5)
+
+
+def test_nan_propaga_igual_nos_dois_caminhos():
+    valores = [1.0, math.nan, 3.0]
+    um_a_um = EstatisticasStreaming()
+    for valor in valores:
+        um_a_um.adicionar(valor)
+    vetorizado = EstatisticasStreaming().adicionar_array(np.array(valores))
+    for resultado in (um_a_um, vetorizado, estatisticas([1.0]) + estatisticas([math.nan, 3.0])):
+        assert math.isnan(resultado.minimo) and math.isnan(resultado.maximo) and math.isnan(resultado.media)
+
+
+def test_mesclar_blocos_e_serializar():
+    a, b = estatisticas(range(0, 100)), estatisticas(range(100, 250))
+    total = pickle.loads(pickle.dumps(a + b))
+    referencia = estatisticas(range(250))
+    assert total.n == 250
+    assert total.media == pytest.approx(referencia.media)
+    assert total.m2 == pytest.approx(referencia.m2)
+    assert (total.minimo, total.maximo) == (0, 249)
+    assert (a + EstatisticasStreaming()).resumo() == a.resumo()
+
+
+def test_vazio_e_ddof():
+    resumo = EstatisticasStreaming().resumo()
+    assert resumo["n"] == 0 and all(math.isnan(resumo[c]) for c in ("media", "variancia", "minimo", "maximo"))
+    assert math.isnan(estatisticas([5.0]).variancia(ddof=1))
+
+
+def test_em_paralelo_igual_ao_sequencial():
+    blocos = [list(range(i, i + 1000)) for i in range(0, 4000, 1000)]
+    total = estatisticas_em_paralelo(blocos, processos=2)
+    assert total.n == 4000
+    assert total.desvio_padrao() == pytest.approx(statistics.pstdev(range(4000)))
@@ -0,0 +1,41 @@
+import random
+
+import numpy as np
+import pytest
+
+import lacunas as modulo
+from lacunas import encontrar_lacunas, encontrar_lacunas_bitmap, encontrar_valores_ausentes, expandir, total_ausentes
+
+
+def test_lacunas_em_sequencia_ordenada():
+    assert list(encontrar_lacunas([1, 2, 5, 6, 10])) == [(3, 4), (7, 9)]
+    assert list(encontrar_lacunas(iter([1, 1, 2, 4, 4]))) == [(3, 3)]
+    assert list(encontrar_lacunas([3, 5, 12], inicio=1, fim=8)) == [(1, 2), (4, 4), (6, 8)]
+    assert list(encontrar_lacunas([], inicio=1, fim=3)) == [(1, 3)]
+    assert list(encontrar_lacunas([1, 2], inicio=5, fim=4)) == []
+    with pytest.raises(ValueError):
+        list(encontrar_lacunas([1, 5, 3]))
+
+
+def test_nao_materializa_a_faixa():
+    lacunas = list(encontrar_lacunas([1, 10**12]))
+    assert lacunas == [(2, 10**12 - 1)] and total_ausentes(lacunas) == 10**12 - 2
+
+
+@pytest.mark.parametrize("com_numpy", [True, False], ids=["numpy", "python"])
+def test_bitmap_igual_a_varredura_ordenada(com_numpy, monkeypatch):
+    if not com_numpy:
+        monkeypatch.setattr(modulo, "np", None)
+    aleatorio = random.Random(43)
+    ids = [i for i in range(1, 20_000) if aleatorio.random() > 0.01 and not 5_000 <= i < 5_100]
+    embaralhados = aleatorio.sample(ids, len(ids))
+    esperado = list(encontrar_lacunas(ids))
+    assert encontrar_lacunas_bitmap(embaralhados) == esperado
+    assert sorted(expandir(esperado)) == sorted(encontrar_valores_ausentes(ids))
+    assert encontrar_lacunas_bitmap(embaralhados + [-5, 10**6], inicio=1, fim=19_999) == esperado
+    assert encontrar_lacunas_bitmap([]) == []
+
+
+def test_bitmap_com_array_e_blocos_pequenos():
+    ids = np.array([9, 1, 2, 3, 7], dtype=np.int32)
+    assert encontrar_lacunas_bitmap(ids, inicio=0, fim=12, bloco=2) == [(0, 0), (4, 6), (8, 8), (10, 12)]
@@ -0,0 +1,67 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from sketches import ContadorDistintos, CountMin, HyperLogLog, SpaceSaving, _blocos_hash, hash64
+
+
+def test_hash_escalar_igual_ao_vetorizado():
+    valores = [0, 1, -1, -(2**63), 2**63 - 1, 2**63, 2**63 + 5, 2**64 - 1]
+    esperado = [hash64(v) for v in valores]
+    assert [int(h) for h in next(_blocos_hash(np.array(valores[:5], dtype=np.int64)))] == esperado[:5]
+    assert [int(h) for h in next(_blocos_hash(np.array(valores[5:], dtype=np.uint64)))] == esperado[5:]
+    assert [int(h) for h in next(_blocos_hash(valores))] == esperado
+    assert hash64(np.uint64(2**63 + 5)) == hash64(2**63 + 5)
+    assert hash64("abc") == hash64("abc") != hash64("abd")
+
+
+def test_countmin_uint64_alto_bate_com_o_escalar():
+    contador = CountMin().adicionar_varios(np.array([2**63 + 5] * 10, dtype=np.uint64))
+    assert contador.estimar(np.uint64(2**63 + 5)) == 10
+    assert contador.estimar(2**63 + 5) == 10
+
+
+def test_hyperloglog_dentro_do_erro_e_mesclavel():
+    partes = [HyperLogLog(0.02).adicionar_varios(np.arange(i * 50_000, (i + 1) * 50_000)) for i in range(4)]
+    total = partes[0]
+    for parte in partes[1:]:
+        total.mesclar(parte)
+    assert abs(total.estimar() - 200_000) / 200_000 < 4 * total.erro_padrao
+    assert len(HyperLogLog().adicionar_varios(["a", "b", "a"])) == 2
+    with pytest.raises(ValueError):
+        total.mesclar(HyperLogLog(precisao=8))
+
+
+def test_contador_distintos_exato_ate_o_limite():
+    contador = ContadorDistintos(limite_exato=100).adicionar_varios(list(range(50)) * 3)
+    assert contador.exato and len(contador) == 50
+    contador.adicionar_varios(np.arange(10_000))
+    assert not contador.exato
+    assert abs(len(contador) - 10_000) < 1_000
+
+
+def test_countmin_nunca_subestima():
+    aleatorio = random.Random(1)
+    itens = [aleatorio.randrange(5_000) for _ in range(50_000)]
+    reais = Counter(itens)
+    contador = CountMin(epsilon=0.01).adicionar_varios(itens)
+    outro = CountMin(epsilon=0.01)
+    for item in itens:
+        outro.adicionar(item)
+    assert outro.tabela == contador.tabela
+    for item, real in reais.items():
+        assert real <= contador.estimar(item) <= real + 0.01 * len(itens) * 3
+
+
+def test_space_saving_top_k_por_shard():
+    aleatorio = random.Random(2)
+    pesos = [1 / (i + 1) for i in range(2_000)]
+    shards = [aleatorio.choices(range(2_000), pesos, k=20_000) for _ in range(4)]
+    esperado = [item for item, _ in Counter(sum(shards, [])).most_common(5)]
+    total = SpaceSaving(100).adicionar_varios(shards[0])
+    for shard in shards[1:]:
+        total.mesclar(SpaceSaving(100).adicionar_varios(shard))
+    assert [item for item, _, _ in total.mais_frequentes(5)] == esperado
+    assert total.total == 80_000
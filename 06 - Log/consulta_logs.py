@@ -0,0 +1,397 @@
+# Consulta de logs do loguru por nível e período, com índice ao lado do arquivo
+
+"""
+O exercício 3 de 04 - Controle de fluxo.py percorre uma lista de dicionários perguntando
+log['level'] == 'ERROR' um a um. Com os arquivos reais do loguru (usando logger.py,
+07 - criando uma etl/log.py), de vários GB, isso é reler o arquivo inteiro a cada pergunta.
+
+Formato lido: "{time} {level} {message} {file}", com o "{line}" opcional no fim, por exemplo
+
+    2025-03-07T23:07:53.148295-0300 CRITICAL Um erro que para a aplicação usando logger.py 10
+
+Linhas que não começam com data (o traceback do logger.exception) pertencem ao registro anterior.
+
+- filtrar_logs: uma passada pelo arquivo, em blocos (memória constante); o nível é procurado pelo
+  regex no bloco inteiro e só os registros do nível pedido são decodificados e têm a data convertida
+- atualizar_indice: grava <log>.idx (JSON) com, para cada faixa de tempo (intervalo, 1 minuto por
+  padrão) e nível, a posição (byte) do primeiro e do último registro e a quantidade; quando há
+  poucos registros na faixa (até LIMITE_POSICOES), guarda a posição de cada um. Se o log cresceu,
+  só o trecho novo é lido; se foi rotacionado (o começo do arquivo mudou), o índice é refeito
+- consultar: "todos os ERROR entre T1 e T2" lê o índice, escolhe as faixas do período que têm
+  aquele nível e vai direto (seek) a essas posições, sem passar pelo resto do arquivo
+
+O formato do loguru não delimita mensagem e arquivo: o arquivo é a última palavra antes da linha
+(um nome com espaço, como "usando logger.py", fica com "usando" no fim da mensagem).
+"""
+
+import hashlib
+import json
+import os
+import re
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Iterable, Iterator, NamedTuple
+
+INTERVALO = 60  # segundos por faixa de tempo do índice
+LIMITE_POSICOES = 32  # até quantos registros por faixa e nível o índice guarda um a um
+DISTANCIA_JUNCAO = 16 * 1024  # trechos mais próximos que isso são lidos de uma vez só
+TAMANHO_ASSINATURA = 4096
+TAMANHO_BLOCO = 4 * 1024 * 1024  # bytes lidos de cada vez
+VERSAO_INDICE = 1
+
+
+class RegistroLog(NamedTuple):
+    momento: datetime
+    nivel: str
+    mensagem: str
+    arquivo: str
+    linha: int | None
+    posicao: int  # byte onde o registro começa no arquivo
+
+
+#------------------------------------------------------
+# Leitura em streaming
+#------------------------------------------------------
+
+_INICIO = re.compile(rb'^\d{4}-\d\d-\d\dT', re.M)  # "AAAA-MM-DDT...": o resto é continuação (traceback)
+_CABECALHO = re.compile(rb'^(\d{4}-\d\d-\d\dT\S*) (\S+)', re.M)
+
+
+def _padrao_niveis(niveis: set[bytes]) -> re.Pattern:
+    # Começa por um literal (" ERROR "): o regex pula direto para os candidatos, sem testar cada linha
+    alternativas = b'|'.join(re.escape(nivel) for nivel in sorted(niveis))
+    return re.compile(rb' (?:' + alternativas + rb') ')
+
+
+def _registros(arquivo, padrao: re.Pattern, inicio: int = 0, fim: int | None = None,
+               tamanho_leitura: int = TAMANHO_BLOCO) -> Iterator[tuple[int, bytes]]:
+    """
+    (posição, bytes) dos registros do nível de padrao que começam em [inicio, fim); a continuação
+    pode passar do fim. O arquivo é lido em blocos e a busca roda no regex (em C): as linhas dos
+    outros níveis nem chegam ao Python.
+    """
+    arquivo.seek(inicio)
+    base = inicio  # posição no arquivo de dados[0]
+    dados = b''
+    while True:
+        lido = arquivo.read(tamanho_leitura)
+        dados += lido
+        if not dados:
+            return
+        # Só linhas completas; no fim do arquivo, até o último byte
+        corte = len(dados) if not lido else dados.rfind(b'\n') + 1
+        if not corte:
+            continue
+        proximo = corte
+        for encontrado in padrao.finditer(dados, 0, corte):
+            comeco = dados.rfind(b'\n', 0, encontrado.start()) + 1
+            # O nível precisa ser o segundo campo de um começo de registro (não um " ERROR " na mensagem)
+            if not _INICIO.match(dados, comeco) or dados.find(b' ', comeco, encontrado.start()) != -1:
+                continue
+            if fim is not None and base + comeco >= fim:
+                return
+            seguinte = _INICIO.search(dados, encontrado.end(), corte)
+            if seguinte is None and lido:
+                proximo = comeco  # a continuação pode estar no próximo bloco
+                break
+            yield base + comeco, dados[comeco:seguinte.start() if seguinte else corte]
+        if not lido or (fim is not None and base + corte >= fim and proximo == corte):
+            return
+        dados = dados[proximo:]
+        base += proximo
+
+
+def _momento(token: bytes) -> datetime:
+    momento = datetime.fromisoformat(token.decode('ascii'))
+    return momento if momento.tzinfo else momento.astimezone()
+
+
+def _normalizar_momento(momento: datetime | str | None) -> datetime | None:
+    # Aceita datetime ou texto ISO; sem fuso, vale o fuso local (o mesmo que o loguru grava)
+    if momento is None:
+        return None
+    if isinstance(momento, str):
+        momento = datetime.fromisoformat(momento)
+    return momento if momento.tzinfo else momento.astimezone()
+
+
+def _niveis(niveis: str | Iterable[str]) -> set[bytes]:
+    if isinstance(niveis, str):
+        niveis = [niveis]
+    return {nivel.upper().encode('ascii') for nivel in niveis}
+
+
+def _montar_registro(posicao: int, bruto: bytes) -> RegistroLog:
+    texto = bruto.decode('utf-8', errors='replace').rstrip('\r\n')
+    primeira, _, continuacao = texto.partition('\n')
+    momento, nivel, resto = (primeira.split(' ', 2) + ['', ''])[:3]
+    palavras = resto.rsplit(' ', 2)
+    linha = None
+    if len(palavras) >= 2 and palavras[-1].isdigit():
+        linha = int(palavras.pop())
+    arquivo = palavras.pop() if len(palavras) >= 2 else ''
+    mensagem = ' '.join(palavras)
+    if continuacao:
+        mensagem = f"{mensagem}\n{continuacao}"
+    return RegistroLog(_momento(momento.encode('ascii')), nivel, mensagem, arquivo, linha, posicao)
+
+
+def _filtrar(registros: Iterable[tuple[int, bytes]], inicio: datetime | None,
+             fim: datetime | None) -> Iterator[RegistroLog]:
+    for posicao, bruto in registros:
+        # Só os registros do nível pedido têm a data convertida e o texto decodificado
+        if inicio is not None or fim is not None:
+            momento = _momento(bruto[:bruto.find(b' ')])
+            if (inicio is not None and momento < inicio) or (fim is not None and momento > fim):
+                continue
+        yield _montar_registro(posicao, bruto)
+
+
+def filtrar_logs(caminho: str, niveis: str | Iterable[str] = 'ERROR', inicio: datetime | str | None = None,
+                 fim: datetime | str | None = None) -> Iterator[RegistroLog]:
+    # Sem índice: uma passada pelo arquivo inteiro
+    with open(caminho, 'rb') as arquivo:
+        yield from _filtrar(_registros(arquivo, _padrao_niveis(_niveis(niveis))),
+                            _normalizar_momento(inicio), _normalizar_momento(fim))
+
+
+#------------------------------------------------------
+# Índice por faixa de tempo e nível
+#------------------------------------------------------
+
+def caminho_indice(caminho: str) -> str:
+    return f"{caminho}.idx"
+
+
+def _assinatura(arquivo, tamanho: int) -> str:
+    # Hash do começo do arquivo: se mudou, o log foi rotacionado ou reescrito
+    arquivo.seek(0)
+    return hashlib.blake2b(arquivo.read(min(tamanho, TAMANHO_ASSINATURA)), digest_size=16).hexdigest()
+
+
+def _indice_vazio(intervalo: int) -> dict:
+    return {"versao": VERSAO_INDICE, "intervalo": intervalo, "tamanho": 0, "assinatura": "", "faixas": {}}
+
+
+def _carregar_indice(caminho: str, intervalo: int) -> dict:
+    try:
+        with open(caminho_indice(caminho), encoding='utf-8') as arquivo:
+            indice = json.load(arquivo)
+    except (OSError, ValueError):
+        return _indice_vazio(intervalo)
+    if indice.get("versao") != VERSAO_INDICE or indice.get("intervalo") != intervalo:
+        return _indice_vazio(intervalo)
+    return indice
+
+
+def _gravar_indice(caminho: str, indice: dict) -> None:
+    # Grava num temporário e troca de nome: quem consulta ao mesmo tempo nunca lê um índice pela metade
+    destino = caminho_indice(caminho)
+    temporario = f"{destino}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(indice, arquivo, separators=(',', ':'))
+    os.replace(temporario, destino)
+
+
+def _indexar(arquivo, indice: dict, inicio: int) -> int:
+    # Lê a partir de inicio só as linhas completas e devolve até onde indexou
+    intervalo = indice["intervalo"]
+    faixas = indice["faixas"]
+    faixa_do_minuto = {}  # "AAAA-MM-DDTHH:MM" + fuso -> faixa; uma conversão de data por minuto
+    nomes = {}  # b'ERROR' -> 'ERROR'
+    arquivo.seek(inicio)
+    base = inicio
+    resto = b''
+    while lido := arquivo.read(TAMANHO_BLOCO):
+        dados = resto + lido
+        corte = dados.rfind(b'\n') + 1  # a última linha pode estar sendo escrita: fica para depois
+        for encontrado in _CABECALHO.finditer(dados, 0, corte):
+            token, nivel = encontrado.groups()
+            posicao = base + encontrado.start()
+            # Segundos e microssegundos não mudam o minuto
+            chave = token[:16] + token[26:] if len(token) == 31 else token
+            faixa = faixa_do_minuto.get(chave)
+            if faixa is None:
+                if len(faixa_do_minuto) > 100_000:
+                    faixa_do_minuto.clear()
+                segundos = int(_momento(token).timestamp())
+                faixa = faixa_do_minuto[chave] = faixas.setdefault(str(segundos - segundos % intervalo), {})
+            nome = nomes.get(nivel)
+            if nome is None:
+                nome = nomes[nivel] = nivel.decode('ascii', errors='replace')
+            entrada = faixa.get(nome)
+            if entrada is None:
+                faixa[nome] = [posicao, posicao, 1, [posicao]]
+            else:
+                entrada[1] = posicao
+                entrada[2] += 1
+                if entrada[2] > LIMITE_POSICOES:
+                    entrada[3] = None  # faixa cheia: fica só o trecho do primeiro ao último
+                elif entrada[3] is not None:
+                    entrada[3].append(posicao)
+        resto = dados[corte:]
+        base += corte
+    return base
+
+
+def atualizar_indice(caminho: str, intervalo: int = INTERVALO) -> dict:
+    """
+    Lê só o que o log ganhou desde a última atualização e grava o índice ao lado do arquivo.
+    intervalo: tamanho da faixa de tempo, em segundos (múltiplo de 60).
+    """
+    if intervalo <= 0 or intervalo % 60:
+        raise ValueError(f"intervalo precisa ser múltiplo de 60 segundos, recebido {intervalo}")
+    indice = _carregar_indice(caminho, intervalo)
+    with open(caminho, 'rb') as arquivo:
+        tamanho = os.fstat(arquivo.fileno()).st_size
+        if tamanho < indice["tamanho"] or _assinatura(arquivo, indice["tamanho"]) != indice["assinatura"]:
+            indice = _indice_vazio(intervalo)
+        if tamanho == indice["tamanho"] and indice["tamanho"]:
+            return indice
+        indice["tamanho"] = _indexar(arquivo, indice, indice["tamanho"])
+        indice["assinatura"] = _assinatura(arquivo, indice["tamanho"])
+    _gravar_indice(caminho, indice)
+    return indice
+
+
+def _trechos(indice: dict, niveis: set[bytes], inicio: datetime | None, fim: datetime | None) -> list[tuple[int, int]]:
+    # Trechos [de, até) do arquivo onde começam os registros dos níveis pedidos no período
+    intervalo = indice["intervalo"]
+    chaves = sorted(int(chave) for chave in indice["faixas"])
+    primeiro = 0 if inicio is None else bisect_left(chaves, int(inicio.timestamp()) // intervalo * intervalo)
+    ultimo = len(chaves) if fim is None else bisect_right(chaves, int(fim.timestamp()))
+    nomes = {nivel.decode('ascii') for nivel in niveis}
+    trechos = []
+    for chave in chaves[primeiro:ultimo]:
+        for nivel, (de, ate, _, posicoes) in indice["faixas"][str(chave)].items():
+            if nivel not in nomes:
+                continue
+            if posicoes is not None:
+                trechos.extend((posicao, posicao + 1) for posicao in posicoes)
+            else:
+                trechos.append((de, ate + 1))
+    trechos.sort()
+    juntos = []
+    for de, ate in trechos:
+        if juntos and de <= juntos[-1][1] + DISTANCIA_JUNCAO:
+            juntos[-1][1] = max(juntos[-1][1], ate)
+        else:
+            juntos.append([de, ate])
+    return [(de, ate) for de, ate in juntos]
+
+
+def consultar(caminho: str, niveis: str | Iterable[str] = 'ERROR', inicio: datetime | str | None = None,
+              fim: datetime | str | None = None, intervalo: int = INTERVALO) -> Iterator[RegistroLog]:
+    """
+    Registros dos níveis pedidos com momento em [inicio, fim], na ordem do arquivo.
+    Atualiza o índice antes (só o trecho novo do log é lido) e depois lê apenas as posições indexadas.
+    """
+    indice = atualizar_indice(caminho, intervalo)
+    niveis = _niveis(niveis)
+    inicio, fim = _normalizar_momento(inicio), _normalizar_momento(fim)
+    padrao = _padrao_niveis(niveis)
+    with open(caminho, 'rb') as arquivo:
+        for de, ate in _trechos(indice, niveis, inicio, fim):
+            # Trechos pequenos (um registro) leem pouco além do próprio trecho
+            leitura = min(TAMANHO_BLOCO, ate - de + 8192)
+            yield from _filtrar(_registros(arquivo, padrao, de, ate, leitura), inicio, fim)
+
+
+def contar_por_nivel(caminho: str, intervalo: int = INTERVALO) -> dict[str, int]:
+    # Direto do índice, sem ler o log
+    contagem = {}
+    for faixa in atualizar_indice(caminho, intervalo)["faixas"].values():
+        for nivel, (_, _, quantidade, _) in faixa.items():
+            contagem[nivel] = contagem.get(nivel, 0) + quantidade
+    return contagem
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: lista de dicionários vs streaming vs índice
+#------------------------------------------------------
+
+def _filtrar_como_exercicio(caminho: str, nivel: str, inicio: datetime, fim: datetime) -> list[str]:
+    # O exercício 3 aplicado ao arquivo: cada linha vira um dicionário e o nível é testado um a um
+    mensagens = []
+    with open(caminho, encoding='utf-8', errors='replace') as arquivo:
+        for linha in arquivo:
+            partes = linha.split(' ', 2)
+            if len(partes) < 3 or not partes[0][:4].isdigit():
+                continue
+            log = {'timestamp': partes[0], 'level': partes[1], 'message': partes[2]}
+            if log['level'] == nivel and inicio <= datetime.fromisoformat(log['timestamp']) <= fim:
+                mensagens.append(log['message'])
+    return mensagens
+
+
+def benchmark(tamanho_mb: int = 200) -> None:
+    import random
+    import tempfile
+    import time
+    from datetime import timedelta, timezone
+
+    aleatorio = random.Random(5)
+    fuso = timezone(timedelta(hours=-3))
+    niveis = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+    pesos = [12, 80, 6, 1.5, 0.5]
+    mensagens = ["Chamando função 'extrair' com args () e kwargs {}", "Função 'transformar' retornou 1532",
+                 "Conexão com o banco reaproveitada do pool", "Timeout na requisição", "Falha na conexão"]
+    traceback = ("Traceback (most recent call last):\n"
+                 "  File \"log.py\", line 28, in wrapper\n"
+                 "ZeroDivisionError: division by zero\n")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'meus_logs.log')
+        momento = datetime(2025, 3, 1, tzinfo=fuso)
+
+        def escrever(megabytes: float) -> None:
+            nonlocal momento
+            with open(caminho, 'a', encoding='utf-8') as arquivo:
+                escritos = 0
+                while escritos < megabytes * 1024 * 1024:
+                    linhas = []
+                    for nivel in aleatorio.choices(niveis, pesos, k=10_000):
+                        momento += timedelta(microseconds=aleatorio.randint(1, 400_000))
+                        linhas.append(f"{momento.strftime('%Y-%m-%dT%H:%M:%S.%f%z')} {nivel} "
+                                      f"{aleatorio.choice(mensagens)} log.py {aleatorio.randint(1, 200)}\n")
+                        if nivel == 'ERROR' and aleatorio.random() < 0.1:
+                            linhas.append(traceback)
+                    escritos += arquivo.write(''.join(linhas))
+
+        escrever(tamanho_mb)
+        megabytes = os.path.getsize(caminho) / 1024 / 1024
+        primeiro = next(filtrar_logs(caminho, niveis)).momento
+        inicio = primeiro + (momento - primeiro) / 2
+        fim = inicio + timedelta(hours=2)
+        print(f"{megabytes:.0f} MB de log, de {primeiro:%d/%m %H:%M} a {momento:%d/%m %H:%M};"
+              f" consulta: ERROR entre {inicio:%d/%m %H:%M} e {fim:%d/%m %H:%M}")
+
+        def medir(descricao: str, funcao, lidos_mb: float | None = megabytes):
+            comeco = time.perf_counter()
+            resultado = funcao()
+            duracao = time.perf_counter() - comeco
+            vazao = f"{lidos_mb / duracao:8.1f} MB/s" if lidos_mb else " " * 13
+            print(f"{descricao:34s} | {duracao:7.3f}s | {vazao}"
+                  + (f" | {len(resultado)} registros" if isinstance(resultado, list) else ""))
+            return resultado
+
+        exercicio = medir("dicionários (exercício 3)", lambda: _filtrar_como_exercicio(caminho, 'ERROR', inicio, fim))
+        streaming = medir("filtrar_logs (streaming)", lambda: list(filtrar_logs(caminho, 'ERROR', inicio, fim)))
+        medir("atualizar_indice (1ª vez)", lambda: atualizar_indice(caminho))
+        tamanho_indice = os.path.getsize(caminho_indice(caminho)) / 1024 / 1024
+        indexado = medir("consultar (com índice)", lambda: list(consultar(caminho, 'ERROR', inicio, fim)), None)
+        medir("consultar, período de 1 minuto", lambda: list(consultar(caminho, 'ERROR', inicio,
+                                                                        inicio + timedelta(minutes=1))), None)
+        medir("consultar CRITICAL, tudo", lambda: list(consultar(caminho, 'CRITICAL')), None)
+        print(f"índice: {tamanho_indice:.1f} MB | mesmo resultado:"
+              f" {[r.posicao for r in streaming] == [r.posicao for r in indexado]}"
+              f" {len(exercicio) == len(indexado)}")
+
+        escrever(5)
+        medir("atualizar_indice (+5 MB no log)", lambda: atualizar_indice(caminho), 5)
+        print(f"contagem por nível: {contar_por_nivel(caminho)}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,80 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import consulta_logs
+from consulta_logs import atualizar_indice, caminho_indice, consultar, contar_por_nivel, filtrar_logs
+
+FUSO = timezone(timedelta(hours=-3))
+INICIO = datetime(2025, 3, 7, 23, 0, tzinfo=FUSO)
+NIVEIS = ["INFO", "DEBUG", "WARNING", "ERROR", "INFO", "CRITICAL"]
+
+
+def _linhas(n: int, deslocamento: int = 0) -> list[str]:
+    linhas = []
+    for i in range(deslocamento, deslocamento + n):
+        momento = (INICIO + timedelta(seconds=7 * i)).isoformat(timespec='microseconds').replace('-03:00', '-0300')
+        nivel = NIVEIS[i % len(NIVEIS)]
+        linhas.append(f"{momento} {nivel} Mensagem {i} com ERROR no texto usando logger.py {i}\n")
+        if nivel == "ERROR":
+            linhas.append(f"Traceback (most recent call last):\n  ValueError: falha {i}\n")
+    return linhas
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    # Blocos pequenos para que registros e tracebacks caiam na divisa entre leituras
+    monkeypatch.setattr(consulta_logs, "TAMANHO_BLOCO", 256)
+    caminho = tmp_path / "app.log"
+    caminho.write_text("".join(_linhas(300)), encoding="utf-8")
+    return str(caminho)
+
+
+def _esperado(linhas_n: int, nivel: str, inicio: datetime, fim: datetime) -> list[int]:
+    return [i for i in range(linhas_n) if NIVEIS[i % len(NIVEIS)] == nivel
+            and inicio <= INICIO + timedelta(seconds=7 * i) <= fim]
+
+
+def test_filtrar_e_consultar_devolvem_os_mesmos_registros(log):
+    inicio, fim = INICIO + timedelta(minutes=3), INICIO + timedelta(minutes=17, seconds=30)
+    esperado = _esperado(300, "ERROR", inicio, fim)
+
+    por_varredura = list(filtrar_logs(log, "error", inicio, fim))
+    por_indice = list(consultar(log, "ERROR", inicio.isoformat(), fim.isoformat()))
+    assert [r.linha for r in por_varredura] == [r.linha for r in por_indice] == esperado
+    assert por_indice == por_varredura
+
+    registro = por_indice[0]
+    assert (registro.nivel, registro.arquivo) == ("ERROR", "logger.py")
+    assert registro.mensagem.startswith(f"Mensagem {registro.linha} com ERROR no texto usando\nTraceback")
+    with open(log, 'rb') as arquivo:
+        arquivo.seek(registro.posicao)
+        assert arquivo.readline().decode().startswith(registro.momento.isoformat()[:19])
+
+
+def test_varios_niveis_e_contagem(log):
+    assert len(list(consultar(log, ["warning", "critical"]))) == 100
+    assert contar_por_nivel(log) == {"INFO": 100, "DEBUG": 50, "WARNING": 50, "ERROR": 50, "CRITICAL": 50}
+
+
+def test_indice_incremental_e_rotacao(log):
+    atualizar_indice(log)
+    tamanho = os.path.getsize(log)
+    with open(log, "a", encoding="utf-8") as arquivo:
+        arquivo.writelines(_linhas(60, deslocamento=300))
+    indice = atualizar_indice(log)
+    assert indice["tamanho"] == os.path.getsize(log) > tamanho
+    assert contar_por_nivel(log)["ERROR"] == 60
+
+    # Log rotacionado: o começo mudou, o índice é refeito do zero
+    with open(log, "w", encoding="utf-8") as arquivo:
+        arquivo.writelines(_linhas(12, deslocamento=1000))
+    assert contar_por_nivel(log)["ERROR"] == 2
+    assert [r.linha for r in consultar(log, "ERROR")] == [1005, 1011]
+    assert os.path.exists(caminho_indice(log))
+
+
+def test_intervalo_invalido(log):
+    with pytest.raises(ValueError):
+        atualizar_indice(log, intervalo=90)
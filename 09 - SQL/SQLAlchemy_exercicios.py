@@ -7,8 +7,9 @@
 '''
 
 # Importando as bibliotecas necessárias	
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, func
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy import Column, Integer, String, ForeignKey, func
+from sqlalchemy.orm import declarative_base, relationship
+from conexao import obter_banco
 
 # Criando a base abstrata
 Base = declarative_base()
@@ -37,12 +38,13 @@ class Produto(Base):
 #Cria o Banco de Dados e as Tabelas
 
 # Criando a engine de conexão com o banco de dados
-#engine = create_engine('sqlite:///:memory:', echo=True)
-engine = create_engine('sqlite:///desafio.db', echo=True)
+# obter_banco cria o engine, o pool e a fábrica de sessões uma única vez por URL
+#banco = obter_banco('sqlite:///:memory:', echo=True)
+banco = obter_banco('sqlite:///desafio.db', echo=True)
+engine = banco.engine
 
 Base.metadata.create_all(engine)
-Session = sessionmaker(bind=engine)
-session = Session()
+session = banco.Session()
 
 Forncedores = [
 Fornecedor(nome = "Fornecedor A", telefone = "123456789", email = "contato@a.com", endereco = "Endereço A"),
@@ -80,8 +82,8 @@ JOIN fornecedores ON produtos.fornecedor_id = fornecedores.id
 GROUP BY fornecedores.nome;
 '''
 
-Session = sessionmaker(bind=engine)
-session = Session()
+# Reaproveita a mesma fábrica de sessões (e o mesmo pool) em vez de criar outro sessionmaker
+session = banco.Session()
 
 resultado = session.query(
     Fornecedor.nome,
@@ -91,4 +93,7 @@ resultado = session.query(
 
 for nome,total_preco in resultado:
     print(f"Fornecedor: {nome} - Total de Preço: {total_preco}")
+
+# Métricas do pool (checkouts, conexões criadas, esperas...)
+print(banco.metricas.resumo())
 # %%
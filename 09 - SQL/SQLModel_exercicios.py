@@ -7,49 +7,18 @@
 
 #%%
 # Importando as bibliotecas necessárias
-from sqlmodel import Field, SQLModel, Session, create_engine, select, Relationship
-from typing import Optional, List
+from sqlmodel import Session, select
 from sqlalchemy import func
 
-# Criando os modelos (SQLModel substitui a Base e as classes que herdam dela)
-class Fornecedor(SQLModel, table=True):
-    __tablename__ = 'fornecedores'
-    
-    id: Optional[int] = Field(default=None, primary_key=True)
-    nome: str
-    telefone: Optional[str] = None
-    email: Optional[str] = None
-    endereco: Optional[str] = None
-    
-    # Relacionamento reverso - não é armazenado no BD, apenas para acesso em Python
-    produtos: List["Produto"] = Relationship(back_populates="fornecedor")
-
-
-class Produto(SQLModel, table=True):
-    __tablename__ = 'produtos'
-    
-    id: Optional[int] = Field(default=None, primary_key=True)
-    nome: str
-    descricao: Optional[str] = None
-    preco: Optional[int] = None
-    
-    # Campo de chave estrangeira
-    fornecedor_id: Optional[int] = Field(default=None, foreign_key="fornecedores.id")
-    
-    # Relacionamento com Fornecedor
-    fornecedor: Optional[Fornecedor] = Relationship(back_populates="produtos")
-
-# Resolvendo referências circulares
-SQLModel.update_forward_refs()
+# Os modelos Fornecedor e Produto são declarados uma única vez no pacote modelos
+# (modelos/produto.py); importar o pacote não cria engine nem tabelas
+from modelos import Fornecedor, Produto, init_db
 
 #%%
 # Cria o Banco de Dados e as Tabelas
 
-# Criando a engine de conexão com o banco de dados
-engine = create_engine('sqlite:///desafio.db', echo=True)
-
-# Criando todas as tabelas
-SQLModel.metadata.create_all(engine)
+# Criando a engine de conexão e todas as tabelas, de forma explícita
+engine = init_db('sqlite:///desafio.db', echo=True)
 
 # Criando uma sessão
 with Session(engine) as session:
@@ -136,6 +105,13 @@ with Session(engine) as session:
             print(f"    - {produto.nome}: R${produto.preco}")
         print("-" * 40)
 
+#%%
+# O mesmo relatório sem um SELECT por fornecedor.produtos: uma consulta agrupada + uma listagem
+from relatorios import imprimir_relatorio, relatorio_fornecedores
+
+with Session(engine) as session:
+    imprimir_relatorio(relatorio_fornecedores(session))
+
 #%%
 # Exemplo de atualização de dados
 with Session(engine) as session:
@@ -153,4 +129,13 @@ with Session(engine) as session:
     produto_atualizado = session.exec(
         select(Produto).where(Produto.id == produto.id)
     ).one()
-    print(f"Novo preço do {produto_atualizado.nome}: {produto_atualizado.preco}")
\ No newline at end of file
+    print(f"Novo preço do {produto_atualizado.nome}: {produto_atualizado.preco}")
+
+#%%
+# Atualização em lote: uma instrução por lote, em vez de .one() + commit + nova consulta por produto
+from atualizacao_lote import atualizar_precos
+
+with Session(engine) as session:
+    resultado = atualizar_precos(session, {1: 150, 2: 250, 3: 350})
+    session.commit()
+    print(f"Produtos atualizados: {resultado['afetados']}")
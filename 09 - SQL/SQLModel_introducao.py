@@ -17,7 +17,8 @@ quanto do Pydantic de forma transparente para o usuário.
 # Instalação: pip install sqlmodel
 
 # Importações básicas
-from sqlmodel import SQLModel, Field, Session, select, create_engine
+from sqlmodel import SQLModel, Field, Session, select, create_engine, Relationship
+from pydantic import validator
 from typing import Optional, List
 import datetime
 
@@ -45,6 +46,10 @@ class Usuario(SQLModel, table=True):
     ativo: bool = True
     data_criacao: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
     
+    # Relacionamento reverso (ver seção 3): Endereco é referenciado pelo nome,
+    # então pode ser declarado depois
+    enderecos: List["Endereco"] = Relationship(back_populates="usuario")
+    
     # O SQLModel herda do Pydantic, então todas as validações do Pydantic funcionam
     # Por exemplo, poderíamos adicionar:
     # email: str = Field(unique=True, regex=r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
@@ -72,17 +77,8 @@ class Endereco(SQLModel, table=True):
     usuario: Optional["Usuario"] = Relationship(back_populates="enderecos")
 
 
-# Atualiza a classe Usuario para incluir o relacionamento reverso
-class Usuario(SQLModel, table=True):
-    id: Optional[int] = Field(default=None, primary_key=True)
-    nome: str
-    email: str = Field(unique=True)
-    idade: Optional[int] = None
-    ativo: bool = True
-    data_criacao: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
-    
-    # Relacionamento reverso
-    enderecos: List["Endereco"] = Relationship(back_populates="usuario")
+# O relacionamento reverso (Usuario.enderecos) já está na declaração do Usuario acima:
+# declarar a classe de novo registraria a tabela "usuario" duas vezes no mesmo metadata
 
 
 # Note que precisamos atualizar as referências circulares:
@@ -97,11 +93,15 @@ A criação de engines e tabelas no SQLModel é muito similar ao SQLAlchemy,
 mas com uma sintaxe mais simplificada.
 """
 
-# Criando o engine
+# Criando o engine (create_engine não abre conexão: ela só é aberta no primeiro uso)
 engine = create_engine("sqlite:///database.db", echo=True)
 
-# Criar todas as tabelas
-SQLModel.metadata.create_all(engine)
+# Criar todas as tabelas, de forma explícita (e não como efeito colateral do import)
+def init_db():
+    SQLModel.metadata.create_all(engine)
+
+# Daqui em diante, os exemplos que acessam o banco ficam dentro de if __name__ == "__main__":
+# eles rodam ao executar o arquivo, mas importar este módulo não cria tabelas nem insere dados
 
 
 #------------------------------------------------------
@@ -112,31 +112,34 @@ O SQLModel usa o mesmo sistema de sessões do SQLAlchemy, mas com uma API
 mais consistente e intuitiva.
 """
 
-# Inserir dados
-with Session(engine) as session:
-    # Criando um novo usuário
-    novo_usuario = Usuario(nome="Maria Silva", email="maria@exemplo.com", idade=30)
-    
-    # Adicionando à sessão
-    session.add(novo_usuario)
-    
-    # Commit automático ao sair do bloco with (sem exceções)
-    # Também faz rollback automático em caso de exceção
-    
-# Inserir múltiplos registros
-with Session(engine) as session:
-    usuarios = [
-        Usuario(nome="João Santos", email="joao@exemplo.com", idade=25),
-        Usuario(nome="Ana Oliveira", email="ana@exemplo.com", idade=28)
-    ]
-    
-    # Adicionando múltiplos registros
-    session.add_all(usuarios)
-    session.commit()
-    
-    # Depois de commit, os IDs são preenchidos automaticamente
-    for usuario in usuarios:
-        print(f"Usuário {usuario.nome} tem ID {usuario.id}")
+if __name__ == "__main__":
+    init_db()
+
+    # Inserir dados
+    with Session(engine) as session:
+        # Criando um novo usuário
+        novo_usuario = Usuario(nome="Maria Silva", email="maria@exemplo.com", idade=30)
+
+        # Adicionando à sessão
+        session.add(novo_usuario)
+
+        # Commit automático ao sair do bloco with (sem exceções)
+        # Também faz rollback automático em caso de exceção
+
+    # Inserir múltiplos registros
+    with Session(engine) as session:
+        usuarios = [
+            Usuario(nome="João Santos", email="joao@exemplo.com", idade=25),
+            Usuario(nome="Ana Oliveira", email="ana@exemplo.com", idade=28)
+        ]
+
+        # Adicionando múltiplos registros
+        session.add_all(usuarios)
+        session.commit()
+
+        # Depois de commit, os IDs são preenchidos automaticamente
+        for usuario in usuarios:
+            print(f"Usuário {usuario.nome} tem ID {usuario.id}")
 
 
 #------------------------------------------------------
@@ -147,28 +150,29 @@ No SQLModel, as consultas utilizam a nova API de consulta do SQLAlchemy 2.0,
 com uma sintaxe mais limpa e intuitiva.
 """
 
-# Consulta básica
-with Session(engine) as session:
-    # Selecionar todos os usuários
-    statement = select(Usuario)
-    usuarios = session.exec(statement).all()
-    
-    # Filtragem simples
-    statement = select(Usuario).where(Usuario.nome == "Maria Silva")
-    maria = session.exec(statement).first()
-    
-    # Múltiplas condições
-    statement = select(Usuario).where(
-        Usuario.ativo == True,
-        Usuario.idade > 25
-    ).order_by(Usuario.nome)
-    usuarios_ativos = session.exec(statement).all()
-    
-    # Joins
-    statement = select(Usuario, Endereco).join(Endereco)
-    resultados = session.exec(statement).all()
-    for usuario, endereco in resultados:
-        print(f"{usuario.nome} mora em {endereco.cidade}-{endereco.estado}")
+if __name__ == "__main__":
+    # Consulta básica
+    with Session(engine) as session:
+        # Selecionar todos os usuários
+        statement = select(Usuario)
+        usuarios = session.exec(statement).all()
+
+        # Filtragem simples
+        statement = select(Usuario).where(Usuario.nome == "Maria Silva")
+        maria = session.exec(statement).first()
+
+        # Múltiplas condições
+        statement = select(Usuario).where(
+            Usuario.ativo == True,
+            Usuario.idade > 25
+        ).order_by(Usuario.nome)
+        usuarios_ativos = session.exec(statement).all()
+
+        # Joins
+        statement = select(Usuario, Endereco).join(Endereco)
+        resultados = session.exec(statement).all()
+        for usuario, endereco in resultados:
+            print(f"{usuario.nome} mora em {endereco.cidade}-{endereco.estado}")
 
 
 #------------------------------------------------------
@@ -179,40 +183,41 @@ O SQLModel combina a simplicidade do Pydantic para atualizações parciais
 com o poder do SQLAlchemy para operações de banco de dados.
 """
 
-# Atualização de registro
-with Session(engine) as session:
-    # Buscar o usuário
-    statement = select(Usuario).where(Usuario.email == "maria@exemplo.com")
-    usuario = session.exec(statement).one()
-    
-    # Atualizar atributos
-    usuario.idade = 31
-    
-    # Salvar as alterações
-    session.add(usuario)
-    session.commit()
-    
-    # Verificar a atualização
-    usuario_atualizado = session.exec(
-        select(Usuario).where(Usuario.id == usuario.id)
-    ).one()
-    print(f"Idade atualizada: {usuario_atualizado.idade}")
-
-# Exclusão de registro
-with Session(engine) as session:
-    # Buscar o usuário a ser excluído
-    statement = select(Usuario).where(Usuario.email == "joao@exemplo.com")
-    usuario = session.exec(statement).one()
-    
-    # Excluir o usuário
-    session.delete(usuario)
-    session.commit()
-    
-    # Verificar a exclusão
-    resultado = session.exec(
-        select(Usuario).where(Usuario.email == "joao@exemplo.com")
-    ).first()
-    print(f"Usuário excluído? {'Sim' if resultado is None else 'Não'}")
+if __name__ == "__main__":
+    # Atualização de registro
+    with Session(engine) as session:
+        # Buscar o usuário
+        statement = select(Usuario).where(Usuario.email == "maria@exemplo.com")
+        usuario = session.exec(statement).one()
+
+        # Atualizar atributos
+        usuario.idade = 31
+
+        # Salvar as alterações
+        session.add(usuario)
+        session.commit()
+
+        # Verificar a atualização
+        usuario_atualizado = session.exec(
+            select(Usuario).where(Usuario.id == usuario.id)
+        ).one()
+        print(f"Idade atualizada: {usuario_atualizado.idade}")
+
+    # Exclusão de registro
+    with Session(engine) as session:
+        # Buscar o usuário a ser excluído
+        statement = select(Usuario).where(Usuario.email == "joao@exemplo.com")
+        usuario = session.exec(statement).one()
+
+        # Excluir o usuário
+        session.delete(usuario)
+        session.commit()
+
+        # Verificar a exclusão
+        resultado = session.exec(
+            select(Usuario).where(Usuario.email == "joao@exemplo.com")
+        ).first()
+        print(f"Usuário excluído? {'Sim' if resultado is None else 'Não'}")
 
 
 #------------------------------------------------------
@@ -274,13 +279,10 @@ def criar_usuario(usuario_data: UsuarioCreate) -> UsuarioRead:
         session.refresh(db_usuario)
         
         # Converte para o formato de resposta (sem a senha_hash)
-        return UsuarioRead(
-            id=db_usuario.id,
-            nome=db_usuario.nome,
-            email=db_usuario.email,
-            idade=db_usuario.idade,
-            ativo=db_usuario.ativo,
-            data_criacao=db_usuario.data_criacao
+        # Os dados acabaram de sair do banco, então não precisam ser validados de novo:
+        # model_construct monta o UsuarioRead sem passar pelo Pydantic (ver leitura_rapida.py)
+        return UsuarioRead.model_construct(
+            **{campo: getattr(db_usuario, campo) for campo in UsuarioRead.model_fields}
         )
 
 
@@ -329,11 +331,20 @@ operações de banco de dados de forma integrada.
 
 # Exemplo de integração com FastAPI
 """
-from fastapi import FastAPI, HTTPException, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Request
 from sqlmodel import Session, select
 from typing import List
+from servico_usuarios import ServicoUsuarios
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Um único ServicoUsuarios (e um único pool de processos) para a aplicação inteira
+    with ServicoUsuarios(engine) as servico:
+        app.state.servico_usuarios = servico
+        yield
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Dependência para obter uma sessão do banco
 def get_session():
@@ -363,6 +374,14 @@ def create_user(usuario: UsuarioCreate, session: Session = Depends(get_session))
     session.refresh(db_usuario)
     return db_usuario  # Conversão automática para UsuarioRead
 
+# Para cadastros em massa, o SELECT de e-mail e o commit por usuário viram um gargalo.
+# O ServicoUsuarios (servico_usuarios.py) faz um SELECT e um INSERT por lote e calcula
+# os hashes das senhas num pool de processos. O serviço é criado uma vez, no lifespan:
+# subir um pool de processos a cada requisição custaria mais que o próprio cadastro
+@app.post("/usuarios/lote/")
+def create_users(usuarios: List[UsuarioCreate], request: Request):
+    return request.app.state.servico_usuarios.ingerir(usuarios)
+
 # Rota para buscar todos os usuários
 @app.get("/usuarios/", response_model=List[UsuarioRead])
 def read_users(session: Session = Depends(get_session)):
@@ -370,6 +389,17 @@ def read_users(session: Session = Depends(get_session)):
     return usuarios  # Conversão automática para List[UsuarioRead]
 """
 
+# As rotas acima usam Session síncrona: enquanto o banco responde, o event loop fica bloqueado.
+# Versão assíncrona (engine com aiosqlite e AsyncSession, ver banco_async.py):
+"""
+from banco_async import get_session, listar_produtos
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+@app.get("/produtos/")
+async def read_produtos(session: AsyncSession = Depends(get_session)):
+    return await listar_produtos(session)
+"""
+
 
 #------------------------------------------------------
 # 11. Boas Práticas e Dicas
@@ -400,20 +430,23 @@ class Produto(SQLModel, table=True):
         return v
 
 # 2. Use transações explícitas para operações complexas
-with Session(engine) as session:
-    # Inicia uma transação explícita
-    with session.begin():
-        # Múltiplas operações que devem ser atômicas
-        categoria = Categoria(nome="Eletrônicos")
-        session.add(categoria)
-        
-        # A sessão usará refresh para obter o ID gerado
-        produtos = [
-            Produto(nome="Smartphone", preco=999.99, categoria=categoria),
-            Produto(nome="Notebook", preco=1999.99, categoria=categoria)
-        ]
-        session.add_all(produtos)
-        # O commit ocorre automaticamente ao sair do bloco session.begin()
+if __name__ == "__main__":
+    init_db()
+
+    with Session(engine) as session:
+        # Inicia uma transação explícita
+        with session.begin():
+            # Múltiplas operações que devem ser atômicas
+            categoria = Categoria(nome="Eletrônicos")
+            session.add(categoria)
+
+            # A sessão usará refresh para obter o ID gerado
+            produtos = [
+                Produto(nome="Smartphone", preco=999.99, categoria=categoria),
+                Produto(nome="Notebook", preco=1999.99, categoria=categoria)
+            ]
+            session.add_all(produtos)
+            # O commit ocorre automaticamente ao sair do bloco session.begin()
 
 # 3. Trabalhe com migrações desde o início do projeto
 # É mais fácil implementar migrações no início do que adaptar um projeto existente
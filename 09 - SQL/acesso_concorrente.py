@@ -0,0 +1,334 @@
+"""
+Acesso concorrente ao SQLite: vários leitores, um único escritor.
+
+O SQLite aceita um escritor por vez. Com várias threads abrindo sessões e fazendo commit por conta
+própria, as escritas disputam a trava do arquivo: quem perde espera até o busy timeout e pode
+terminar em "database is locked", e cada commit paga o próprio fsync. O AcessoConcorrente:
+
+- escritas: enviadas para uma fila e executadas por uma única thread escritora, que junta as
+  operações que chegaram enquanto ela estava ocupada e faz um único commit para o grupo (group
+  commit). Cada operação roda dentro de um SAVEPOINT: se uma falha, só ela é desfeita e só quem
+  a enviou recebe a exceção. O resultado só é entregue depois do commit
+- leituras: pool de conexões query_only, com o banco em WAL (leitores não bloqueiam o escritor
+  nem são bloqueados por ele)
+
+Uso:
+
+    with AcessoConcorrente('sqlite:///desafio.db') as acesso:
+        novo_id = acesso.executar_escrita(
+            lambda conn: conn.execute(insert(Produto.__table__), {"nome": "X", "preco": 10}).inserted_primary_key[0]
+        )
+        with acesso.leitura() as conn:
+            conn.execute(select(Produto)).all()
+"""
+
+#%%
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from loguru import logger
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, sessionmaker
+from sqlmodel import SQLModel
+
+from conexao import criar_engine
+
+_PARAR = object()
+
+
+def _falhar(futuro: Future, erro: Exception) -> None:
+    # Entrega o erro a quem espera o futuro, esteja ele pendente ou já em execução
+    if futuro.done():
+        return
+    if futuro.running() or futuro.set_running_or_notify_cancel():
+        futuro.set_exception(erro)
+
+
+class AcessoConcorrente:
+    def __init__(self, url: str, leitores: int = 4, tamanho_grupo: int = 256, tamanho_fila: int = 10_000):
+        self.url = url
+        self.tamanho_grupo = tamanho_grupo
+        # Fila limitada: se o escritor não der conta, quem escreve espera em vez de acumular memória
+        self._fila: queue.Queue = queue.Queue(maxsize=tamanho_fila)
+        # Protege a decisão "ainda aceita escritas?" junto com o put, para nada entrar na fila
+        # depois que o escritor parou de consumir
+        self._lock_fila = threading.Lock()
+        self._fechado = False
+        # Contadores: só a thread escritora altera, resumo() lê de qualquer thread
+        self._lock_contadores = threading.Lock()
+        self.grupos = 0
+        self.operacoes = 0
+
+        self.engine_escrita = criar_engine(url, perfil_sqlite='oltp', pool_size=1, max_overflow=0)
+        # BEGIN IMMEDIATE: o escritor pega a trava de escrita no início da transação, e o driver
+        # sqlite3 deixa de abrir transações por conta própria (senão o SAVEPOINT não funciona)
+        event.listen(self.engine_escrita, 'connect', self._desligar_transacao_implicita)
+        event.listen(self.engine_escrita, 'begin', self._begin_immediate)
+        # A conexão do escritor é aberta já, para o banco estar em WAL antes do primeiro leitor
+        self.engine_escrita.connect().close()
+
+        self.engine_leitura = criar_engine(url, perfil_sqlite='somente_leitura', pool_size=leitores, max_overflow=0)
+
+        self._escritor = threading.Thread(target=self._laco_escritor, name='escritor-sqlite', daemon=True)
+        self._escritor.start()
+
+    def __enter__(self) -> "AcessoConcorrente":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+    @staticmethod
+    def _desligar_transacao_implicita(dbapi_connection, connection_record) -> None:
+        dbapi_connection.isolation_level = None
+
+    @staticmethod
+    def _begin_immediate(conn: Connection) -> None:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    #------------------------------------------------------
+    # Escrita
+    #------------------------------------------------------
+
+    def escrever(self, operacao: Callable[[Connection], Any]) -> Future:
+        # A operação recebe a Connection do escritor; não deve fazer commit nem rollback
+        futuro: Future = Future()
+        with self._lock_fila:
+            # Sem o escritor ninguém consome a fila: o futuro nunca seria resolvido e
+            # executar_escrita(timeout=None) ficaria parado para sempre
+            if self._fechado or not self._escritor.is_alive():
+                raise RuntimeError("AcessoConcorrente fechado: o escritor não está mais rodando")
+            self._fila.put((operacao, futuro))
+        return futuro
+
+    def executar_escrita(self, operacao: Callable[[Connection], Any], timeout: float | None = None) -> Any:
+        return self.escrever(operacao).result(timeout)
+
+    def _proximo_grupo(self) -> list:
+        grupo = [self._fila.get()]  # bloqueia até chegar alguma escrita
+        while len(grupo) < self.tamanho_grupo:
+            try:
+                grupo.append(self._fila.get_nowait())
+            except queue.Empty:
+                break
+        return grupo
+
+    def _laco_escritor(self) -> None:
+        grupo: list = []
+        try:
+            with self.engine_escrita.connect() as conn:
+                while True:
+                    grupo = self._proximo_grupo()
+                    parar = any(item is _PARAR for item in grupo)
+                    grupo = [item for item in grupo if item is not _PARAR]
+                    if grupo:
+                        self._executar_grupo(conn, grupo)
+                    if parar:
+                        return
+        finally:
+            # Parada normal ou morte do escritor: ninguém mais consome a fila. Falha o que ficou
+            # pendente e passa a recusar escritas novas
+            erro = RuntimeError("O escritor do AcessoConcorrente parou antes de executar a escrita")
+            for _, futuro in grupo:
+                _falhar(futuro, erro)
+            # Esvazia antes de pegar a trava: quem a segura pode estar parado no put da fila cheia
+            while not self._lock_fila.acquire(timeout=0.05):
+                self._descartar_fila(erro)
+            try:
+                self._fechado = True
+            finally:
+                self._lock_fila.release()
+            self._descartar_fila(erro)
+
+    def _descartar_fila(self, erro: Exception) -> None:
+        while True:
+            try:
+                item = self._fila.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _PARAR:
+                _falhar(item[1], erro)
+
+    def _executar_grupo(self, conn: Connection, grupo: list) -> None:
+        resultados = []
+        try:
+            with conn.begin():
+                for operacao, futuro in grupo:
+                    if not futuro.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        with conn.begin_nested():
+                            resultados.append((futuro, operacao(conn), None))
+                    except Exception as e:
+                        resultados.append((futuro, None, e))
+        except Exception as e:
+            # Falha no BEGIN IMMEDIATE (ex.: "database is locked") ou no commit: nada do grupo foi
+            # gravado. Todas as operações do grupo recebem o erro, inclusive as que nem começaram,
+            # senão quem espera o resultado ficaria parado para sempre
+            logger.exception(f"Falha no commit de um grupo de {len(grupo)} escritas: {e}")
+            for _, futuro in grupo:
+                _falhar(futuro, e)
+            return
+        with self._lock_contadores:
+            self.grupos += 1
+            self.operacoes += len(resultados)
+        for futuro, resultado, erro in resultados:
+            if erro is None:
+                futuro.set_result(resultado)
+            else:
+                futuro.set_exception(erro)
+
+    #------------------------------------------------------
+    # Leitura
+    #------------------------------------------------------
+
+    @contextmanager
+    def leitura(self) -> Iterator[Connection]:
+        with self.engine_leitura.connect() as conn:
+            yield conn
+
+    @contextmanager
+    def sessao_leitura(self) -> Iterator[Session]:
+        with Session(self.engine_leitura) as session:
+            yield session
+
+    def resumo(self) -> dict:
+        with self._lock_contadores:
+            grupos, operacoes = self.grupos, self.operacoes
+        return {
+            "grupos": grupos,
+            "operacoes": operacoes,
+            "operacoes_por_commit": round(operacoes / grupos, 1) if grupos else 0.0,
+            "fila": self._fila.qsize(),
+            "pool_leitura": self.engine_leitura.pool.status(),
+        }
+
+    def fechar(self) -> None:
+        with self._lock_fila:
+            ja_fechado, self._fechado = self._fechado, True
+            if not ja_fechado and self._escritor.is_alive():
+                self._fila.put(_PARAR)  # as escritas já enfileiradas são executadas antes de parar
+        self._escritor.join()
+        self.engine_escrita.dispose()
+        self.engine_leitura.dispose()
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: carga mista (80% leituras, 20% escritas) com várias threads
+#------------------------------------------------------
+"""
+Cada thread alterna leituras (produto por id e total de um fornecedor) e escritas (novo produto ou
+novo preço), cada escrita com commit próprio, como numa requisição de API.
+
+- sessões ingênuas: sessionmaker sobre um engine com a configuração padrão do SQLite
+- sessões + WAL: o mesmo, com o perfil oltp (mostra quanto do ganho vem só do WAL)
+- leitores/escritor: o AcessoConcorrente
+"""
+
+def _operacoes(n: int, n_produtos: int, semente: int) -> list[tuple[str, int]]:
+    aleatorio = random.Random(semente)
+    return [("escrita" if aleatorio.random() < 0.2 else "leitura", aleatorio.randint(1, n_produtos)) for _ in range(n)]
+
+
+def _rodar_threads(threads: int, trabalhador: Callable[[int], int]) -> tuple[float, int]:
+    erros = [0] * threads
+
+    def executar(indice: int) -> None:
+        erros[indice] = trabalhador(indice)
+
+    inicio = time.perf_counter()
+    grupo = [threading.Thread(target=executar, args=(i,)) for i in range(threads)]
+    for thread in grupo:
+        thread.start()
+    for thread in grupo:
+        thread.join()
+    return time.perf_counter() - inicio, sum(erros)
+
+
+def benchmark(threads: int = 8, operacoes_por_thread: int = 500, n_produtos: int = 10_000) -> None:
+    from sqlalchemy import func
+    from sqlalchemy.exc import OperationalError
+    from modelos import Fornecedor, Produto
+
+    def preparar(url: str) -> None:
+        engine = criar_engine(url)
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Fornecedor.__table__), [{"nome": f"Fornecedor {i}"} for i in range(1, 101)])
+            conn.execute(insert(Produto.__table__),
+                         [{"nome": f"Produto {i}", "preco": i % 1000, "fornecedor_id": i % 100 + 1}
+                          for i in range(1, n_produtos + 1)])
+            conn.exec_driver_sql("CREATE INDEX ix_produtos_fornecedor ON produtos (fornecedor_id)")
+        engine.dispose()
+
+    def ler(conn: Connection | Session, produto_id: int) -> None:
+        conn.execute(select(Produto.nome, Produto.preco).where(Produto.id == produto_id)).first()
+        conn.execute(select(func.sum(Produto.preco)).where(Produto.fornecedor_id == produto_id % 100 + 1)).scalar()
+
+    def escrever(conn: Connection | Session, produto_id: int) -> None:
+        if produto_id % 2:
+            conn.execute(update(Produto).where(Produto.id == produto_id).values(preco=produto_id % 500))
+        else:
+            conn.execute(insert(Produto.__table__), {"nome": f"Novo {produto_id}", "preco": 1, "fornecedor_id": 1})
+
+    cargas = [_operacoes(operacoes_por_thread, n_produtos, semente) for semente in range(threads)]
+    total = threads * operacoes_por_thread
+    print(f"{threads} threads x {operacoes_por_thread} operações (80% leituras, 20% escritas)")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for descricao, perfil in [("sessões ingênuas", None), ("sessões + WAL", 'oltp')]:
+            url = f"sqlite:///{os.path.join(pasta, f'sessoes_{perfil}.db')}"
+            preparar(url)
+            engine = criar_engine(url, perfil_sqlite=perfil, pool_size=threads)
+            Sessao = sessionmaker(bind=engine)
+
+            def trabalhador(indice: int) -> int:
+                erros = 0
+                for tipo, produto_id in cargas[indice]:
+                    try:
+                        with Sessao() as session:
+                            if tipo == "leitura":
+                                ler(session, produto_id)
+                            else:
+                                escrever(session, produto_id)
+                                session.commit()
+                    except OperationalError:
+                        erros += 1  # database is locked
+                return erros
+
+            duracao, erros = _rodar_threads(threads, trabalhador)
+            print(f"{descricao:18s} | {duracao:6.2f}s | {total / duracao:7.0f} operações/s | {erros} erros")
+            engine.dispose()
+
+        url = f"sqlite:///{os.path.join(pasta, 'concorrente.db')}"
+        preparar(url)
+        with AcessoConcorrente(url, leitores=threads) as acesso:
+            def trabalhador(indice: int) -> int:
+                erros = 0
+                for tipo, produto_id in cargas[indice]:
+                    try:
+                        if tipo == "leitura":
+                            with acesso.leitura() as conn:
+                                ler(conn, produto_id)
+                        else:
+                            acesso.executar_escrita(lambda conn, produto_id=produto_id: escrever(conn, produto_id))
+                    except OperationalError:
+                        erros += 1
+                return erros
+
+            duracao, erros = _rodar_threads(threads, trabalhador)
+            print(f"{'leitores/escritor':18s} | {duracao:6.2f}s | {total / duracao:7.0f} operações/s | {erros} erros"
+                  f" | {acesso.resumo()['operacoes_por_commit']} escritas por commit")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,190 @@
+"""
+Atualizações em lote e upsert (INSERT ... ON CONFLICT DO UPDATE).
+
+Nos exercícios, cada atualização faz três idas ao banco: busca o registro com .one(), altera,
+faz add + commit e busca de novo para conferir. Para milhares de mudanças de preço isso vira
+milhares de round trips. Aqui cada lote vai ao banco em uma única instrução:
+
+- atualizar_em_lote: UPDATE ... WHERE id = ? preparado uma vez e executado para o lote inteiro
+  (executemany); serve para mudar colunas de registros que já existem
+- upsert: INSERT ... VALUES (...), (...) ON CONFLICT (id) DO UPDATE, para registros completos que
+  podem ou não existir (SQLite e PostgreSQL). Nos outros dialetos busca as chaves que já existem e
+  faz um INSERT e um UPDATE em lote
+
+As funções aceitam Session ou Connection e não fazem commit: quem chama controla a transação.
+As instruções são Core e passam por fora do ORM; com uma Session, os objetos já carregados que
+foram afetados são expirados, e o próximo acesso relê os valores do banco.
+"""
+
+#%%
+import os
+import tempfile
+import time
+from typing import Iterable, Sequence
+
+from sqlalchemy import bindparam, inspect, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
+
+from conexao import em_lotes
+from modelos import Produto
+
+INSERT_POR_DIALETO = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def _dialeto(conexao: Session | Connection) -> str:
+    bind = conexao.get_bind() if isinstance(conexao, Session) else conexao
+    return bind.dialect.name
+
+
+def _expirar(conexao: Session | Connection, modelo: type[SQLModel], chaves: Sequence[str],
+             lote: list[dict], colunas: Sequence[str]) -> None:
+    # O UPDATE/INSERT Core não passa pelo identity map: expira as colunas alteradas dos objetos do
+    # lote que a Session já tinha carregado. O valor da chave vem de inspect().dict, que não dispara
+    # uma consulta para objetos já expirados
+    if not isinstance(conexao, Session) or not colunas:
+        return
+    alterados = {tuple(registro[c] for c in chaves) for registro in lote}
+    for objeto in list(conexao.identity_map.values()):
+        if not isinstance(objeto, modelo):
+            continue
+        estado = inspect(objeto).dict
+        if all(c in estado for c in chaves) and tuple(estado[c] for c in chaves) in alterados:
+            conexao.expire(objeto, list(colunas))
+
+
+def atualizar_em_lote(conexao: Session | Connection, modelo: type[SQLModel], registros: Iterable[dict],
+                      chave: str = 'id', tamanho_lote: int = 1000) -> dict:
+    """
+    registros: [{"id": 1, "preco": 150}, {"id": 2, "preco": 90}, ...]
+    Todas as linhas do lote precisam ter as mesmas colunas.
+    """
+    tabela = modelo.__table__
+    resultado = {"afetados": 0, "lotes": 0}
+    for lote in em_lotes(registros, tamanho_lote):
+        colunas = [c for c in lote[0] if c != chave]
+        # Os bindparams têm prefixo para não colidir com os nomes das colunas no SET
+        stmt = update(tabela).where(tabela.c[chave] == bindparam(f'b_{chave}')).values(
+            {c: bindparam(f'b_{c}') for c in colunas}
+        )
+        parametros = [{f'b_{c}': valor for c, valor in registro.items()} for registro in lote]
+        resultado["afetados"] += conexao.execute(stmt, parametros).rowcount
+        resultado["lotes"] += 1
+        _expirar(conexao, modelo, (chave,), lote, colunas)
+    return resultado
+
+
+def atualizar_precos(conexao: Session | Connection, precos: dict[int, int], tamanho_lote: int = 1000) -> dict:
+    # precos: {id_do_produto: novo_preco}
+    registros = ({"id": id, "preco": preco} for id, preco in precos.items())
+    return atualizar_em_lote(conexao, Produto, registros, tamanho_lote=tamanho_lote)
+
+
+def upsert(conexao: Session | Connection, modelo: type[SQLModel], registros: Iterable[dict],
+           chaves: Sequence[str] = ('id',), colunas_atualizar: Sequence[str] | None = None,
+           tamanho_lote: int = 500) -> dict:
+    """
+    Insere os registros novos e atualiza os existentes (conflito nas colunas de `chaves`).
+    Os registros precisam ter todas as colunas obrigatórias, já que podem ser inseridos.
+    colunas_atualizar: colunas sobrescritas em caso de conflito (padrão: todas as enviadas, menos as chaves).
+    """
+    construtor = INSERT_POR_DIALETO.get(_dialeto(conexao))
+    tabela = modelo.__table__
+
+    resultado = {"afetados": 0, "lotes": 0}
+    for lote in em_lotes(registros, tamanho_lote):
+        atualizar = colunas_atualizar or [c for c in lote[0] if c not in chaves]
+        if construtor is None:
+            resultado["afetados"] += _upsert_generico(conexao, tabela, lote, chaves, atualizar)
+        else:
+            stmt = construtor(tabela).values(lote)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(chaves),
+                set_={c: stmt.excluded[c] for c in atualizar},
+            )
+            resultado["afetados"] += conexao.execute(stmt).rowcount
+        resultado["lotes"] += 1
+        _expirar(conexao, modelo, chaves, lote, atualizar)
+    return resultado
+
+
+def _upsert_generico(conexao: Session | Connection, tabela, lote: list[dict], chaves: Sequence[str],
+                     atualizar: Sequence[str]) -> int:
+    # Dialetos sem ON CONFLICT: uma consulta pelas chaves do lote, depois INSERT dos novos e UPDATE
+    # dos existentes, os dois em executemany. Sem trava, duas transações podem inserir a mesma chave
+    # ao mesmo tempo; nesse caso a constraint única do banco rejeita a segunda
+    colunas_chave = [tabela.c[c] for c in chaves]
+    valores = [tuple(registro[c] for c in chaves) for registro in lote]
+    if len(chaves) == 1:
+        filtro = colunas_chave[0].in_([valor[0] for valor in valores])
+    else:
+        filtro = tuple_(*colunas_chave).in_(valores)
+    existentes = {tuple(linha) for linha in conexao.execute(select(*colunas_chave).where(filtro))}
+
+    novos = [registro for registro, valor in zip(lote, valores) if valor not in existentes]
+    antigos = [registro for registro, valor in zip(lote, valores) if valor in existentes]
+    if novos:
+        conexao.execute(insert(tabela), novos)
+    if antigos and atualizar:
+        condicao = [coluna == bindparam(f'b_{coluna.name}') for coluna in colunas_chave]
+        stmt = update(tabela).where(*condicao).values({c: bindparam(f'b_{c}') for c in atualizar})
+        conexao.execute(stmt, [{f'b_{c}': registro[c] for c in (*chaves, *atualizar)} for registro in antigos])
+    return len(novos) + len(antigos)
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: loop ORM por linha vs atualização em lote
+#------------------------------------------------------
+
+def benchmark(n_produtos: int = 20_000, n_mudancas: int = 5_000) -> None:
+    from conexao import criar_engine
+
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = criar_engine(f"sqlite:///{os.path.join(pasta, 'lote.db')}")
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Produto.__table__),
+                         [{"nome": f"Produto {i}", "preco": 100} for i in range(1, n_produtos + 1)])
+
+        ids = range(1, n_mudancas + 1)
+
+        # Como no SQLModel_exercicios.py: .one(), altera, add, commit e busca de novo para conferir
+        inicio = time.perf_counter()
+        with Session(engine) as session:
+            for id in ids:
+                produto = session.execute(select(Produto).where(Produto.id == id)).scalars().one()
+                produto.preco = 150
+                session.add(produto)
+                session.commit()
+                session.execute(select(Produto).where(Produto.id == produto.id)).scalars().one()
+        por_linha = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        with Session(engine) as session:
+            resultado = atualizar_precos(session, {id: 200 for id in ids})
+            session.commit()
+        em_lote = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        with engine.begin() as conn:
+            # Metade atualiza produtos existentes, metade insere produtos novos
+            registros = [{"id": id, "nome": f"Produto {id}", "preco": 300}
+                         for id in range(n_produtos - n_mudancas // 2 + 1, n_produtos + n_mudancas // 2 + 1)]
+            resultado_upsert = upsert(conn, Produto, registros)
+        com_upsert = time.perf_counter() - inicio
+
+        print(f"{n_mudancas} mudanças de preço")
+        print(f"loop ORM por linha     | {por_linha:6.2f}s")
+        print(f"atualizar_precos       | {em_lote:6.2f}s | {por_linha / em_lote:5.0f}x | {resultado}")
+        print(f"upsert (ON CONFLICT)   | {com_upsert:6.2f}s | {por_linha / com_upsert:5.0f}x | {resultado_upsert}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    benchmark()
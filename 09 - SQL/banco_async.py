@@ -0,0 +1,202 @@
+"""
+Camada de acesso assíncrona para os modelos Usuario, Produto e Fornecedor.
+
+Usa create_async_engine com o driver aiosqlite e a AsyncSession do SQLModel, para que
+rotas assíncronas (FastAPI, por exemplo) não bloqueiem o event loop enquanto esperam o banco.
+
+Instalação: pip install sqlmodel aiosqlite greenlet
+"""
+
+#%%
+import asyncio
+import os
+import tempfile
+import time
+from functools import lru_cache
+from typing import AsyncIterator, Iterable
+
+from sqlalchemy import func, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from conexao import em_lotes
+from modelos import Fornecedor, Produto, Usuario
+
+URL_PADRAO = 'sqlite+aiosqlite:///desafio.db'
+
+
+#------------------------------------------------------
+# Engine e Sessão
+#------------------------------------------------------
+
+@lru_cache
+def get_engine_async(url: str = URL_PADRAO) -> AsyncEngine:
+    # O engine só é criado na primeira chamada (e reaproveitado nas seguintes)
+    return create_async_engine(url, echo=False)
+
+
+@lru_cache
+def get_sessionmaker(url: str = URL_PADRAO) -> async_sessionmaker:
+    # expire_on_commit=False evita um novo SELECT ao acessar atributos depois do commit
+    return async_sessionmaker(get_engine_async(url), class_=AsyncSession, expire_on_commit=False)
+
+
+async def criar_tabelas(engine: AsyncEngine) -> None:
+    # O create_all é síncrono, então roda dentro da conexão assíncrona via run_sync
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """
+    Dependência para rotas assíncronas:
+
+        @app.get("/produtos/")
+        async def listar(session: AsyncSession = Depends(get_session)):
+            return await listar_produtos(session)
+    """
+    async with get_sessionmaker()() as session:
+        yield session
+
+
+#------------------------------------------------------
+# Inserções em lote
+#------------------------------------------------------
+
+async def inserir_em_lote(session: AsyncSession, modelo: type[SQLModel], registros: Iterable[dict],
+                          tamanho_lote: int = 1000) -> int:
+    # Um executemany por lote direto na tabela, sem criar objetos ORM (os defaults das colunas são aplicados)
+    total = 0
+    for lote in em_lotes(registros, tamanho_lote):
+        await session.exec(insert(modelo.__table__), params=lote)
+        total += len(lote)
+    await session.commit()
+    return total
+
+
+async def inserir_usuarios(session: AsyncSession, usuarios: Iterable[dict], tamanho_lote: int = 1000) -> int:
+    return await inserir_em_lote(session, Usuario, usuarios, tamanho_lote)
+
+
+async def inserir_fornecedores(session: AsyncSession, fornecedores: Iterable[dict], tamanho_lote: int = 1000) -> int:
+    return await inserir_em_lote(session, Fornecedor, fornecedores, tamanho_lote)
+
+
+async def inserir_produtos(session: AsyncSession, produtos: Iterable[dict], tamanho_lote: int = 1000) -> int:
+    return await inserir_em_lote(session, Produto, produtos, tamanho_lote)
+
+
+#------------------------------------------------------
+# Consultas
+#------------------------------------------------------
+
+async def buscar_usuario_por_email(session: AsyncSession, email: str) -> Usuario | None:
+    resultado = await session.exec(select(Usuario).where(Usuario.email == email))
+    return resultado.first()
+
+
+async def buscar_produto_por_nome(session: AsyncSession, nome: str) -> Produto | None:
+    resultado = await session.exec(select(Produto).where(Produto.nome == nome))
+    return resultado.first()
+
+
+async def listar_produtos(session: AsyncSession, limite: int = 100, offset: int = 0) -> list[Produto]:
+    resultado = await session.exec(select(Produto).order_by(Produto.id).offset(offset).limit(limite))
+    return list(resultado.all())
+
+
+async def listar_produtos_com_fornecedor(session: AsyncSession) -> list[tuple[str, str]]:
+    # Em sessões assíncronas não existe lazy load implícito, então o join é feito na própria consulta
+    statement = select(Produto.nome, Fornecedor.nome).join(Fornecedor, Produto.fornecedor_id == Fornecedor.id)
+    resultado = await session.exec(statement)
+    return list(resultado.all())
+
+
+async def total_por_fornecedor(session: AsyncSession) -> list[tuple[str, int]]:
+    '''
+    SELECT fornecedores.nome, SUM(produtos.preco) AS total_preco
+    FROM produtos
+    JOIN fornecedores ON produtos.fornecedor_id = fornecedores.id
+    GROUP BY fornecedores.nome;
+    '''
+    statement = select(
+        Fornecedor.nome,
+        func.sum(Produto.preco).label('total_preco')
+    ).join(
+        Produto, Fornecedor.id == Produto.fornecedor_id
+    ).group_by(
+        Fornecedor.nome
+    )
+    resultado = await session.exec(statement)
+    return list(resultado.all())
+
+
+#%%
+#------------------------------------------------------
+# Teste de carga: caminho síncrono vs assíncrono
+#------------------------------------------------------
+"""
+Cada "requisição" faz uma consulta e espera uma latência de rede simulada (o tempo de ida e volta
+de um banco em servidor). No caminho síncrono o worker fica bloqueado durante a espera e as
+requisições são atendidas uma de cada vez; no assíncrono o event loop atende as outras enquanto espera.
+Com latência zero (SQLite local) a diferença praticamente some, o ganho está em sobrepor a espera de I/O.
+"""
+
+def _popular(url_sync: str, n_fornecedores: int, n_produtos: int) -> None:
+    from sqlmodel import create_engine
+    engine = create_engine(url_sync)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Fornecedor.__table__),
+                     [{"nome": f"Fornecedor {i}"} for i in range(1, n_fornecedores + 1)])
+        conn.execute(insert(Produto.__table__),
+                     [{"nome": f"Produto {i}", "preco": i % 1000, "fornecedor_id": i % n_fornecedores + 1}
+                      for i in range(1, n_produtos + 1)])
+    engine.dispose()
+
+
+def _carga_sincrona(url_sync: str, requisicoes: int, latencia: float) -> float:
+    from sqlmodel import Session, create_engine
+    engine = create_engine(url_sync)
+    inicio = time.perf_counter()
+    for i in range(requisicoes):
+        with Session(engine) as session:
+            session.exec(select(Produto).where(Produto.nome == f"Produto {i + 1}")).first()
+            time.sleep(latencia)
+    duracao = time.perf_counter() - inicio
+    engine.dispose()
+    return duracao
+
+
+async def _carga_assincrona(url_async: str, requisicoes: int, latencia: float, concorrencia: int) -> float:
+    engine = create_async_engine(url_async, pool_size=concorrencia)
+    fabrica = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    limite = asyncio.Semaphore(concorrencia)
+
+    async def requisicao(i: int) -> None:
+        async with limite, fabrica() as session:
+            await buscar_produto_por_nome(session, f"Produto {i + 1}")
+            await asyncio.sleep(latencia)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(requisicao(i) for i in range(requisicoes)))
+    duracao = time.perf_counter() - inicio
+    await engine.dispose()
+    return duracao
+
+
+def benchmark(requisicoes: int = 500, concorrencia: int = 20, latencias: tuple = (0.0, 0.005)) -> None:
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'carga.db')
+        _popular(f'sqlite:///{caminho}', n_fornecedores=50, n_produtos=10_000)
+        for latencia in latencias:
+            t_sync = _carga_sincrona(f'sqlite:///{caminho}', requisicoes, latencia)
+            t_async = asyncio.run(_carga_assincrona(f'sqlite+aiosqlite:///{caminho}', requisicoes, latencia, concorrencia))
+            print(f"latência {latencia * 1000:.0f} ms | síncrono: {requisicoes / t_sync:8.0f} req/s"
+                  f" | assíncrono ({concorrencia} concorrentes): {requisicoes / t_async:8.0f} req/s"
+                  f" | ganho: {t_sync / t_async:.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
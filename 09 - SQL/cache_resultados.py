@@ -0,0 +1,331 @@
+"""
+Cache de resultados de consultas (read-through) com invalidação automática na escrita.
+
+Consultas como a listagem de produtos com fornecedor e o total por fornecedor são lidas muito mais
+vezes do que a tabela produtos muda. O CacheConsultas fica na frente da sessão: a primeira leitura
+vai ao banco e guarda o resultado; as seguintes devolvem o resultado guardado sem tocar no banco.
+
+- Camada em memória: LRU com TTL
+- Camada em disco (opcional): shelve, sobrevive a reinícios do processo
+- Chave: SQL compilado + parâmetros
+- Invalidação: cada tabela tem um número de geração. Quando um flush (ou um UPDATE/DELETE/INSERT
+  executado pela sessão) altera uma tabela, a geração dela sobe e todas as entradas que leram
+  aquela tabela deixam de valer, nas duas camadas. A geração sobe de novo no commit ou rollback
+- Enquanto a sessão tem escritas não confirmadas numa tabela, as consultas dela sobre essa tabela
+  vão direto ao banco: o resultado pode ser desfeito e não pode ser servido a outras sessões
+
+Escritas feitas fora da sessão (Connection do Core, outro processo) não disparam os eventos;
+nesses casos chame cache.invalidar("produtos").
+
+Apenas resultados com colunas (tuplas) são guardados: objetos ORM pertencem a uma sessão.
+"""
+
+#%%
+import hashlib
+import os
+import pickle
+import shelve
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Iterable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql import ClauseElement
+from sqlalchemy.sql.util import find_tables
+
+
+class CacheLRU:
+    # Dicionário ordenado pelo último acesso: o primeiro item é o menos usado recentemente
+    def __init__(self, capacidade: int = 1024, ttl: float = 300.0):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self._itens: OrderedDict = OrderedDict()
+
+    def obter(self, chave: str) -> Any | None:
+        item = self._itens.get(chave)
+        if item is None:
+            return None
+        expira_em, valor = item
+        if expira_em < time.monotonic():
+            del self._itens[chave]
+            return None
+        self._itens.move_to_end(chave)
+        return valor
+
+    def guardar(self, chave: str, valor: Any) -> None:
+        self._itens[chave] = (time.monotonic() + self.ttl, valor)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.capacidade:
+            self._itens.popitem(last=False)
+
+    def remover(self, chave: str) -> None:
+        self._itens.pop(chave, None)
+
+    def limpar(self) -> None:
+        self._itens.clear()
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+
+class CacheDisco:
+    # Segunda camada em disco; usa o relógio de parede porque o arquivo sobrevive ao processo
+    CHAVE_GERACOES = '__geracoes__'
+
+    def __init__(self, caminho: str, ttl: float = 3600.0):
+        self.ttl = ttl
+        self._shelf = shelve.open(caminho)
+
+    def obter(self, chave: str) -> Any | None:
+        item = self._shelf.get(chave)
+        if item is None:
+            return None
+        expira_em, valor = item
+        if expira_em < time.time():
+            del self._shelf[chave]
+            return None
+        return valor
+
+    def guardar(self, chave: str, valor: Any) -> None:
+        self._shelf[chave] = (time.time() + self.ttl, valor)
+
+    def remover(self, chave: str) -> None:
+        self._shelf.pop(chave, None)
+
+    def obter_geracoes(self) -> dict[str, int]:
+        return dict(self._shelf.get(self.CHAVE_GERACOES, {}))
+
+    def guardar_geracoes(self, geracoes: dict[str, int]) -> None:
+        self._shelf[self.CHAVE_GERACOES] = dict(geracoes)
+
+    def limpar(self) -> None:
+        geracoes = self.obter_geracoes()
+        self._shelf.clear()
+        self.guardar_geracoes(geracoes)
+
+    def fechar(self) -> None:
+        self._shelf.close()
+
+
+class CacheConsultas:
+    """
+    Uso:
+
+        cache = CacheConsultas(ttl=60, caminho_disco="cache_consultas")
+        cache.instalar(Session)  # ou uma fábrica criada com sessionmaker
+
+        with Session(engine) as session:
+            totais = cache.consultar(session, TOTAL_POR_FORNECEDOR)
+    """
+
+    def __init__(self, capacidade: int = 1024, ttl: float = 300.0, caminho_disco: str | None = None,
+                 ttl_disco: float = 3600.0):
+        self.memoria = CacheLRU(capacidade, ttl)
+        self.disco = CacheDisco(caminho_disco, ttl_disco) if caminho_disco else None
+        self._lock = threading.RLock()
+        self._geracoes: dict[str, int] = self.disco.obter_geracoes() if self.disco else {}
+        self._sql_compilado: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+
+    #------------------------------------------------------
+    # Leitura
+    #------------------------------------------------------
+
+    def _compilar(self, stmt: ClauseElement) -> tuple[str, dict, tuple[str, ...]]:
+        # SQL e tabelas de uma mesma consulta são calculados uma única vez
+        try:
+            return self._sql_compilado[stmt]
+        except KeyError:
+            compilado = stmt.compile()
+            tabelas = tuple(sorted({t.name for t in find_tables(stmt, check_columns=True)}))
+            info = (compilado.string, compilado.params, tabelas)
+            self._sql_compilado[stmt] = info
+            return info
+
+    def _chave(self, sql: str, parametros: dict) -> str:
+        bruto = pickle.dumps((sql, sorted(parametros.items())))
+        return hashlib.sha1(bruto).hexdigest()
+
+    def consultar(self, session: Session, stmt: ClauseElement, parametros: dict | None = None) -> list[tuple]:
+        sql, params_embutidos, tabelas = self._compilar(stmt)
+        if not session.info.get('tabelas_alteradas', set()).isdisjoint(tabelas):
+            # A sessão tem escritas ainda não confirmadas nessas tabelas: o que ela lê pode ser
+            # desfeito por um rollback, então não vem do cache nem vai para ele
+            return [tuple(linha) for linha in session.execute(stmt, parametros or {})]
+        todos_parametros = {**params_embutidos, **(parametros or {})}
+        chave = self._chave(sql, todos_parametros)
+
+        with self._lock:
+            geracoes = tuple(self._geracoes.get(t, 0) for t in tabelas)
+            item = self.memoria.obter(chave)
+            if item is not None and item[0] == geracoes:
+                self.acertos_memoria += 1
+                return item[1]
+            if self.disco is not None:
+                item = self.disco.obter(chave)
+                if item is not None and item[0] == geracoes:
+                    self.acertos_disco += 1
+                    self.memoria.guardar(chave, item)
+                    return item[1]
+            self.falhas += 1
+
+        linhas = [tuple(linha) for linha in session.execute(stmt, parametros or {})]
+
+        with self._lock:
+            # Só guarda se nenhuma tabela mudou durante a consulta
+            if geracoes == tuple(self._geracoes.get(t, 0) for t in tabelas):
+                item = (geracoes, linhas)
+                self.memoria.guardar(chave, item)
+                if self.disco is not None:
+                    self.disco.guardar(chave, item)
+        return linhas
+
+    #------------------------------------------------------
+    # Invalidação
+    #------------------------------------------------------
+
+    def invalidar(self, *tabelas: str) -> None:
+        with self._lock:
+            for tabela in tabelas:
+                self._geracoes[tabela] = self._geracoes.get(tabela, 0) + 1
+            self.invalidacoes += 1
+            if self.disco is not None:
+                # As gerações também vão para o disco, para valerem depois de um reinício
+                self.disco.guardar_geracoes(self._geracoes)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self.memoria.limpar()
+            if self.disco is not None:
+                self.disco.limpar()
+
+    def instalar(self, alvo: type[Session] | sessionmaker = Session) -> None:
+        # Registra os eventos na classe de sessão (todas as sessões) ou numa fábrica específica
+        event.listen(alvo, 'after_flush', self._apos_flush)
+        event.listen(alvo, 'do_orm_execute', self._ao_executar_orm)
+        event.listen(alvo, 'after_commit', self._apos_commit)
+        event.listen(alvo, 'after_rollback', self._apos_commit)
+        event.listen(alvo, 'after_soft_rollback', self._apos_commit)
+        event.listen(alvo, 'after_transaction_end', self._apos_fim_transacao)
+
+    def desinstalar(self, alvo: type[Session] | sessionmaker = Session) -> None:
+        event.remove(alvo, 'after_flush', self._apos_flush)
+        event.remove(alvo, 'do_orm_execute', self._ao_executar_orm)
+        event.remove(alvo, 'after_commit', self._apos_commit)
+        event.remove(alvo, 'after_rollback', self._apos_commit)
+        event.remove(alvo, 'after_soft_rollback', self._apos_commit)
+        event.remove(alvo, 'after_transaction_end', self._apos_fim_transacao)
+
+    def _marcar(self, session: Session, tabelas: Iterable[str]) -> None:
+        tabelas = set(tabelas)
+        if tabelas:
+            # Invalida já (a própria sessão enxerga a mudança) e de novo no commit, para descartar
+            # o que outra sessão tenha lido e guardado antes da transação terminar
+            session.info.setdefault('tabelas_alteradas', set()).update(tabelas)
+            self.invalidar(*tabelas)
+
+    def _apos_flush(self, session: Session, flush_context) -> None:
+        objetos = list(session.new) + list(session.dirty) + list(session.deleted)
+        self._marcar(session, (t.name for obj in objetos for t in inspect(obj).mapper.tables))
+
+    def _ao_executar_orm(self, estado) -> None:
+        if estado.is_update or estado.is_delete or estado.is_insert:
+            self._marcar(estado.session, [estado.statement.table.name])
+
+    def _apos_commit(self, session: Session, *args) -> None:
+        # Commit ou rollback: o que outra sessão leu e guardou durante a transação deixa de valer
+        tabelas = session.info.get('tabelas_alteradas')
+        if tabelas:
+            self.invalidar(*tabelas)
+
+    def _apos_fim_transacao(self, session: Session, transacao) -> None:
+        # Só no fim da transação principal (não de um SAVEPOINT) a sessão volta a usar o cache
+        if transacao.parent is None:
+            self._apos_commit(session)
+            session.info.pop('tabelas_alteradas', None)
+
+    def resumo(self) -> dict:
+        leituras = self.acertos_memoria + self.acertos_disco + self.falhas
+        return {
+            "acertos_memoria": self.acertos_memoria,
+            "acertos_disco": self.acertos_disco,
+            "falhas": self.falhas,
+            "taxa_acerto": round((leituras - self.falhas) / leituras, 4) if leituras else 0.0,
+            "invalidacoes": self.invalidacoes,
+            "entradas_memoria": len(self.memoria),
+        }
+
+    def fechar(self) -> None:
+        if self.disco is not None:
+            self.disco.fechar()
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: leituras repetidas com e sem cache
+#------------------------------------------------------
+
+def benchmark(leituras: int = 200, n_fornecedores: int = 100, n_produtos: int = 50_000) -> None:
+    from sqlalchemy import insert, select
+    from sqlmodel import SQLModel
+    from conexao import criar_engine
+    from consultas import TOTAL_POR_FORNECEDOR
+    from modelos import Fornecedor, Produto
+
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = criar_engine(f"sqlite:///{os.path.join(pasta, 'cache.db')}")
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Fornecedor.__table__), [{"nome": f"Fornecedor {i}"} for i in range(1, n_fornecedores + 1)])
+            conn.execute(insert(Produto.__table__),
+                         [{"nome": f"Produto {i}", "preco": i % 1000, "fornecedor_id": i % n_fornecedores + 1}
+                          for i in range(1, n_produtos + 1)])
+
+        Sessao = sessionmaker(bind=engine)
+        cache = CacheConsultas(ttl=60, caminho_disco=os.path.join(pasta, 'cache_consultas'))
+        cache.instalar(Sessao)
+
+        with Sessao() as session:
+            inicio = time.perf_counter()
+            for _ in range(leituras):
+                session.execute(TOTAL_POR_FORNECEDOR).all()
+            sem_cache = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            for _ in range(leituras):
+                totais = cache.consultar(session, TOTAL_POR_FORNECEDOR)
+            com_cache = time.perf_counter() - inicio
+
+        print(f"total por fornecedor x{leituras} | sem cache: {sem_cache:.2f}s | com cache: {com_cache:.4f}s"
+              f" | {sem_cache / com_cache:.0f}x")
+
+        # Uma escrita pela sessão invalida as entradas que leram a tabela produtos
+        with Sessao() as session:
+            produto = session.execute(select(Produto).where(Produto.id == 1)).scalar_one()
+            produto.preco += 1000
+            session.commit()
+            totais_novos = cache.consultar(session, TOTAL_POR_FORNECEDOR)
+
+        print(f"após atualizar um preço o resultado mudou? {'Sim' if totais_novos != totais else 'Não'}")
+        print(cache.resumo())
+        cache.desinstalar(Sessao)
+        cache.fechar()
+
+        # Um novo processo (memória vazia) encontra o resultado na camada em disco
+        cache_reiniciado = CacheConsultas(caminho_disco=os.path.join(pasta, 'cache_consultas'))
+        with Sessao() as session:
+            cache_reiniciado.consultar(session, TOTAL_POR_FORNECEDOR)
+        print(f"após reiniciar: {cache_reiniciado.resumo()}")
+        cache_reiniciado.fechar()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    benchmark()
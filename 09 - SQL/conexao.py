@@ -0,0 +1,251 @@
+"""
+Fábrica compartilhada de engines e sessões.
+
+Em vez de cada script chamar create_engine/sessionmaker por conta própria, os módulos pedem o
+banco para obter_banco(url): o engine, a fábrica de sessões e o pool de conexões são criados
+uma única vez por URL e reaproveitados. As configurações do pool são escolhidas pelo dialeto:
+
+- SQLite em memória: StaticPool (uma única conexão, senão cada conexão veria um banco vazio)
+- SQLite em arquivo: QueuePool pequeno, sem pre-ping/recycle (não há servidor para derrubar a conexão).
+  Os PRAGMAs ficam os padrão do SQLite; um perfil de perfil_sqlite.py só é aplicado quando pedido
+  (obter_banco(url, perfil_sqlite='oltp')). O modo WAL fica gravado no arquivo do banco e cria os
+  arquivos -wal/-shm ao lado dele, por isso não é ligado sem pedir no desafio.db dos exercícios
+- Servidores (PostgreSQL, MySQL...): QueuePool com pre-ping e recycle, como o engine_otimizado
+  do SQLAlchemy_introducao.py
+"""
+
+#%%
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Iterator, TypeVar
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+
+URL_PADRAO = 'sqlite:///desafio.db'
+
+T = TypeVar('T')
+
+
+def configuracao_pool(url: str) -> dict:
+    # Retorna os parâmetros de pool recomendados para o dialeto da URL
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+        return {
+            "poolclass": QueuePool,
+            "pool_size": 5,
+            "max_overflow": 10,
+            "pool_timeout": 30,
+            "connect_args": {"check_same_thread": False},
+        }
+    return {
+        "poolclass": QueuePool,
+        "pool_size": 10,  # Tamanho do pool de conexões
+        "max_overflow": 20,  # Máximo de conexões extras
+        "pool_timeout": 30,  # Timeout em segundos
+        "pool_recycle": 1800,  # Recicla conexões após 30 minutos
+        "pool_pre_ping": True,  # Testa a conexão antes de usar (descarta conexões derrubadas pelo servidor)
+    }
+
+
+def criar_engine(url: str = URL_PADRAO, echo: bool = False, perfil_sqlite: str | None = None,
+                 **opcoes_pool) -> Engine:
+    # opcoes_pool sobrescreve a configuração padrão do dialeto (ex.: pool_size=20)
+    configuracao = configuracao_pool(url)
+    configuracao.update(opcoes_pool)
+    engine = create_engine(url, echo=echo, **configuracao)
+    # Perfil de PRAGMAs (perfil_sqlite.py): só para SQLite em arquivo, ignorado nos outros bancos
+    if perfil_sqlite and engine.dialect.name == 'sqlite' and engine.url.database not in (None, '', ':memory:'):
+        from perfil_sqlite import aplicar_perfil
+        aplicar_perfil(engine, perfil_sqlite)
+    return engine
+
+
+def em_lotes(itens: Iterable[T], tamanho_lote: int) -> Iterator[list[T]]:
+    # Listas de até tamanho_lote itens, de uma lista ou de um gerador (sem materializar a entrada)
+    iterador = iter(itens)
+    while lote := list(islice(iterador, tamanho_lote)):
+        yield lote
+
+
+#------------------------------------------------------
+# Métricas do pool
+#------------------------------------------------------
+
+class MetricasPool:
+    """
+    Coleta métricas do pool de conexões a partir dos eventos do SQLAlchemy.
+
+    As esperas são medidas por quem pede a conexão (BancoDeDados.sessao/conexao),
+    já que o pool não emite evento enquanto uma thread aguarda uma conexão livre.
+    """
+
+    LIMIAR_ESPERA = 0.001  # checkouts que demoram mais que isso contam como espera
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.zerar()
+        event.listen(engine, 'connect', self._ao_conectar)
+        event.listen(engine, 'checkout', self._ao_retirar)
+        event.listen(engine, 'checkin', self._ao_devolver)
+        event.listen(engine, 'invalidate', self._ao_invalidar)
+
+    def zerar(self) -> None:
+        with self._lock:
+            self.conexoes_criadas = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidacoes = 0
+            self.esperas = 0
+            self.tempo_espera = 0.0
+            self.em_uso = 0
+            self.pico_em_uso = 0
+            self.pico_overflow = 0
+
+    def _ao_conectar(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.conexoes_criadas += 1
+
+    def _ao_retirar(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.em_uso += 1
+            self.pico_em_uso = max(self.pico_em_uso, self.em_uso)
+            overflow = getattr(self.engine.pool, 'overflow', None)
+            if overflow is not None:
+                self.pico_overflow = max(self.pico_overflow, overflow())
+
+    def _ao_devolver(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.checkins += 1
+            self.em_uso = max(self.em_uso - 1, 0)
+
+    def _ao_invalidar(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self.invalidacoes += 1
+
+    def registrar_espera(self, segundos: float) -> None:
+        with self._lock:
+            self.tempo_espera += segundos
+            if segundos > self.LIMIAR_ESPERA:
+                self.esperas += 1
+
+    def resumo(self) -> dict:
+        with self._lock:
+            return {
+                "conexoes_criadas": self.conexoes_criadas,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "em_uso": self.em_uso,
+                "pico_em_uso": self.pico_em_uso,
+                "pico_overflow": self.pico_overflow,
+                "esperas": self.esperas,
+                "tempo_espera_s": round(self.tempo_espera, 4),
+                "invalidacoes": self.invalidacoes,
+                "status_pool": self.engine.pool.status(),
+            }
+
+
+#------------------------------------------------------
+# Banco de dados (engine + sessões + métricas)
+#------------------------------------------------------
+
+class BancoDeDados:
+    def __init__(self, url: str = URL_PADRAO, echo: bool = False, classe_sessao: type[Session] = Session,
+                 **opcoes_pool):
+        self.url = url
+        self.engine = criar_engine(url, echo=echo, **opcoes_pool)
+        self.metricas = MetricasPool(self.engine)
+        # Uma única fábrica de sessões por engine
+        self.Session = sessionmaker(bind=self.engine, class_=classe_sessao)
+
+    @contextmanager
+    def sessao(self) -> Iterator[Session]:
+        # Commit ao sair do bloco sem exceções, rollback caso contrário
+        with self.Session() as session:
+            inicio = time.perf_counter()
+            session.connection()  # retira a conexão do pool agora, para medir a espera
+            self.metricas.registrar_espera(time.perf_counter() - inicio)
+            try:
+                yield session
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+
+    @contextmanager
+    def conexao(self) -> Iterator[Connection]:
+        inicio = time.perf_counter()
+        with self.engine.begin() as conn:
+            self.metricas.registrar_espera(time.perf_counter() - inicio)
+            yield conn
+
+    def fechar(self) -> None:
+        self.engine.dispose()
+
+
+@lru_cache
+def obter_banco(url: str = URL_PADRAO, echo: bool = False, perfil_sqlite: str | None = None) -> BancoDeDados:
+    # Mesma URL -> mesmo engine, mesmo pool e mesma fábrica de sessões
+    return BancoDeDados(url, echo=echo, perfil_sqlite=perfil_sqlite)
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: vazão x tamanho do pool
+#------------------------------------------------------
+"""
+Várias threads executam transações curtas ao mesmo tempo. Cada transação segura a conexão por
+uma latência simulada (o tempo de ida e volta de um banco em servidor). Com pool pequeno as
+threads fazem fila esperando conexão; a vazão cresce com o pool até o número de threads.
+"""
+
+def _carga(banco: BancoDeDados, threads: int, transacoes_por_thread: int, latencia: float) -> float:
+    def trabalhador() -> None:
+        for _ in range(transacoes_por_thread):
+            with banco.conexao() as conn:
+                conn.execute(text("SELECT count(*) FROM itens")).scalar()
+                time.sleep(latencia)
+
+    lista_threads = [threading.Thread(target=trabalhador) for _ in range(threads)]
+    inicio = time.perf_counter()
+    for t in lista_threads:
+        t.start()
+    for t in lista_threads:
+        t.join()
+    return time.perf_counter() - inicio
+
+
+def benchmark(threads: int = 16, transacoes_por_thread: int = 50, latencia: float = 0.002,
+              tamanhos_pool: tuple = (1, 2, 4, 8, 16)) -> None:
+    with tempfile.TemporaryDirectory() as pasta:
+        url = f"sqlite:///{os.path.join(pasta, 'pool.db')}"
+        preparo = criar_engine(url)
+        with preparo.begin() as conn:
+            conn.execute(text("CREATE TABLE itens (id INTEGER PRIMARY KEY, valor INTEGER)"))
+            conn.execute(text("INSERT INTO itens (valor) VALUES (:v)"), [{"v": i} for i in range(1000)])
+        preparo.dispose()
+
+        total = threads * transacoes_por_thread
+        for tamanho in tamanhos_pool:
+            banco = BancoDeDados(url, pool_size=tamanho, max_overflow=0)
+            duracao = _carga(banco, threads, transacoes_por_thread, latencia)
+            m = banco.metricas.resumo()
+            print(f"pool_size={tamanho:2d} | {total / duracao:7.0f} transações/s"
+                  f" | conexões criadas: {m['conexoes_criadas']:2d} | checkouts: {m['checkouts']}"
+                  f" | esperas: {m['esperas']} ({m['tempo_espera_s']:.2f}s)")
+            banco.fechar()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,47 @@
+import datetime
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlmodel import SQLModel
+
+from modelos import Fornecedor, Produto, Usuario  # o import registra as tabelas no SQLModel.metadata
+
+CRIACAO = datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # Banco novo em arquivo temporário, com todas as tabelas; nunca o desafio.db
+    engine = create_engine(f"sqlite:///{tmp_path / 'teste.db'}")
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def populado(engine):
+    """
+    Dados de exemplo dos testes de leitura:
+
+        fornecedores: 1 A, 2 B, 3 C (sem produtos)
+        produtos:     1 p1 10 (A), 2 p2 20 (A), 3 p3 sem preço (B), 4 p4 40 (B), 5 p5 50 (A),
+                      6 "sem fornecedor" 5, 7 "órfão" 7 (fornecedor 99; o SQLite não confere a FK)
+        usuarios:     1 Ana ana@x.com 30, 2 Bia bia@x.com sem idade
+    """
+    with engine.begin() as conn:
+        conn.execute(insert(Fornecedor.__table__), [{"id": 1, "nome": "A"}, {"id": 2, "nome": "B"},
+                                                    {"id": 3, "nome": "C"}])
+        conn.execute(insert(Produto.__table__), [
+            {"id": 1, "nome": "p1", "preco": 10, "fornecedor_id": 1},
+            {"id": 2, "nome": "p2", "preco": 20, "fornecedor_id": 1},
+            {"id": 3, "nome": "p3", "preco": None, "fornecedor_id": 2},
+            {"id": 4, "nome": "p4", "preco": 40, "fornecedor_id": 2},
+            {"id": 5, "nome": "p5", "preco": 50, "fornecedor_id": 1},
+            {"id": 6, "nome": "sem fornecedor", "preco": 5, "fornecedor_id": None},
+            {"id": 7, "nome": "órfão", "preco": 7, "fornecedor_id": 99},
+        ])
+        conn.execute(insert(Usuario.__table__), [
+            {"nome": "Ana", "email": "ana@x.com", "idade": 30, "data_criacao": CRIACAO},
+            {"nome": "Bia", "email": "bia@x.com", "idade": None, "data_criacao": CRIACAO},
+        ])
+    return engine
@@ -0,0 +1,202 @@
+"""
+Consultas pré-construídas para os caminhos quentes (busca de produto por nome e total por fornecedor).
+
+Nos exercícios, cada chamada monta de novo o select(...).where(...). O SQLAlchemy já guarda o SQL
+compilado em cache (compiled cache do engine), mas para encontrar a entrada ele precisa reconstruir
+a expressão e calcular a chave de cache toda vez. Aqui as consultas são montadas uma única vez:
+
+- constantes com bindparam: a expressão e a chave de cache são criadas só uma vez
+- lambda_stmt: a chave de cache é derivada da posição do código da lambda, e as variáveis
+  capturadas viram parâmetros, sem reconstruir a expressão a cada chamada
+
+Medindo com o benchmark abaixo, as constantes com bindparam são o caminho mais rápido; o lambda_stmt
+ainda precisa clonar a expressão a cada execução e acaba mais lento que o select montado na hora,
+então ele fica só para consultas com critérios opcionais. Quando não é preciso o objeto ORM,
+a versão Core (tuplas numa Connection) elimina também o custo de montar as entidades.
+"""
+
+#%%
+import time
+from sqlalchemy import bindparam, event, func, insert, lambda_stmt, select, text
+from sqlalchemy.engine import Connection, Engine, Row
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.orm import Session
+
+from modelos import Fornecedor, Produto
+
+
+#------------------------------------------------------
+# Consultas pré-construídas
+#------------------------------------------------------
+
+PRODUTO_POR_NOME = select(Produto).where(Produto.nome == bindparam('nome'))
+
+PRODUTO_POR_ID = select(Produto).where(Produto.id == bindparam('produto_id'))
+
+_produtos = Produto.__table__
+PRODUTO_POR_NOME_CORE = select(
+    _produtos.c.id, _produtos.c.nome, _produtos.c.preco, _produtos.c.fornecedor_id
+).where(_produtos.c.nome == bindparam('nome'))
+
+'''
+SELECT fornecedores.nome, SUM(produtos.preco) AS total_preco
+FROM produtos
+JOIN fornecedores ON produtos.fornecedor_id = fornecedores.id
+GROUP BY fornecedores.nome;
+'''
+TOTAL_POR_FORNECEDOR = select(
+    Fornecedor.nome,
+    func.sum(Produto.preco).label('total_preco')
+).join(
+    Produto, Fornecedor.id == Produto.fornecedor_id
+).group_by(
+    Fornecedor.nome
+)
+
+PRODUTOS_COM_FORNECEDOR = select(Produto.nome, Fornecedor.nome.label('fornecedor')).join(
+    Fornecedor, Produto.fornecedor_id == Fornecedor.id
+)
+
+
+def buscar_produto_por_nome(session: Session, nome: str) -> Produto | None:
+    return session.execute(PRODUTO_POR_NOME, {"nome": nome}).scalars().first()
+
+
+def buscar_linha_produto_por_nome(conn: Connection, nome: str) -> Row | None:
+    # Sem ORM: devolve (id, nome, preco, fornecedor_id)
+    return conn.execute(PRODUTO_POR_NOME_CORE, {"nome": nome}).first()
+
+
+def buscar_produto_por_id(session: Session, produto_id: int) -> Produto | None:
+    return session.execute(PRODUTO_POR_ID, {"produto_id": produto_id}).scalars().first()
+
+
+def total_por_fornecedor(session: Session) -> list[tuple[str, int]]:
+    return session.execute(TOTAL_POR_FORNECEDOR).all()
+
+
+def listar_produtos_com_fornecedor(session: Session) -> list[tuple[str, str]]:
+    return session.execute(PRODUTOS_COM_FORNECEDOR).all()
+
+
+def buscar_produtos_por_fornecedor(session: Session, fornecedor_id: int, preco_minimo: int = 0) -> list[Produto]:
+    # lambda_stmt: fornecedor_id e preco_minimo são capturados como parâmetros, não como literais,
+    # e o critério opcional gera uma segunda entrada no cache em vez de uma por valor
+    stmt = lambda_stmt(lambda: select(Produto))
+    stmt += lambda s: s.where(Produto.fornecedor_id == fornecedor_id)
+    if preco_minimo:
+        stmt += lambda s: s.where(Produto.preco >= preco_minimo)
+    stmt += lambda s: s.order_by(Produto.id)
+    return list(session.execute(stmt).scalars())
+
+
+#------------------------------------------------------
+# Estatísticas do compiled cache
+#------------------------------------------------------
+
+class EstatisticasCache:
+    """
+    Conta acertos e falhas do compiled cache do engine a cada execução.
+
+        estatisticas = EstatisticasCache(engine)
+        ...
+        print(estatisticas.resumo())
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.zerar()
+        event.listen(engine, 'after_cursor_execute', self._ao_executar)
+
+    def zerar(self) -> None:
+        self.acertos = 0
+        self.falhas = 0
+        self.sem_cache = 0
+
+    def _ao_executar(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        situacao = getattr(context, 'cache_hit', None)
+        if situacao == CACHE_HIT:
+            self.acertos += 1
+        elif situacao == CACHE_MISS:
+            self.falhas += 1
+        else:
+            self.sem_cache += 1  # SQL textual, DDL ou cache desativado
+
+    @property
+    def taxa_acerto(self) -> float:
+        total = self.acertos + self.falhas
+        return self.acertos / total if total else 0.0
+
+    def resumo(self) -> dict:
+        return {
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "sem_cache": self.sem_cache,
+            "taxa_acerto": round(self.taxa_acerto, 4),
+        }
+
+
+def desligar(estatisticas: EstatisticasCache) -> None:
+    event.remove(estatisticas.engine, 'after_cursor_execute', estatisticas._ao_executar)
+
+
+#%%
+#------------------------------------------------------
+# Microbenchmark: 100 mil buscas por nome
+#------------------------------------------------------
+
+def _imprimir(descricao: str, duracao: float, buscas: int, estatisticas: EstatisticasCache) -> None:
+    print(f"{descricao:30s} | {duracao:6.2f}s | {duracao / buscas * 1e6:6.1f} µs/consulta"
+          f" | cache: {estatisticas.resumo()}")
+
+
+def benchmark(buscas: int = 100_000, n_produtos: int = 1_000) -> None:
+    from sqlmodel import SQLModel
+    from conexao import criar_engine
+
+    engine = criar_engine('sqlite://')
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Fornecedor.__table__), [{"nome": f"Fornecedor {i}"} for i in range(1, 11)])
+        conn.execute(insert(Produto.__table__),
+                     [{"nome": f"Produto {i}", "preco": i, "fornecedor_id": i % 10 + 1} for i in range(1, n_produtos + 1)])
+        # Índice em nome para que o tempo medido seja o overhead do Python, e não o full scan
+        conn.execute(text("CREATE INDEX ix_produtos_nome ON produtos (nome)"))
+
+    nomes = [f"Produto {i % n_produtos + 1}" for i in range(buscas)]
+
+    def como_nos_exercicios(session: Session, nome: str):
+        return session.execute(select(Produto).where(Produto.nome == nome)).scalars().first()
+
+    def com_lambda_stmt(session: Session, nome: str):
+        return session.execute(lambda_stmt(lambda: select(Produto).where(Produto.nome == nome))).scalars().first()
+
+    estrategias = [
+        ("select montado a cada chamada", como_nos_exercicios),
+        ("lambda_stmt", com_lambda_stmt),
+        ("constante com bindparam", buscar_produto_por_nome),
+    ]
+
+    estatisticas = EstatisticasCache(engine)
+    for descricao, buscar in estrategias:
+        estatisticas.zerar()
+        with Session(engine) as session:
+            inicio = time.perf_counter()
+            for nome in nomes:
+                buscar(session, nome)
+            duracao = time.perf_counter() - inicio
+        _imprimir(descricao, duracao, buscas, estatisticas)
+
+    estatisticas.zerar()
+    with engine.connect() as conn:
+        inicio = time.perf_counter()
+        for nome in nomes:
+            buscar_linha_produto_por_nome(conn, nome)
+        duracao = time.perf_counter() - inicio
+    _imprimir("constante Core (tuplas)", duracao, buscas, estatisticas)
+    desligar(estatisticas)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,158 @@
+"""
+Exportação colunar de resultados de consultas (Arrow -> Parquet/CSV).
+
+As consultas de 09 - SQL terminam em loops de print; para levar o resultado a uma análise,
+o caminho natural seria objetos ORM -> lista de dicionários -> DataFrame -> arquivo. Aqui o cursor
+é lido em lotes e cada lote vira direto um RecordBatch do Arrow, gravado em seguida no arquivo,
+sem criar objetos ORM nem segurar o resultado inteiro na memória.
+
+É o equivalente ao carregar_dados da ETL de 07 - criando uma etl, que grava CSV e Parquet
+(lá a partir de um DataFrame, aqui a partir de uma consulta SQL).
+
+Instalação: pip install pyarrow
+"""
+
+#%%
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric, Select, String, TypeDecorator, insert, select
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+from leitura_streaming import pa, transmitir
+from modelos import Fornecedor, Produto
+
+FORMATOS_SUPORTADOS = ['csv', 'parquet']
+
+
+def _tipo_arrow(tipo_sql) -> "pa.DataType | None":
+    # Tipo Arrow a partir do tipo da coluna; None deixa o pyarrow inferir
+    if isinstance(tipo_sql, TypeDecorator):
+        # Tipos customizados (ex.: AutoString do SQLModel) usam o tipo que encapsulam
+        tipo_sql = tipo_sql.impl_instance
+    if isinstance(tipo_sql, Boolean):
+        return pa.bool_()
+    if isinstance(tipo_sql, Integer):
+        return pa.int64()
+    if isinstance(tipo_sql, (Float, Numeric)):
+        return pa.float64()
+    if isinstance(tipo_sql, DateTime):
+        return pa.timestamp('us', tz='UTC' if tipo_sql.timezone else None)
+    if isinstance(tipo_sql, Date):
+        return pa.date32()
+    if isinstance(tipo_sql, String):
+        return pa.string()
+    return None
+
+
+def esquema_arrow(stmt: Select) -> "pa.Schema | None":
+    # O esquema vem das colunas da consulta, assim um primeiro lote só com nulos não muda os tipos
+    campos = []
+    for coluna in stmt.selected_columns:
+        tipo = _tipo_arrow(coluna.type)
+        if tipo is None:
+            return None
+        campos.append(pa.field(coluna.key, tipo))
+    return pa.schema(campos)
+
+
+def exportar_consulta(conexao: Connection, stmt: Select, destino: str, formato: str = 'parquet',
+                      tamanho_lote: int = 50_000) -> dict:
+    """
+    Executa a consulta e grava o resultado em `destino` (csv ou parquet), lote a lote.
+    Aceita consultas de colunas (select(Produto.nome, ...)), joins e agregações; select(Produto)
+    também funciona numa Connection, que devolve as colunas da tabela em vez de objetos ORM.
+    """
+    if pa is None:
+        raise ImportError("a exportação precisa do pyarrow: pip install pyarrow")
+    if formato not in FORMATOS_SUPORTADOS:
+        raise ValueError(f"Formato de saída {formato} não suportado")
+    import pyarrow.csv
+    import pyarrow.parquet
+
+    esquema = esquema_arrow(stmt)
+    escritor = None
+    resultado = {"arquivo": destino, "linhas": 0, "lotes": 0}
+    try:
+        for lote in transmitir(conexao, stmt, tamanho_lote, formato='arrow'):
+            if esquema is not None:
+                lote = lote.cast(esquema) if lote.num_rows else pa.RecordBatch.from_pylist([], schema=esquema)
+            if escritor is None:
+                if formato == 'parquet':
+                    escritor = pyarrow.parquet.ParquetWriter(destino, lote.schema)
+                else:
+                    escritor = pyarrow.csv.CSVWriter(destino, lote.schema)
+            escritor.write_batch(lote)
+            resultado["linhas"] += lote.num_rows
+            resultado["lotes"] += 1
+    finally:
+        if escritor is not None:
+            escritor.close()
+    if escritor is None and esquema is not None:
+        # Consulta sem linhas: grava um arquivo vazio, só com o esquema
+        tabela_vazia = esquema.empty_table()
+        if formato == 'parquet':
+            pyarrow.parquet.write_table(tabela_vazia, destino)
+        else:
+            pyarrow.csv.write_csv(tabela_vazia, destino)
+    return resultado
+
+
+def exportar(conexao: Connection, stmt: Select, nome_arquivo: str, formatos_saida: list[str],
+             tamanho_lote: int = 50_000) -> list[dict]:
+    # Como o carregar_dados da ETL: um arquivo por formato (nome_arquivo.csv, nome_arquivo.parquet)
+    return [exportar_consulta(conexao, stmt, f"{nome_arquivo}.{formato}", formato, tamanho_lote)
+            for formato in formatos_saida]
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: ORM + DataFrame vs streaming Arrow
+#------------------------------------------------------
+
+def benchmark(n_produtos: int = 500_000) -> None:
+    import pandas as pd
+    from sqlalchemy.orm import Session
+    from conexao import criar_engine
+
+    listagem = select(
+        Produto.id, Produto.nome, Produto.preco, Fornecedor.nome.label('fornecedor')
+    ).join(Fornecedor, Produto.fornecedor_id == Fornecedor.id).order_by(Produto.id)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = criar_engine(f"sqlite:///{os.path.join(pasta, 'exportacao.db')}")
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Fornecedor.__table__), [{"nome": f"Fornecedor {i}"} for i in range(1, 101)])
+            conn.execute(insert(Produto.__table__),
+                         [{"nome": f"Produto {i}", "preco": i % 1000, "fornecedor_id": i % 100 + 1}
+                          for i in range(1, n_produtos + 1)])
+
+        def via_orm() -> int:
+            with Session(engine) as session:
+                produtos = session.execute(select(Produto).order_by(Produto.id)).scalars().all()
+                df = pd.DataFrame([{"id": p.id, "nome": p.nome, "preco": p.preco,
+                                    "fornecedor": p.fornecedor.nome} for p in produtos])
+                df.to_parquet(os.path.join(pasta, 'orm.parquet'))
+                return len(df)
+
+        def via_arrow() -> int:
+            with engine.connect() as conn:
+                return exportar_consulta(conn, listagem, os.path.join(pasta, 'arrow.parquet'))["linhas"]
+
+        for descricao, funcao in [("ORM -> DataFrame -> Parquet", via_orm), ("cursor -> Arrow -> Parquet", via_arrow)]:
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            linhas = funcao()
+            duracao = time.perf_counter() - inicio
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{descricao:28s} | {linhas} linhas | {duracao:6.2f}s | pico de memória Python: {pico / 1024 / 1024:7.1f} MB")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,306 @@
+"""
+Instrumentação de consultas: histogramas de latência a partir dos eventos do engine.
+
+echo=True imprime o SQL de cada execução, o que é caro demais para produção, e não informa quanto
+a consulta demorou. O MonitorConsultas se registra em before_cursor_execute/after_cursor_execute
+e mantém, para cada consulta normalizada:
+
+- histograma de latência em faixas logarítmicas (memória fixa), com p50/p95/p99
+- número de execuções, tempo total, mínimo e máximo
+- linhas afetadas/retornadas, quando o driver informa (cursor.rowcount; o sqlite3 só informa
+  em INSERT/UPDATE/DELETE, para SELECT devolve -1)
+
+Consultas acima de limiar_lento vão para o log (loguru) como WARNING, e um relatório em JSON pode
+ser gravado periodicamente por uma thread em segundo plano.
+
+Normalização: o SQL já chega com placeholders, mas literais embutidos e listas de IN expandidas
+(IN (?, ?, ?)) gerariam uma entrada por tamanho de lista; esses trechos viram "?" e "(?...)",
+inclusive o IN de um item só (IN (?)).
+"""
+
+#%%
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from functools import lru_cache
+
+from loguru import logger
+from sqlalchemy import bindparam, event, insert, select, text
+from sqlalchemy.engine import Engine
+
+#------------------------------------------------------
+# Normalização do SQL
+#------------------------------------------------------
+
+_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+")
+_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_IN_UNICO = re.compile(r"\b(IN\s*)\(\s*\?\s*\)", re.IGNORECASE)  # IN com um só item também é lista
+_ESPACOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalizar_sql(sql: str) -> str:
+    # Em cache: o mesmo texto de SQL se repete a cada execução da mesma consulta
+    sql = _TEXTO.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMERO.sub('?', sql)
+    sql = _LISTA.sub('(?...)', sql)
+    sql = _IN_UNICO.sub(r'\1(?...)', sql)
+    return _ESPACOS.sub(' ', sql).strip()
+
+
+#------------------------------------------------------
+# Histograma
+#------------------------------------------------------
+
+class HistogramaLatencia:
+    """
+    Faixas logarítmicas a partir de 1 µs, com FAIXAS_POR_OITAVA faixas a cada vez que o tempo
+    dobra: com 4 faixas por oitava o erro dos percentis fica abaixo de ~19%, com memória fixa
+    (não guarda as amostras).
+    """
+
+    MINIMO = 1e-6
+    FAIXAS_POR_OITAVA = 4
+    N_FAIXAS = 4 * 28  # até ~268 s; acima disso cai na última faixa
+
+    def __init__(self):
+        self.contagens = [0] * self.N_FAIXAS
+        self.execucoes = 0
+        self.total = 0.0
+        self.minimo = math.inf
+        self.maximo = 0.0
+        self.linhas = 0
+
+    def registrar(self, segundos: float, linhas: int = -1) -> None:
+        if segundos <= self.MINIMO:
+            faixa = 0
+        else:
+            faixa = min(int(math.log2(segundos / self.MINIMO) * self.FAIXAS_POR_OITAVA), self.N_FAIXAS - 1)
+        self.contagens[faixa] += 1
+        self.execucoes += 1
+        self.total += segundos
+        if segundos < self.minimo:
+            self.minimo = segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+        if linhas > 0:
+            self.linhas += linhas
+
+    def percentil(self, p: float) -> float:
+        if not self.execucoes:
+            return 0.0
+        alvo = p / 100 * self.execucoes
+        acumulado = 0
+        for faixa, contagem in enumerate(self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                # Limite superior da faixa, sem passar do máximo observado
+                limite = self.MINIMO * 2 ** ((faixa + 1) / self.FAIXAS_POR_OITAVA)
+                return max(min(limite, self.maximo), self.minimo)
+        return self.maximo
+
+    def resumo(self) -> dict:
+        return {
+            "execucoes": self.execucoes,
+            "total_ms": round(self.total * 1000, 3),
+            "media_ms": round(self.total / self.execucoes * 1000, 3) if self.execucoes else 0.0,
+            "min_ms": round(self.minimo * 1000, 3) if self.execucoes else 0.0,
+            "p50_ms": round(self.percentil(50) * 1000, 3),
+            "p95_ms": round(self.percentil(95) * 1000, 3),
+            "p99_ms": round(self.percentil(99) * 1000, 3),
+            "max_ms": round(self.maximo * 1000, 3),
+            "linhas": self.linhas,
+        }
+
+
+#------------------------------------------------------
+# Monitor
+#------------------------------------------------------
+
+class MonitorConsultas:
+    """
+    Uso:
+
+        monitor = MonitorConsultas(limiar_lento=0.2)
+        monitor.instalar(engine)                   # ou instalar(Engine) para todos os engines
+        monitor.iniciar_relatorio('consultas.json', intervalo=60)
+        ...
+        print(monitor.resumo())
+        monitor.parar_relatorio()
+        monitor.desinstalar(engine)
+    """
+
+    OUTRAS = '<outras consultas>'
+
+    def __init__(self, limiar_lento: float = 0.5, maximo_consultas: int = 1000):
+        self.limiar_lento = limiar_lento
+        # Limite de entradas distintas: SQL montado com valores concatenados não estoura a memória
+        self.maximo_consultas = maximo_consultas
+        self._lock = threading.Lock()
+        self._thread_relatorio: threading.Thread | None = None
+        self._parar = threading.Event()
+        self.zerar()
+
+    def zerar(self) -> None:
+        with self._lock:
+            self.histogramas: dict[str, HistogramaLatencia] = {}
+            self.lentas = 0
+            self.inicio = time.time()
+
+    def instalar(self, alvo: Engine | type[Engine] = Engine) -> None:
+        event.listen(alvo, 'before_cursor_execute', self._antes)
+        event.listen(alvo, 'after_cursor_execute', self._depois)
+
+    def desinstalar(self, alvo: Engine | type[Engine] = Engine) -> None:
+        event.remove(alvo, 'before_cursor_execute', self._antes)
+        event.remove(alvo, 'after_cursor_execute', self._depois)
+
+    def _antes(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        context._inicio_consulta = time.perf_counter()
+
+    def _depois(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        inicio = getattr(context, '_inicio_consulta', None)
+        if inicio is None:
+            return  # monitor instalado entre o before e o after desta execução: não há o que medir
+        duracao = time.perf_counter() - inicio
+        linhas = cursor.rowcount
+        chave = normalizar_sql(statement)
+        with self._lock:
+            histograma = self.histogramas.get(chave)
+            if histograma is None:
+                if len(self.histogramas) >= self.maximo_consultas:
+                    chave = self.OUTRAS
+                histograma = self.histogramas.setdefault(chave, HistogramaLatencia())
+            histograma.registrar(duracao, linhas)
+            lenta = duracao >= self.limiar_lento
+            if lenta:
+                self.lentas += 1
+        if lenta:
+            # Só o SQL normalizado: os parâmetros podem ter dados pessoais (e-mails, senhas)
+            logger.warning("Consulta lenta ({:.1f} ms, {} linhas): {}", duracao * 1000, linhas, chave)
+
+    def resumo(self, ordenar_por: str = 'total_ms') -> dict:
+        with self._lock:
+            consultas = [{"sql": sql, **h.resumo()} for sql, h in self.histogramas.items()]
+            lentas = self.lentas
+        consultas.sort(key=lambda c: c[ordenar_por], reverse=True)
+        return {
+            "periodo_s": round(time.time() - self.inicio, 1),
+            "execucoes": sum(c["execucoes"] for c in consultas),
+            "consultas_lentas": lentas,
+            "limiar_lento_ms": self.limiar_lento * 1000,
+            "consultas": consultas,
+        }
+
+    #------------------------------------------------------
+    # Relatório periódico
+    #------------------------------------------------------
+
+    def gravar_relatorio(self, caminho: str) -> None:
+        # Grava num temporário e troca de nome: quem lê o arquivo nunca vê um JSON pela metade
+        temporario = f"{caminho}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.resumo(), arquivo, ensure_ascii=False, indent=2)
+        os.replace(temporario, caminho)
+
+    def iniciar_relatorio(self, caminho: str, intervalo: float = 60.0) -> None:
+        if self._thread_relatorio is not None:
+            raise RuntimeError("O relatório periódico já está em execução")
+        self._parar.clear()
+
+        def gravar() -> None:
+            try:
+                self.gravar_relatorio(caminho)
+            except OSError as e:
+                logger.error(f"Falha ao gravar o relatório de consultas em {caminho}: {e}")
+
+        def laco() -> None:
+            while not self._parar.wait(intervalo):
+                gravar()
+            gravar()  # relatório final ao parar
+
+        self._thread_relatorio = threading.Thread(target=laco, name='relatorio-consultas', daemon=True)
+        self._thread_relatorio.start()
+
+    def parar_relatorio(self) -> None:
+        if self._thread_relatorio is None:
+            return
+        self._parar.set()
+        self._thread_relatorio.join()
+        self._thread_relatorio = None
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: custo da instrumentação
+#------------------------------------------------------
+"""
+O pior caso para o monitor são consultas muito rápidas (busca por chave primária num SQLite local),
+em que o tempo do próprio evento pesa mais. Em consultas reais, com rede e disco, a proporção cai.
+"""
+
+def _carga(engine: Engine, repeticoes: int, n_produtos: int) -> float:
+    from modelos import Fornecedor, Produto
+    por_id = select(Produto.nome, Produto.preco).where(Produto.id == bindparam('id'))
+    por_fornecedor = (select(Fornecedor.nome, Produto.nome).join(Produto, Produto.fornecedor_id == Fornecedor.id)
+                      .where(Fornecedor.id == bindparam('id')))
+    inicio = time.perf_counter()
+    with engine.connect() as conn:
+        for i in range(repeticoes):
+            conn.execute(por_id, {"id": i % n_produtos + 1}).all()
+            conn.execute(por_fornecedor, {"id": i % 100 + 1}).all()
+    return time.perf_counter() - inicio
+
+
+def benchmark(repeticoes: int = 20_000, n_produtos: int = 10_000, rodadas: int = 5) -> None:
+    from sqlmodel import SQLModel
+    from conexao import criar_engine
+    from modelos import Fornecedor, Produto
+
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = criar_engine(f"sqlite:///{os.path.join(pasta, 'instrumentacao.db')}")
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Fornecedor.__table__), [{"nome": f"Fornecedor {i}"} for i in range(1, 101)])
+            conn.execute(insert(Produto.__table__),
+                         [{"nome": f"Produto {i}", "preco": i % 1000, "fornecedor_id": i % 100 + 1}
+                          for i in range(1, n_produtos + 1)])
+            conn.execute(text("CREATE INDEX ix_produtos_fornecedor ON produtos (fornecedor_id)"))
+
+        monitor = MonitorConsultas(limiar_lento=0.05)
+        _carga(engine, 1_000, n_produtos)  # aquecimento (cache de compilação do SQLAlchemy)
+
+        # Rodadas alternadas, fica o melhor tempo de cada lado (menos ruído da máquina)
+        sem, com = [], []
+        for _ in range(rodadas):
+            sem.append(_carga(engine, repeticoes, n_produtos))
+            monitor.instalar(engine)
+            com.append(_carga(engine, repeticoes, n_produtos))
+            monitor.desinstalar(engine)
+
+        execucoes = 2 * repeticoes
+        melhor_sem, melhor_com = min(sem), min(com)
+        print(f"{execucoes} execuções | sem monitor: {melhor_sem:.3f}s ({melhor_sem / execucoes * 1e6:.1f} µs/consulta)"
+              f" | com monitor: {melhor_com:.3f}s ({melhor_com / execucoes * 1e6:.1f} µs/consulta)")
+        print(f"custo da instrumentação: {(melhor_com - melhor_sem) / melhor_sem * 100:+.1f}%"
+              f" ({(melhor_com - melhor_sem) / execucoes * 1e6:.2f} µs por consulta)")
+
+        caminho = os.path.join(pasta, 'consultas.json')
+        monitor.gravar_relatorio(caminho)
+        with open(caminho, encoding='utf-8') as arquivo:
+            relatorio = json.load(arquivo)
+        for consulta in relatorio["consultas"]:
+            print(f"  {consulta['execucoes']:7d}x | p50 {consulta['p50_ms']:.3f} ms | p95 {consulta['p95_ms']:.3f} ms"
+                  f" | p99 {consulta['p99_ms']:.3f} ms | {consulta['sql'][:70]}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    benchmark()
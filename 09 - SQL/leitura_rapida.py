@@ -0,0 +1,128 @@
+"""
+Caminho rápido para montar modelos de leitura a partir de linhas confiáveis do banco.
+
+Cada Usuario/UsuarioRead criado com o construtor passa pela validação do Pydantic, mesmo quando os
+dados acabaram de sair de uma coluna tipada do banco. Para esses casos:
+
+- model_construct: cria o UsuarioRead sem validar (os dados já vêm do banco com os tipos certos)
+- UsuarioLinha: NamedTuple com os mesmos campos, ainda mais leve, para quem só vai serializar
+- usuarios_para_json: serializa uma lista inteira de uma vez pelo pydantic-core
+
+Só use o caminho rápido com dados que vieram do banco; entradas do usuário continuam
+passando por UsuarioCreate, com validação.
+"""
+
+#%%
+import datetime
+import json
+import time
+from typing import Iterator, NamedTuple, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
+
+from modelos import Usuario, UsuarioRead
+
+
+class UsuarioLinha(NamedTuple):
+    id: int
+    nome: str
+    email: str
+    idade: Optional[int]
+    ativo: bool
+    data_criacao: datetime.datetime
+
+
+CAMPOS_USUARIO_READ = tuple(UsuarioRead.model_fields)
+
+# Seleciona só as colunas expostas pelo UsuarioRead, na ordem do UsuarioLinha
+COLUNAS_USUARIO = select(*(Usuario.__table__.c[campo] for campo in UsuarioLinha._fields)).order_by(Usuario.__table__.c.id)
+
+_LISTA_USUARIO_READ = TypeAdapter(list[UsuarioRead])
+
+
+def para_read_sem_validacao(modelo_read: type[SQLModel], objeto) -> SQLModel:
+    # Copia os campos do modelo de leitura a partir de um objeto do banco (ex.: UsuarioTable -> UsuarioRead)
+    return modelo_read.model_construct(**{campo: getattr(objeto, campo) for campo in modelo_read.model_fields})
+
+
+def ler_usuarios(conexao: Session | Connection, tamanho_lote: int = 10_000) -> Iterator[UsuarioRead]:
+    # UsuarioRead sem validação, direto das colunas (sem criar objetos Usuario)
+    resultado = conexao.execute(COLUNAS_USUARIO.execution_options(yield_per=tamanho_lote))
+    construir = UsuarioRead.model_construct
+    for linha in resultado:
+        yield construir(**linha._mapping)
+
+
+def ler_usuarios_linhas(conexao: Session | Connection, tamanho_lote: int = 10_000) -> Iterator[UsuarioLinha]:
+    resultado = conexao.execute(COLUNAS_USUARIO.execution_options(yield_per=tamanho_lote))
+    fazer = UsuarioLinha._make
+    for linha in resultado:
+        yield fazer(linha)
+
+
+def usuarios_para_json(usuarios: list[UsuarioRead]) -> bytes:
+    # Uma única chamada ao serializador do pydantic-core para a lista inteira
+    return _LISTA_USUARIO_READ.dump_json(usuarios)
+
+
+def _padrao_json(valor):
+    if isinstance(valor, datetime.datetime):
+        return valor.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def linhas_para_json(linhas: list[UsuarioLinha]) -> str:
+    return json.dumps([linha._asdict() for linha in linhas], default=_padrao_json, separators=(',', ':'))
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: serializar 100 mil usuários para JSON
+#------------------------------------------------------
+
+def benchmark(n_usuarios: int = 100_000) -> None:
+    from conexao import criar_engine
+
+    engine = criar_engine('sqlite://')
+    SQLModel.metadata.create_all(engine)
+    agora = datetime.datetime.now(datetime.timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(Usuario.__table__),
+                     [{"nome": f"Usuário {i}", "email": f"usuario{i}@exemplo.com", "idade": 18 + i % 50,
+                       "data_criacao": agora} for i in range(n_usuarios)])
+
+    def caminho_atual() -> int:
+        # Como no criar_usuario: objeto Usuario validado e cópia campo a campo para um UsuarioRead validado
+        with Session(engine) as session:
+            usuarios = session.execute(select(Usuario)).scalars().all()
+            resposta = [UsuarioRead(id=u.id, nome=u.nome, email=u.email, idade=u.idade, ativo=u.ativo,
+                                    data_criacao=u.data_criacao) for u in usuarios]
+            return len("[" + ",".join(r.model_dump_json() for r in resposta) + "]")
+
+    def sem_validacao() -> int:
+        with engine.connect() as conn:
+            return len(usuarios_para_json(list(ler_usuarios(conn))))
+
+    def tuplas() -> int:
+        with engine.connect() as conn:
+            return len(linhas_para_json(list(ler_usuarios_linhas(conn))))
+
+    referencia = None
+    for descricao, funcao in [("atual (ORM + validação)", caminho_atual),
+                              ("model_construct + dump_json", sem_validacao),
+                              ("NamedTuple + json.dumps", tuplas)]:
+        inicio = time.perf_counter()
+        tamanho = funcao()
+        duracao = time.perf_counter() - inicio
+        referencia = referencia or duracao
+        print(f"{descricao:30s} | {duracao:6.2f}s | {n_usuarios / duracao:9.0f} usuários/s"
+              f" | {referencia / duracao:4.1f}x | {tamanho / 1024 / 1024:.1f} MB de JSON")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    benchmark()
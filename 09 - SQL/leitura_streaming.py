@@ -0,0 +1,165 @@
+"""
+Leitura em streaming de tabelas grandes (produtos, fornecedores).
+
+session.query(Produto).all() e session.exec(select(Fornecedor)).all() carregam a tabela inteira
+como objetos ORM antes de devolver o primeiro item. Aqui as leituras são feitas em páginas:
+
+- paginação por chave (keyset): WHERE id > :ultimo_id ORDER BY id LIMIT :n
+  cada página é uma consulta nova e barata (usa o índice da chave primária), ao contrário de OFFSET,
+  que fica mais lento a cada página
+- yield_per / stream_results: uma única consulta, lida do cursor em lotes (cursor do lado do servidor
+  no PostgreSQL/MySQL)
+
+As linhas podem vir como objetos ORM, tuplas leves ou lotes do Arrow (pyarrow é opcional).
+"""
+
+#%%
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Iterator, Literal
+
+from sqlalchemy import ColumnElement, Select, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
+
+from modelos import Fornecedor, Produto
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow só é necessário para formato='arrow'
+    pa = None
+
+Formato = Literal['orm', 'tupla', 'arrow']
+
+
+def linhas_para_arrow(linhas: list[tuple], nomes_colunas: list[str]) -> "pa.RecordBatch":
+    # Transpõe as linhas em colunas e monta um RecordBatch (os tipos são inferidos pelo pyarrow)
+    if pa is None:
+        raise ImportError("formato='arrow' precisa do pyarrow: pip install pyarrow")
+    colunas = list(zip(*linhas)) if linhas else [[] for _ in nomes_colunas]
+    return pa.RecordBatch.from_arrays([pa.array(coluna) for coluna in colunas], names=nomes_colunas)
+
+
+#------------------------------------------------------
+# Paginação por chave (keyset)
+#------------------------------------------------------
+
+def paginar_por_chave(session: Session, modelo: type[SQLModel], tamanho_pagina: int = 1000,
+                      formato: Formato = 'orm', filtro: ColumnElement[bool] | None = None) -> Iterator[Any]:
+    """
+    Gera uma página por vez: lista de objetos ORM, lista de tuplas ou pa.RecordBatch.
+    A memória usada fica limitada ao tamanho da página, qualquer que seja o tamanho da tabela.
+    """
+    chave = modelo.__table__.c.id
+    if formato == 'orm':
+        stmt = select(modelo)
+    else:
+        stmt = select(*modelo.__table__.columns)
+    if filtro is not None:
+        stmt = stmt.where(filtro)
+    stmt = stmt.order_by(chave).limit(tamanho_pagina)
+    nomes_colunas = [c.name for c in modelo.__table__.columns]
+    posicao_chave = nomes_colunas.index('id')
+
+    ultimo_id = None
+    while True:
+        pagina_stmt = stmt if ultimo_id is None else stmt.where(chave > ultimo_id)
+        if formato == 'orm':
+            pagina = list(session.execute(pagina_stmt).scalars())
+            if not pagina:
+                return
+            ultimo_id = pagina[-1].id
+            yield pagina
+        else:
+            linhas = [tuple(linha) for linha in session.execute(pagina_stmt)]
+            if not linhas:
+                return
+            ultimo_id = linhas[-1][posicao_chave]
+            yield linhas if formato == 'tupla' else linhas_para_arrow(linhas, nomes_colunas)
+        if formato == 'orm':
+            # Sem referências, os objetos da página anterior saem do identity map da sessão
+            del pagina
+
+
+def iterar_produtos(session: Session, tamanho_pagina: int = 1000, formato: Formato = 'orm') -> Iterator[Any]:
+    # Um item por vez (Produto ou tupla), com a leitura feita em páginas
+    if formato == 'arrow':
+        raise ValueError("para formato='arrow' use paginar_por_chave, que devolve lotes")
+    for pagina in paginar_por_chave(session, Produto, tamanho_pagina, formato):
+        yield from pagina
+
+
+def iterar_fornecedores(session: Session, tamanho_pagina: int = 1000, formato: Formato = 'orm') -> Iterator[Any]:
+    if formato == 'arrow':
+        raise ValueError("para formato='arrow' use paginar_por_chave, que devolve lotes")
+    for pagina in paginar_por_chave(session, Fornecedor, tamanho_pagina, formato):
+        yield from pagina
+
+
+#------------------------------------------------------
+# Streaming de uma única consulta (yield_per)
+#------------------------------------------------------
+
+def transmitir(conexao: Session | Connection, stmt: Select, tamanho_lote: int = 1000,
+               formato: Formato = 'tupla') -> Iterator[Any]:
+    """
+    Executa uma consulta qualquer (joins, agregações...) e lê o cursor em lotes.
+    Útil quando não há uma chave ordenável para paginar.
+    """
+    resultado = conexao.execute(stmt.execution_options(yield_per=tamanho_lote, stream_results=True))
+    nomes_colunas = list(resultado.keys())
+    if formato == 'orm':
+        for lote in resultado.scalars().partitions():
+            yield lote
+        return
+    for lote in resultado.partitions():
+        linhas = [tuple(linha) for linha in lote]
+        yield linhas if formato == 'tupla' else linhas_para_arrow(linhas, nomes_colunas)
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: memória de pico ao percorrer a tabela produtos
+#------------------------------------------------------
+
+def _medir(descricao: str, funcao) -> None:
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    total = funcao()
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{descricao:32s} | {total:8d} linhas | {duracao:6.2f}s | pico de memória: {pico / 1024 / 1024:7.1f} MB")
+
+
+def benchmark(n_produtos: int = 200_000, tamanho_pagina: int = 5_000) -> None:
+    from conexao import criar_engine
+
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = criar_engine(f"sqlite:///{os.path.join(pasta, 'streaming.db')}")
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Fornecedor.__table__), [{"nome": f"Fornecedor {i}"} for i in range(1, 101)])
+            conn.execute(insert(Produto.__table__),
+                         [{"nome": f"Produto {i}", "descricao": f"Descrição do Produto {i}", "preco": i % 1000,
+                           "fornecedor_id": i % 100 + 1} for i in range(1, n_produtos + 1)])
+
+        with Session(engine) as session:
+            _medir(".all() (como nos exercícios)", lambda: len(session.execute(select(Produto)).scalars().all()))
+        with Session(engine) as session:
+            _medir("keyset, objetos ORM", lambda: sum(1 for _ in iterar_produtos(session, tamanho_pagina)))
+        with Session(engine) as session:
+            _medir("keyset, tuplas", lambda: sum(1 for _ in iterar_produtos(session, tamanho_pagina, 'tupla')))
+        with engine.connect() as conn:
+            _medir("yield_per, tuplas", lambda: sum(len(lote) for lote in transmitir(conn, select(*Produto.__table__.columns), tamanho_pagina)))
+        if pa is not None:
+            with Session(engine) as session:
+                _medir("keyset, lotes Arrow", lambda: sum(lote.num_rows for lote in paginar_por_chave(session, Produto, tamanho_pagina, 'arrow')))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,27 @@
+"""
+Modelos compartilhados da camada de acesso a dados.
+
+Cada modelo é declarado uma única vez. Importar o pacote só registra as classes no
+SQLModel.metadata; o engine é criado sob demanda por get_engine() e as tabelas por init_db().
+
+    from modelos import Produto, init_db
+
+    engine = init_db()  # sqlite:///desafio.db
+"""
+
+from modelos.banco import URL_PADRAO, get_engine, init_db
+from modelos.produto import Fornecedor, Produto
+from modelos.usuario import Usuario, UsuarioBase, UsuarioCreate, UsuarioRead, agora_utc
+
+__all__ = [
+    "URL_PADRAO",
+    "get_engine",
+    "init_db",
+    "Fornecedor",
+    "Produto",
+    "Usuario",
+    "UsuarioBase",
+    "UsuarioCreate",
+    "UsuarioRead",
+    "agora_utc",
+]
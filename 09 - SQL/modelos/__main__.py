@@ -0,0 +1,46 @@
+"""
+Mede o custo de importar os modelos: python -m modelos
+
+Roda `python -X importtime -c "import modelos"` num processo limpo, dentro de uma pasta vazia,
+e mostra quanto tempo foi gasto nos módulos do pacote (separado do tempo das bibliotecas,
+sqlmodel/pydantic/sqlalchemy) e se algum arquivo de banco foi criado na importação.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+PASTA_SQL = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+VERIFICACAO = (
+    "import modelos, sys; "
+    "print('engine_criado', modelos.get_engine.cache_info().currsize, 'conexao_importada', 'conexao' in sys.modules)"
+)
+
+
+def medir_importacao() -> None:
+    with tempfile.TemporaryDirectory() as pasta:
+        env = {**os.environ, "PYTHONPATH": PASTA_SQL}
+        processo = subprocess.run([sys.executable, "-X", "importtime", "-c", VERIFICACAO],
+                                  cwd=pasta, env=env, capture_output=True, text=True, check=True)
+        arquivos_criados = os.listdir(pasta)
+
+    # Formato de cada linha: "import time: self [us] | cumulative | nome"
+    tempos = {}
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|")
+        tempos[nome.strip()] = (int(proprio), int(acumulado))
+
+    proprio_modelos = sum(p for nome, (p, _) in tempos.items() if nome.startswith("modelos"))
+    total_modelos = tempos["modelos"][1]
+    print(f"tempo próprio dos módulos modelos.*: {proprio_modelos / 1000:.1f} ms")
+    print(f"tempo total de `import modelos` (com sqlmodel/pydantic/sqlalchemy): {total_modelos / 1000:.1f} ms")
+    print(f"verificação: {processo.stdout.strip()}")
+    print(f"arquivos criados na pasta de trabalho: {arquivos_criados or 'nenhum'}")
+
+
+if __name__ == "__main__":
+    medir_importacao()
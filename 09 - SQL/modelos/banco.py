@@ -0,0 +1,27 @@
+"""
+Engine criado sob demanda e criação explícita das tabelas.
+
+Importar os modelos não cria engine, não abre conexão e não roda create_all: isso só
+acontece quando alguém chama get_engine() ou init_db().
+"""
+
+from functools import lru_cache
+
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel
+
+URL_PADRAO = 'sqlite:///desafio.db'
+
+
+@lru_cache
+def get_engine(url: str = URL_PADRAO, echo: bool = False) -> Engine:
+    # Importado aqui para que `import modelos` não carregue a fábrica de conexões
+    from conexao import obter_banco
+    return obter_banco(url, echo=echo).engine
+
+
+def init_db(url: str = URL_PADRAO, echo: bool = False) -> Engine:
+    # Cria as tabelas que ainda não existem (usuarios, fornecedores, produtos) e devolve o engine
+    engine = get_engine(url, echo)
+    SQLModel.metadata.create_all(engine)
+    return engine
@@ -0,0 +1,34 @@
+"""
+Modelos de catálogo: fornecedores e produtos (um fornecedor tem vários produtos).
+"""
+
+from sqlmodel import Field, SQLModel, Relationship
+from typing import Optional, List
+
+
+class Fornecedor(SQLModel, table=True):
+    __tablename__ = 'fornecedores'
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    nome: str
+    telefone: Optional[str] = None
+    email: Optional[str] = None
+    endereco: Optional[str] = None
+
+    # Relacionamento reverso - não é armazenado no BD, apenas para acesso em Python
+    produtos: List["Produto"] = Relationship(back_populates="fornecedor")
+
+
+class Produto(SQLModel, table=True):
+    __tablename__ = 'produtos'
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    nome: str
+    descricao: Optional[str] = None
+    preco: Optional[int] = None
+
+    # Campo de chave estrangeira
+    fornecedor_id: Optional[int] = Field(default=None, foreign_key="fornecedores.id")
+
+    # Relacionamento com Fornecedor
+    fornecedor: Optional[Fornecedor] = Relationship(back_populates="produtos")
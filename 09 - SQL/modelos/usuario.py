@@ -0,0 +1,52 @@
+"""
+Modelos de usuário: a tabela usuarios e os modelos de entrada/saída da API.
+"""
+
+from sqlalchemy import Index, func
+from sqlmodel import Field, SQLModel
+from typing import Optional
+import datetime
+
+
+def agora_utc() -> datetime.datetime:
+    # datetime.utcnow() devolve um datetime sem fuso; aqui o fuso UTC fica explícito
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class Usuario(SQLModel, table=True):
+    __tablename__ = 'usuarios'
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    nome: str
+    email: str = Field(unique=True)
+    idade: Optional[int] = None
+    ativo: bool = True
+    data_criacao: datetime.datetime = Field(default_factory=agora_utc)
+    senha_hash: Optional[str] = None  # Armazenamos o hash, não a senha
+
+
+# E-mail único sem diferenciar maiúsculas: 'Foo@X.com' e 'foo@x.com' são a mesma conta
+Index('ix_usuarios_email_minusculo', func.lower(Usuario.email), unique=True)
+
+
+#------------------------------------------------------
+# Modelos de Entrada/Saída (sem tabela)
+#------------------------------------------------------
+
+class UsuarioBase(SQLModel):
+    # Campos compartilhados por todos os modelos derivados
+    nome: str
+    email: str
+    idade: Optional[int] = None
+
+
+class UsuarioCreate(UsuarioBase):
+    # A senha não é armazenada, apenas o hash
+    senha: str
+
+
+class UsuarioRead(UsuarioBase):
+    # Resposta da API: inclui o ID gerado pelo banco e nunca a senha
+    id: int
+    ativo: bool
+    data_criacao: datetime.datetime
@@ -0,0 +1,189 @@
+"""
+Perfis de desempenho para SQLite, aplicados por PRAGMA a cada conexão nova.
+
+Os engines dos exercícios abrem sqlite:///desafio.db com a configuração padrão: journal de
+rollback, synchronous=FULL (um fsync por commit), cache de ~2 MB e sem mmap. Os perfis:
+
+- oltp: WAL (leitores não bloqueiam o escritor), synchronous=NORMAL (no WAL, um commit só perde
+  durabilidade numa queda do sistema operacional, nunca corrompe o banco), cache de 64 MB,
+  mmap de 256 MB e tabelas temporárias em memória
+- carga_em_lote: como oltp, mas synchronous=OFF e cache maior; para cargas que podem ser refeitas
+  do zero se a máquina cair no meio. Rode analisar(engine) ao terminar a carga
+- somente_leitura: query_only (qualquer escrita falha), mmap e cache grandes; o modo WAL é
+  gravado no arquivo, então um banco já em WAL continua em WAL
+
+ANALYZE/optimize: o planejador do SQLite só conhece a distribuição dos dados depois de um ANALYZE.
+PRAGMA optimize roda o ANALYZE só nas tabelas que precisam e é barato; aqui ele roda na devolução
+da conexão ao pool a cada intervalo_otimizacao segundos, e analisar() força um ANALYZE completo.
+
+Uso:
+
+    engine = criar_engine('sqlite:///desafio.db', perfil_sqlite='oltp')
+    # ou, num engine já criado:
+    aplicar_perfil(engine, 'carga_em_lote')
+"""
+
+#%%
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from loguru import logger
+from sqlalchemy import event, func, insert, select, text
+from sqlalchemy.engine import Engine
+
+MB = 1024 * 1024
+
+# Valores negativos de cache_size são em KiB (independente do tamanho da página)
+PERFIS = {
+    "padrao": {},
+    "oltp": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64 * 1024,
+        "mmap_size": 256 * MB,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "carga_em_lote": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -256 * 1024,
+        "mmap_size": 256 * MB,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "somente_leitura": {
+        "query_only": "ON",
+        "cache_size": -128 * 1024,
+        "mmap_size": 1024 * MB,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+INTERVALO_OTIMIZACAO = 3600.0
+
+
+def aplicar_perfil(engine: Engine, perfil: str = "oltp",
+                   intervalo_otimizacao: float | None = INTERVALO_OTIMIZACAO) -> None:
+    if engine.dialect.name != 'sqlite':
+        raise ValueError(f"Perfis de SQLite não se aplicam ao dialeto {engine.dialect.name}")
+    if perfil not in PERFIS:
+        raise ValueError(f"Perfil {perfil} não existe; opções: {', '.join(PERFIS)}")
+    pragmas = PERFIS[perfil]
+
+    @event.listens_for(engine, 'connect')
+    def _ao_conectar(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nome}={valor}")
+        cursor.close()
+
+    if intervalo_otimizacao is None or perfil == "somente_leitura":
+        return  # optimize grava as estatísticas, o que uma conexão query_only não pode fazer
+
+    ultima_otimizacao = [time.monotonic()]
+    lock = threading.Lock()
+
+    @event.listens_for(engine, 'checkin')
+    def _ao_devolver(dbapi_connection, connection_record) -> None:
+        if dbapi_connection is None:
+            return
+        with lock:
+            if time.monotonic() - ultima_otimizacao[0] < intervalo_otimizacao:
+                return
+            ultima_otimizacao[0] = time.monotonic()
+        try:
+            dbapi_connection.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            # O checkin acontece no close() de quem usou a conexão: um "database is locked" aqui
+            # não pode virar erro dessa operação, que já terminou. Fica para o próximo intervalo
+            logger.warning(f"PRAGMA optimize falhou na devolução da conexão ao pool: {e}")
+
+
+def analisar(engine: Engine) -> None:
+    # ANALYZE completo: use depois de cargas grandes, quando a distribuição dos dados mudou muito
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+
+def pragmas_atuais(engine: Engine) -> dict:
+    with engine.connect() as conn:
+        return {nome: conn.exec_driver_sql(f"PRAGMA {nome}").scalar()
+                for nome in ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "query_only")}
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: inserção, join e agregação em cada perfil
+#------------------------------------------------------
+"""
+Cada perfil usa um banco novo. Inserção em duas formas: transações de uma linha (padrão OLTP,
+onde pesa o custo do commit/fsync) e executemany em lotes (carga). Leituras: o join de produtos
+com fornecedor e o total por fornecedor. No perfil somente_leitura a carga é feita por um engine
+com o perfil padrão e só as leituras são medidas.
+"""
+
+def _medir(funcao, repeticoes: int = 1) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return time.perf_counter() - inicio
+
+
+def benchmark(n_fornecedores: int = 1_000, n_produtos: int = 200_000, transacoes_curtas: int = 2_000,
+              leituras: int = 5) -> None:
+    from sqlmodel import SQLModel
+    from conexao import criar_engine
+    from consultas import TOTAL_POR_FORNECEDOR
+    from modelos import Fornecedor, Produto
+
+    fornecedores = [{"nome": f"Fornecedor {i}"} for i in range(1, n_fornecedores + 1)]
+    produtos = [{"nome": f"Produto {i}", "preco": i % 1000, "fornecedor_id": i % n_fornecedores + 1}
+                for i in range(1, n_produtos + 1)]
+    listagem = (select(Produto.nome, Fornecedor.nome)
+                .join(Fornecedor, Produto.fornecedor_id == Fornecedor.id)
+                .where(Produto.preco < 100))
+    por_fornecedor = select(Produto.fornecedor_id, func.count(), func.avg(Produto.preco)).group_by(Produto.fornecedor_id)
+
+    print(f"{'perfil':16s} | {'1 linha/commit':>16s} | {'carga em lote':>16s} | {'join':>9s} | {'agregação':>9s}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for perfil in PERFIS:
+            url = f"sqlite:///{os.path.join(pasta, f'{perfil}.db')}"
+            carga = criar_engine(url, perfil_sqlite=None if perfil == "somente_leitura" else perfil)
+            SQLModel.metadata.create_all(carga)
+
+            def uma_por_commit() -> None:
+                for i in range(transacoes_curtas):
+                    with carga.begin() as conn:
+                        conn.execute(insert(Fornecedor.__table__), {"nome": f"Novo {i}"})
+
+            def em_lote() -> None:
+                with carga.begin() as conn:
+                    conn.execute(insert(Fornecedor.__table__), fornecedores)
+                    conn.execute(insert(Produto.__table__), produtos)
+                    conn.execute(text("CREATE INDEX ix_produtos_fornecedor ON produtos (fornecedor_id)"))
+
+            curtas = _medir(uma_por_commit)
+            lote = _medir(em_lote)
+            analisar(carga)
+            carga.dispose()
+
+            leitura = criar_engine(url, perfil_sqlite=perfil)
+            with leitura.connect() as conn:
+                conn.execute(TOTAL_POR_FORNECEDOR).all()  # aquecimento (cache de páginas e mmap)
+                join = _medir(lambda: conn.execute(listagem).all(), leituras) / leituras
+                agregacao = _medir(lambda: (conn.execute(TOTAL_POR_FORNECEDOR).all(),
+                                            conn.execute(por_fornecedor).all()), leituras) / leituras
+            leitura.dispose()
+
+            colunas_escrita = (f"{transacoes_curtas / curtas:10.0f} txn/s | {n_produtos / lote:10.0f} lin/s"
+                               if perfil != "somente_leitura" else f"{'(carga: padrao)':>16s} | {'-':>16s}")
+            print(f"{perfil:16s} | {colunas_escrita} | {join * 1000:6.1f} ms | {agregacao * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,164 @@
+"""
+Relatório de fornecedores e seus produtos sem carregamento preguiçoso.
+
+A célula de relacionamentos do SQLModel_exercicios.py percorre os fornecedores e acessa
+fornecedor.produtos: cada acesso dispara um SELECT (1 consulta para os fornecedores + 1 por
+fornecedor) e cria um objeto Produto por linha. Aqui o mesmo relatório sai de:
+
+1. uma consulta agrupada: quantidade de produtos e total de preço por fornecedor (LEFT JOIN,
+   fornecedores sem produto aparecem com zero); com fornecedor_ids, uma por lote de IN, pelo
+   mesmo motivo das listagens
+2. as listagens de produtos: com fornecedor_ids, os produtos desses fornecedores, com IN (...) em
+   lotes (o SQLite limita o número de parâmetros por instrução); sem fornecedor_ids, uma única
+   leitura completa da tabela produtos ordenada por fornecedor, sem IN
+
+Produtos cujo fornecedor_id não corresponde a nenhum fornecedor (o SQLite não confere chaves
+estrangeiras por padrão) ficam fora das listagens, como já ficam fora dos totais.
+
+O resultado é um dicionário id -> RelatorioFornecedor, com os produtos como tuplas (nome, preco).
+"""
+
+#%%
+import os
+import tempfile
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, selectinload
+from sqlmodel import SQLModel
+
+from conexao import em_lotes
+from modelos import Fornecedor, Produto
+
+TAMANHO_LOTE_IN = 500
+
+
+class ProdutoResumo(NamedTuple):
+    nome: str
+    preco: Optional[int]
+
+
+class RelatorioFornecedor(NamedTuple):
+    nome: str
+    quantidade: int
+    total_preco: int
+    produtos: list[ProdutoResumo]
+
+
+def relatorio_fornecedores(conexao: Session | Connection, fornecedor_ids: Iterable[int] | None = None,
+                           listar_produtos: bool = True,
+                           tamanho_lote_in: int = TAMANHO_LOTE_IN) -> dict[int, RelatorioFornecedor]:
+    # 1. Totais por fornecedor numa consulta agrupada (com fornecedor_ids, uma por lote do IN)
+    totais = select(
+        Fornecedor.id,
+        Fornecedor.nome,
+        func.count(Produto.id).label('quantidade'),
+        func.coalesce(func.sum(Produto.preco), 0).label('total_preco'),
+    ).outerjoin(Produto, Produto.fornecedor_id == Fornecedor.id).group_by(Fornecedor.id).order_by(Fornecedor.id)
+    if fornecedor_ids is None:
+        consultas_totais = [totais]
+    else:
+        # Ordenados e sem repetição: os lotes saem em ordem de id, como na consulta única
+        fornecedor_ids = sorted(set(fornecedor_ids))
+        consultas_totais = [totais.where(Fornecedor.id.in_(lote))
+                            for lote in em_lotes(fornecedor_ids, tamanho_lote_in)]
+
+    relatorio = {
+        id_: RelatorioFornecedor(nome, quantidade, total_preco, [])
+        for consulta in consultas_totais
+        for id_, nome, quantidade, total_preco in conexao.execute(consulta)
+    }
+    if not listar_produtos or not relatorio:
+        return relatorio
+
+    # 2. Listagem dos produtos, só as colunas usadas no relatório
+    listagem = select(Produto.fornecedor_id, Produto.nome, Produto.preco).order_by(Produto.fornecedor_id, Produto.id)
+    if fornecedor_ids is None:
+        consultas = [listagem.where(Produto.fornecedor_id.is_not(None))]
+    else:
+        consultas = [listagem.where(Produto.fornecedor_id.in_(lote))
+                     for lote in em_lotes(list(relatorio), tamanho_lote_in)]
+    for consulta in consultas:
+        for fornecedor_id, nome, preco in conexao.execute(consulta):
+            fornecedor = relatorio.get(fornecedor_id)
+            if fornecedor is not None:  # None: produto órfão
+                fornecedor.produtos.append(ProdutoResumo(nome, preco))
+    return relatorio
+
+
+def imprimir_relatorio(relatorio: dict[int, RelatorioFornecedor]) -> None:
+    # Mesma saída da célula de relacionamentos do SQLModel_exercicios.py
+    for fornecedor in relatorio.values():
+        print(f"Fornecedor: {fornecedor.nome}")
+        print(f"  Produtos ({fornecedor.quantidade}):")
+        for produto in fornecedor.produtos:
+            print(f"    - {produto.nome}: R${produto.preco}")
+        print("-" * 40)
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: carregamento preguiçoso vs selectinload vs relatório agrupado
+#------------------------------------------------------
+
+def _preguicoso(session: Session) -> tuple[int, int]:
+    # Como na célula do SQLModel_exercicios.py: um SELECT por fornecedor.produtos
+    quantidade = total = 0
+    for fornecedor in session.execute(select(Fornecedor)).scalars():
+        quantidade += len(fornecedor.produtos)
+        total += sum(p.preco or 0 for p in fornecedor.produtos)
+    return quantidade, total
+
+
+def _selectinload(session: Session) -> tuple[int, int]:
+    # Carregamento em lote do próprio ORM, ainda criando um objeto por produto
+    quantidade = total = 0
+    for fornecedor in session.execute(select(Fornecedor).options(selectinload(Fornecedor.produtos))).scalars():
+        quantidade += len(fornecedor.produtos)
+        total += sum(p.preco or 0 for p in fornecedor.produtos)
+    return quantidade, total
+
+
+def _agrupado(session: Session) -> tuple[int, int]:
+    relatorio = relatorio_fornecedores(session).values()
+    return sum(len(f.produtos) for f in relatorio), sum(f.total_preco for f in relatorio)
+
+
+def benchmark(n_fornecedores: int = 10_000, n_produtos: int = 1_000_000) -> None:
+    from conexao import criar_engine
+    from instrumentacao import MonitorConsultas
+
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = criar_engine(f"sqlite:///{os.path.join(pasta, 'relatorios.db')}")
+        SQLModel.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Fornecedor.__table__),
+                         [{"nome": f"Fornecedor {i}"} for i in range(1, n_fornecedores + 1)])
+            for inicio in range(0, n_produtos, 100_000):
+                conn.execute(insert(Produto.__table__),
+                             [{"nome": f"Produto {i}", "preco": i % 1000, "fornecedor_id": i % n_fornecedores + 1}
+                              for i in range(inicio + 1, min(inicio + 100_000, n_produtos) + 1)])
+            conn.exec_driver_sql("CREATE INDEX ix_produtos_fornecedor ON produtos (fornecedor_id)")
+
+        # O monitor de consultas conta as idas ao banco
+        monitor = MonitorConsultas(limiar_lento=60)
+        monitor.instalar(engine)
+        print(f"{n_fornecedores} fornecedores, {n_produtos} produtos")
+        for descricao, funcao in [("preguiçoso (fornecedor.produtos)", _preguicoso),
+                                  ("selectinload", _selectinload),
+                                  ("relatório agrupado", _agrupado)]:
+            monitor.zerar()
+            with Session(engine) as session:
+                inicio = time.perf_counter()
+                quantidade, total = funcao(session)
+                duracao = time.perf_counter() - inicio
+            print(f"{descricao:34s} | {monitor.resumo()['execucoes']:6d} consultas | {duracao:6.2f}s"
+                  f" | {quantidade} produtos, total {total}")
+        monitor.desinstalar(engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,221 @@
+"""
+Serviço de cadastro de usuários em lote.
+
+O criar_usuario do SQLModel_introducao.py abre uma sessão, faz commit e refresh para cada usuário,
+e a rota create_user da FastAPI ainda faz um SELECT de e-mail antes de cada INSERT. Aqui, por lote:
+
+1. e-mails repetidos descartados em memória, comparados sem diferenciar maiúsculas (vale o
+   primeiro); o e-mail é gravado como foi digitado, só sem espaços nas pontas
+2. um único SELECT ... WHERE lower(email) IN (...) descobre quem já está cadastrado, mesmo que
+   o e-mail tenha sido gravado com maiúsculas por outro caminho (usa o índice em lower(email)
+   de modelos/usuario.py)
+3. as senhas dos usuários novos são transformadas em hash num pool de processos (PBKDF2 é
+   CPU-bound e, numa thread, seguraria o GIL e serializaria as requisições)
+4. um único INSERT para o lote, com ON CONFLICT DO NOTHING como proteção caso outro processo
+   cadastre o mesmo e-mail entre o SELECT e o INSERT
+
+O SELECT vem antes do hash de propósito: o hash é a parte cara, e não faz sentido calculá-lo
+para e-mails que o índice único vai rejeitar. A sessão do SELECT é fechada antes do hash, e o
+INSERT abre uma transação curta: nenhuma conexão (nem a trava SHARED de um SQLite sem WAL, que
+bloqueia os escritores) fica presa durante o cálculo.
+"""
+
+#%%
+import hashlib
+import hmac
+import os
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterable, Iterator
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlmodel import SQLModel
+
+from atualizacao_lote import INSERT_POR_DIALETO
+from modelos import Usuario, UsuarioCreate
+
+ITERACOES_PBKDF2 = 200_000
+
+
+#------------------------------------------------------
+# Hash de senha (funções de módulo para poderem ir para outros processos)
+#------------------------------------------------------
+
+def gerar_hash_senha(senha: str, iteracoes: int = ITERACOES_PBKDF2) -> str:
+    sal = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac('sha256', senha.encode('utf-8'), sal, iteracoes)
+    return f"pbkdf2_sha256${iteracoes}${sal.hex()}${digest.hex()}"
+
+
+def verificar_senha(senha: str, senha_hash: str) -> bool:
+    _, iteracoes, sal, digest = senha_hash.split('$')
+    calculado = hashlib.pbkdf2_hmac('sha256', senha.encode('utf-8'), bytes.fromhex(sal), int(iteracoes))
+    return hmac.compare_digest(calculado.hex(), digest)
+
+
+def normalizar_email(email: str) -> str:
+    return email.strip().lower()
+
+
+#------------------------------------------------------
+# Serviço
+#------------------------------------------------------
+
+class ServicoUsuarios:
+    """
+    Uso:
+
+        with ServicoUsuarios(engine) as servico:
+            resultado = servico.ingerir(lista_de_usuario_create)
+    """
+
+    def __init__(self, engine: Engine, tamanho_lote: int = 500, processos: int | None = None,
+                 iteracoes: int = ITERACOES_PBKDF2, executor: Executor | None = None):
+        # O dialeto é conferido antes de criar o pool, para um erro aqui não deixar processos órfãos
+        dialeto = engine.dialect.name
+        if dialeto not in INSERT_POR_DIALETO:
+            raise NotImplementedError(f"ingestão em lote não suportada para o dialeto {dialeto}")
+        self._insert = INSERT_POR_DIALETO[dialeto]
+        self.engine = engine
+        self.tamanho_lote = tamanho_lote
+        self.iteracoes = iteracoes
+        self.processos = processos or os.cpu_count() or 1
+        self._executor_proprio = executor is None
+        self.executor = executor or ProcessPoolExecutor(max_workers=self.processos)
+
+    def __enter__(self) -> "ServicoUsuarios":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.fechar()
+
+    def fechar(self) -> None:
+        if self._executor_proprio:
+            self.executor.shutdown()
+
+    def _lotes(self, usuarios: Iterable[UsuarioCreate | dict]) -> Iterator[list[UsuarioCreate]]:
+        lote = []
+        for usuario in usuarios:
+            if isinstance(usuario, dict):
+                usuario = UsuarioCreate.model_validate(usuario)  # entrada externa: com validação
+            lote.append(usuario)
+            if len(lote) == self.tamanho_lote:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    def ingerir(self, usuarios: Iterable[UsuarioCreate | dict]) -> dict:
+        resultado = {"recebidos": 0, "inseridos": 0, "duplicados_na_entrada": 0, "ja_cadastrados": 0}
+        vistos: set[str] = set()
+
+        for lote in self._lotes(usuarios):
+            resultado["recebidos"] += len(lote)
+
+            # 1. Deduplicação em memória (dentro do lote e entre lotes desta chamada)
+            novos: dict[str, UsuarioCreate] = {}
+            for usuario in lote:
+                email = normalizar_email(usuario.email)
+                if email in vistos:
+                    resultado["duplicados_na_entrada"] += 1
+                    continue
+                vistos.add(email)
+                novos[email] = usuario
+            if not novos:
+                continue
+
+            # 2. Uma consulta para o lote inteiro; a sessão fecha antes do hash
+            email_minusculo = func.lower(Usuario.email)
+            with Session(self.engine) as session:
+                existentes = set(session.execute(
+                    select(email_minusculo).where(email_minusculo.in_(list(novos)))
+                ).scalars())
+            resultado["ja_cadastrados"] += len(existentes)
+            for email in existentes:
+                novos.pop(email, None)
+            if not novos:
+                continue
+
+            # 3. Hash das senhas em paralelo, fora do processo principal e sem conexão aberta
+            senhas = [usuario.senha for usuario in novos.values()]
+            iteracoes = [self.iteracoes] * len(senhas)
+            blocos = max(1, len(senhas) // (4 * self.processos))
+            hashes = list(self.executor.map(gerar_hash_senha, senhas, iteracoes, chunksize=blocos))
+
+            # 4. Um INSERT por lote, numa transação curta. Sem alvo no ON CONFLICT, vale tanto o
+            # UNIQUE de email quanto o índice único em lower(email)
+            registros = [
+                {"nome": usuario.nome, "email": usuario.email.strip(), "idade": usuario.idade, "senha_hash": senha_hash}
+                for usuario, senha_hash in zip(novos.values(), hashes)
+            ]
+            stmt = self._insert(Usuario.__table__).on_conflict_do_nothing()
+            with Session(self.engine) as session:
+                inseridos = session.execute(stmt, registros).rowcount
+                session.commit()
+
+            resultado["inseridos"] += inseridos
+            # O que o índice único rejeitou foi cadastrado por outro processo depois do SELECT
+            resultado["ja_cadastrados"] += len(registros) - inseridos
+        return resultado
+
+
+#%%
+#------------------------------------------------------
+# Benchmark: um usuário por vez (como na rota create_user) vs serviço em lote
+#------------------------------------------------------
+
+def _um_por_vez(engine: Engine, entrada: list[UsuarioCreate], iteracoes: int) -> dict:
+    inseridos = 0
+    for usuario in entrada:
+        with Session(engine) as session:
+            existe = session.execute(select(Usuario).where(Usuario.email == usuario.email)).first()
+            if existe:
+                continue
+            db_usuario = Usuario(nome=usuario.nome, email=usuario.email, idade=usuario.idade,
+                                 senha_hash=gerar_hash_senha(usuario.senha, iteracoes))
+            session.add(db_usuario)
+            session.commit()
+            session.refresh(db_usuario)
+            inseridos += 1
+    return {"inseridos": inseridos}
+
+
+def _em_lote(engine: Engine, entrada: list[UsuarioCreate], iteracoes: int) -> dict:
+    with ServicoUsuarios(engine, iteracoes=iteracoes) as servico:
+        return servico.ingerir(entrada)
+
+
+def benchmark(n_usuarios: int = 1_000, lista_iteracoes: tuple = (1, 50_000)) -> None:
+    """
+    Com iteracoes=1 o hash é desprezível e aparece só o ganho de round trips; com o custo real
+    do PBKDF2 o ganho passa a depender do número de processos disponíveis para o hash.
+    """
+    from conexao import criar_engine
+
+    # 10% de e-mails repetidos na entrada e 10% já cadastrados
+    entrada = [UsuarioCreate(nome=f"Usuário {i}", email=f"usuario{i % int(n_usuarios * 0.9)}@exemplo.com",
+                             idade=20 + i % 40, senha=f"senha{i}") for i in range(n_usuarios)]
+    ja_cadastrados = [{"nome": "Existente", "email": f"usuario{i}@exemplo.com"} for i in range(0, n_usuarios, 10)]
+
+    print(f"processos disponíveis: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for iteracoes in lista_iteracoes:
+            for descricao, funcao in (("um por vez", _um_por_vez), ("serviço em lote", _em_lote)):
+                engine = criar_engine(f"sqlite:///{os.path.join(pasta, f'{funcao.__name__}_{iteracoes}')}.db")
+                SQLModel.metadata.create_all(engine)
+                with engine.begin() as conn:
+                    conn.execute(insert(Usuario.__table__), ja_cadastrados)
+
+                inicio = time.perf_counter()
+                resultado = funcao(engine, entrada, iteracoes)
+                duracao = time.perf_counter() - inicio
+                print(f"PBKDF2 x{iteracoes:<6d} | {descricao:16s} | {duracao:6.2f}s"
+                      f" | {n_usuarios / duracao:7.0f} usuários/s | {resultado}")
+                engine.dispose()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,89 @@
+import sqlite3
+import threading
+from concurrent.futures import wait
+
+import pytest
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+import perfil_sqlite
+from acesso_concorrente import AcessoConcorrente
+
+
+@pytest.fixture
+def acesso(tmp_path, monkeypatch):
+    # busy_timeout curto para a trava de escrita de outra conexão falhar logo
+    monkeypatch.setitem(perfil_sqlite.PERFIS["oltp"], "busy_timeout", 50)
+    caminho = tmp_path / "concorrente.db"
+    conn = sqlite3.connect(caminho)
+    conn.execute("CREATE TABLE itens (id INTEGER PRIMARY KEY, valor INTEGER)")
+    conn.close()
+    with AcessoConcorrente(f"sqlite:///{caminho}", leitores=2) as acesso:
+        acesso.caminho = caminho
+        yield acesso
+
+
+def _inserir(valor: int):
+    return lambda conn: conn.execute(text("INSERT INTO itens (valor) VALUES (:v)"), {"v": valor}).lastrowid
+
+
+def _contar(acesso) -> int:
+    with acesso.leitura() as conn:
+        return conn.execute(text("SELECT count(*) FROM itens")).scalar()
+
+
+def test_escritas_agrupadas_e_erro_isolado(acesso):
+    def falhar(conn):
+        conn.execute(text("INSERT INTO itens (valor) VALUES (-1)"))
+        raise ValueError("falhou")
+
+    futuros = [acesso.escrever(_inserir(i)) for i in range(20)] + [acesso.escrever(falhar)]
+    wait(futuros, timeout=10)
+    assert sorted(f.result() for f in futuros[:-1]) == list(range(1, 21))
+    with pytest.raises(ValueError):
+        futuros[-1].result()
+    assert _contar(acesso) == 20  # o SAVEPOINT desfez só a operação que falhou
+    assert acesso.resumo()["operacoes"] == 21
+
+
+def test_leitura_e_somente_leitura(acesso):
+    with pytest.raises(OperationalError):
+        with acesso.leitura() as conn:
+            conn.execute(text("INSERT INTO itens (valor) VALUES (1)"))
+
+
+def test_falha_no_begin_entrega_o_erro_a_todo_o_grupo(acesso):
+    logger.disable("acesso_concorrente")
+    bloqueio = sqlite3.connect(acesso.caminho, isolation_level=None)
+    bloqueio.execute("BEGIN IMMEDIATE")
+    try:
+        futuros = [acesso.escrever(_inserir(i)) for i in range(3)]
+        for futuro in futuros:
+            with pytest.raises(OperationalError, match="locked"):
+                futuro.result(timeout=10)
+    finally:
+        bloqueio.rollback()
+        bloqueio.close()
+        logger.enable("acesso_concorrente")
+    # O escritor continua de pé depois da falha
+    assert acesso.executar_escrita(_inserir(7), timeout=10) == 1
+
+
+def test_escrita_depois_de_fechar_e_recusada(acesso):
+    acesso.fechar()
+    with pytest.raises(RuntimeError, match="fechado"):
+        acesso.escrever(_inserir(1))
+
+
+def test_escrita_com_o_escritor_morto_falha_em_vez_de_esperar(acesso, monkeypatch):
+    def quebrar(conn, grupo):
+        raise SystemError("escritor quebrou")
+
+    monkeypatch.setattr(threading, "excepthook", lambda args: None)
+    monkeypatch.setattr(acesso, "_executar_grupo", quebrar)
+    with pytest.raises(RuntimeError, match="parou"):
+        acesso.executar_escrita(_inserir(1), timeout=10)
+    acesso._escritor.join(timeout=10)
+    with pytest.raises(RuntimeError, match="fechado"):
+        acesso.escrever(_inserir(2))
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import insert, select
+from sqlmodel import Session
+
+import atualizacao_lote
+from atualizacao_lote import atualizar_em_lote, atualizar_precos, upsert
+from modelos import Produto
+
+
+@pytest.fixture
+def produtos(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(Produto.__table__), [{"nome": f"Produto {i}", "preco": 100} for i in range(1, 11)])
+    return engine
+
+
+def _precos(engine) -> dict:
+    with engine.connect() as conn:
+        return dict(conn.execute(select(Produto.id, Produto.preco)).all())
+
+
+def test_atualizar_precos_em_lotes(produtos):
+    with Session(produtos) as session:
+        resultado = atualizar_precos(session, {1: 150, 2: 90, 3: 80}, tamanho_lote=2)
+        session.commit()
+    assert resultado == {"afetados": 3, "lotes": 2}
+    precos = _precos(produtos)
+    assert (precos[1], precos[2], precos[3], precos[4]) == (150, 90, 80, 100)
+
+
+def test_atualizar_em_lote_expira_objetos_carregados(produtos):
+    with Session(produtos) as session:
+        produto = session.get(Produto, 1)
+        outro = session.get(Produto, 2)
+        assert produto.preco == 100
+        atualizar_em_lote(session, Produto, [{"id": 1, "preco": 150}])
+        assert produto.preco == 150
+        assert outro.preco == 100
+
+
+def test_upsert_insere_e_atualiza(produtos):
+    registros = [{"id": 10, "nome": "Produto 10", "preco": 300}, {"id": 11, "nome": "Produto 11", "preco": 300}]
+    with Session(produtos) as session:
+        produto = session.get(Produto, 10)
+        upsert(session, Produto, registros)
+        assert produto.preco == 300
+        session.commit()
+    precos = _precos(produtos)
+    assert (precos[10], precos[11], len(precos)) == (300, 300, 11)
+
+
+def test_upsert_generico_para_dialetos_sem_on_conflict(produtos, monkeypatch):
+    monkeypatch.delitem(atualizacao_lote.INSERT_POR_DIALETO, 'sqlite')
+    registros = [{"id": 9, "nome": "Produto 9", "preco": 1}, {"id": 12, "nome": "Produto 12", "preco": 2}]
+    with produtos.begin() as conn:
+        resultado = upsert(conn, Produto, registros)
+    assert resultado == {"afetados": 2, "lotes": 1}
+    precos = _precos(produtos)
+    assert (precos[9], precos[12], precos[1]) == (1, 2, 100)
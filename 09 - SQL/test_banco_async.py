@@ -0,0 +1,31 @@
+import asyncio
+
+from banco_async import (buscar_produto_por_nome, buscar_usuario_por_email, criar_tabelas, get_engine_async,
+                         get_sessionmaker, inserir_fornecedores, inserir_produtos, inserir_usuarios, listar_produtos,
+                         listar_produtos_com_fornecedor, total_por_fornecedor)
+
+
+def test_insercao_em_lote_e_consultas(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'async.db'}"
+
+    async def cenario():
+        engine = get_engine_async(url)
+        assert get_engine_async(url) is engine  # criado uma vez por URL
+        await criar_tabelas(engine)
+        try:
+            async with get_sessionmaker(url)() as session:
+                assert await inserir_fornecedores(session, [{"nome": "A"}, {"nome": "B"}]) == 2
+                produtos = [{"nome": f"p{i}", "preco": i, "fornecedor_id": i % 2 + 1} for i in range(1, 6)]
+                assert await inserir_produtos(session, produtos, tamanho_lote=2) == 5
+                await inserir_usuarios(session, [{"nome": "Ana", "email": "ana@x.com"}])
+
+                assert (await buscar_usuario_por_email(session, "ana@x.com")).nome == "Ana"
+                assert (await buscar_produto_por_nome(session, "p3")).preco == 3
+                assert await buscar_produto_por_nome(session, "nenhum") is None
+                assert [p.nome for p in await listar_produtos(session, limite=2, offset=1)] == ["p2", "p3"]
+                assert len(await listar_produtos_com_fornecedor(session)) == 5
+                assert sorted(await total_por_fornecedor(session)) == [("A", 6), ("B", 9)]
+        finally:
+            await engine.dispose()
+
+    asyncio.run(cenario())
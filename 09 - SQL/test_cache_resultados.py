@@ -0,0 +1,127 @@
+import time
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from cache_resultados import CacheConsultas, CacheLRU
+from consultas import TOTAL_POR_FORNECEDOR
+from modelos import Produto
+
+
+def test_lru_descarta_o_menos_usado_e_expira(monkeypatch):
+    cache = CacheLRU(capacidade=2, ttl=10)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    assert cache.obter("a") == 1
+    cache.guardar("c", 3)
+    assert cache.obter("b") is None and len(cache) == 2
+
+    agora = time.monotonic()
+    monkeypatch.setattr("cache_resultados.time.monotonic", lambda: agora + 60)
+    assert cache.obter("a") is None
+
+
+def test_leitura_em_cache_e_invalidada_pela_escrita(populado):
+    Sessao = sessionmaker(bind=populado)
+    cache = CacheConsultas()
+    cache.instalar(Sessao)
+    try:
+        with Sessao() as session:
+            totais = cache.consultar(session, TOTAL_POR_FORNECEDOR)
+            assert cache.consultar(session, TOTAL_POR_FORNECEDOR) == totais
+            assert (cache.falhas, cache.acertos_memoria) == (1, 1)
+
+            # Escrita pelo ORM (flush)
+            session.execute(select(Produto).where(Produto.id == 1)).scalar_one().preco += 100
+            session.commit()
+            assert sorted(cache.consultar(session, TOTAL_POR_FORNECEDOR)) == [("A", 180), ("B", 40)]
+
+            # UPDATE executado pela sessão
+            session.execute(update(Produto).where(Produto.id == 4).values(preco=0))
+            session.commit()
+            assert sorted(cache.consultar(session, TOTAL_POR_FORNECEDOR)) == [("A", 180), ("B", 0)]
+        assert cache.falhas == 3
+    finally:
+        cache.desinstalar(Sessao)
+
+
+def test_escrita_nao_confirmada_nao_vai_para_o_cache(populado):
+    Sessao = sessionmaker(bind=populado)
+    cache = CacheConsultas()
+    cache.instalar(Sessao)
+    try:
+        with Sessao() as sessao_a:
+            sessao_a.get(Produto, 1).preco = 999
+            sessao_a.flush()
+            # A própria sessão enxerga a escrita, direto do banco
+            assert ("A", 1069) in cache.consultar(sessao_a, TOTAL_POR_FORNECEDOR)
+            invalidacoes = cache.invalidacoes
+        # Fechou sem commit: o rollback também sobe a geração
+        assert cache.invalidacoes > invalidacoes
+
+        with Sessao() as sessao_b:
+            assert sorted(cache.consultar(sessao_b, TOTAL_POR_FORNECEDOR)) == [("A", 80), ("B", 40)]
+        with Sessao() as sessao_a:
+            # Depois do rollback a sessão volta a usar o cache
+            cache.consultar(sessao_a, TOTAL_POR_FORNECEDOR)
+        assert cache.acertos_memoria == 1
+    finally:
+        cache.desinstalar(Sessao)
+
+
+def test_savepoint_nao_libera_o_cache_antes_do_commit(populado):
+    Sessao = sessionmaker(bind=populado)
+    cache = CacheConsultas()
+    cache.instalar(Sessao)
+    try:
+        with Sessao() as session:
+            with session.begin_nested():
+                session.get(Produto, 1).preco = 999
+            # O SAVEPOINT terminou, mas a transação principal não: nada vai para o cache
+            assert ("A", 1069) in cache.consultar(session, TOTAL_POR_FORNECEDOR)
+            assert len(cache.memoria) == 0
+            session.commit()
+            assert ("A", 1069) in cache.consultar(session, TOTAL_POR_FORNECEDOR)
+            assert len(cache.memoria) == 1
+    finally:
+        cache.desinstalar(Sessao)
+
+
+def test_escrita_fora_da_sessao_exige_invalidar(populado):
+    Sessao = sessionmaker(bind=populado)
+    cache = CacheConsultas()
+    with Sessao() as session:
+        antes = cache.consultar(session, TOTAL_POR_FORNECEDOR)
+        with populado.begin() as conn:
+            conn.execute(update(Produto.__table__).values(preco=0))
+        assert cache.consultar(session, TOTAL_POR_FORNECEDOR) == antes
+        cache.invalidar("produtos")
+        assert sorted(cache.consultar(session, TOTAL_POR_FORNECEDOR)) == [("A", 0), ("B", 0)]
+
+
+def test_camada_em_disco_sobrevive_ao_reinicio(populado, tmp_path):
+    Sessao = sessionmaker(bind=populado)
+    caminho = str(tmp_path / "cache_consultas")
+
+    cache = CacheConsultas(caminho_disco=caminho)
+    with Sessao() as session:
+        totais = cache.consultar(session, TOTAL_POR_FORNECEDOR)
+    cache.fechar()
+
+    reiniciado = CacheConsultas(caminho_disco=caminho)
+    try:
+        with Sessao() as session:
+            assert reiniciado.consultar(session, TOTAL_POR_FORNECEDOR) == totais
+        assert (reiniciado.acertos_disco, reiniciado.falhas) == (1, 0)
+
+        # Invalidações também são persistidas
+        reiniciado.invalidar("produtos")
+    finally:
+        reiniciado.fechar()
+    outro = CacheConsultas(caminho_disco=caminho)
+    try:
+        with Sessao() as session:
+            outro.consultar(session, TOTAL_POR_FORNECEDOR)
+        assert outro.falhas == 1
+    finally:
+        outro.fechar()
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from conexao import BancoDeDados, configuracao_pool, obter_banco
+from perfil_sqlite import pragmas_atuais
+
+
+def test_configuracao_pool_por_dialeto():
+    assert configuracao_pool('sqlite:///:memory:')["poolclass"] is StaticPool
+    assert configuracao_pool('sqlite:///arquivo.db')["poolclass"] is QueuePool
+    servidor = configuracao_pool('postgresql://u:s@localhost/db')
+    assert servidor["pool_pre_ping"] and servidor["pool_recycle"] == 1800
+
+
+def test_obter_banco_reaproveita_o_engine_e_nao_muda_o_journal(tmp_path):
+    url = f"sqlite:///{tmp_path / 'padrao.db'}"
+    banco = obter_banco(url)
+    try:
+        assert obter_banco(url) is banco
+        with banco.conexao() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        assert pragmas_atuais(banco.engine)["journal_mode"] == "delete"
+        assert not (tmp_path / 'padrao.db-wal').exists()
+    finally:
+        banco.fechar()
+        obter_banco.cache_clear()
+
+
+def test_perfil_oltp_so_quando_pedido(tmp_path):
+    banco = BancoDeDados(f"sqlite:///{tmp_path / 'oltp.db'}", perfil_sqlite='oltp')
+    try:
+        assert pragmas_atuais(banco.engine)["journal_mode"] == "wal"
+    finally:
+        banco.fechar()
+
+
+def test_sessao_faz_rollback_em_erro(tmp_path):
+    banco = BancoDeDados(f"sqlite:///{tmp_path / 'sessao.db'}")
+    try:
+        with banco.conexao() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        with pytest.raises(RuntimeError):
+            with banco.sessao() as session:
+                session.execute(text("INSERT INTO t VALUES (1)"))
+                raise RuntimeError
+        with banco.sessao() as session:
+            assert session.execute(text("SELECT count(*) FROM t")).scalar() == 0
+        assert banco.metricas.resumo()["checkouts"] >= 3
+    finally:
+        banco.fechar()
@@ -0,0 +1,30 @@
+from sqlmodel import Session
+
+from consultas import (EstatisticasCache, buscar_linha_produto_por_nome, buscar_produto_por_id,
+                       buscar_produto_por_nome, buscar_produtos_por_fornecedor, desligar,
+                       listar_produtos_com_fornecedor, total_por_fornecedor)
+
+
+def test_consultas_pre_construidas(populado):
+    with Session(populado) as session:
+        assert buscar_produto_por_nome(session, "p3").id == 3
+        assert buscar_produto_por_nome(session, "nenhum") is None
+        assert buscar_produto_por_id(session, 4).nome == "p4"
+        assert sorted(total_por_fornecedor(session)) == [("A", 80), ("B", 40)]
+        assert len(listar_produtos_com_fornecedor(session)) == 5
+        assert [p.id for p in buscar_produtos_por_fornecedor(session, 1)] == [1, 2, 5]
+        assert [p.id for p in buscar_produtos_por_fornecedor(session, 1, preco_minimo=20)] == [2, 5]
+    with populado.connect() as conn:
+        assert tuple(buscar_linha_produto_por_nome(conn, "p5")) == (5, "p5", 50, 1)
+
+
+def test_constante_reaproveita_o_sql_compilado(populado):
+    estatisticas = EstatisticasCache(populado)
+    try:
+        with Session(populado) as session:
+            for nome in ("p1", "p2", "p3", "p4"):
+                buscar_produto_por_nome(session, nome)
+        assert estatisticas.falhas <= 1
+        assert estatisticas.acertos >= 3
+    finally:
+        desligar(estatisticas)
@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import select
+
+from modelos import Fornecedor, Produto
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.csv  # noqa: E402
+import pyarrow.parquet  # noqa: E402
+
+from exportacao import esquema_arrow, exportar, exportar_consulta  # noqa: E402
+
+LISTAGEM = select(Produto.id, Produto.nome, Produto.preco, Fornecedor.nome.label('fornecedor')).join(
+    Fornecedor, Produto.fornecedor_id == Fornecedor.id).order_by(Produto.id)
+
+
+def test_esquema_vem_dos_tipos_das_colunas():
+    assert esquema_arrow(LISTAGEM) == pa.schema([("id", pa.int64()), ("nome", pa.string()),
+                                                 ("preco", pa.int64()), ("fornecedor", pa.string())])
+
+
+def test_exporta_parquet_e_csv_em_lotes(populado, tmp_path):
+    # Lotes de uma linha: o do p3 só tem preço nulo, e o tipo da coluna não pode depender dos dados
+    with populado.connect() as conn:
+        resultados = exportar(conn, LISTAGEM, str(tmp_path / "produtos"), ['csv', 'parquet'], tamanho_lote=1)
+    assert [(r["linhas"], r["lotes"]) for r in resultados] == [(5, 5), (5, 5)]
+
+    tabela = pyarrow.parquet.read_table(tmp_path / "produtos.parquet")
+    assert tabela.schema.field("preco").type == pa.int64()
+    assert tabela.column("preco").to_pylist() == [10, 20, None, 40, 50]
+    assert pyarrow.csv.read_csv(tmp_path / "produtos.csv").num_rows == 5
+
+
+def test_consulta_vazia_grava_so_o_esquema(engine, tmp_path):
+    with engine.connect() as conn:
+        resultado = exportar_consulta(conn, LISTAGEM, str(tmp_path / "vazio.parquet"))
+    assert resultado["linhas"] == 0
+    assert pyarrow.parquet.read_table(tmp_path / "vazio.parquet").schema.names == ["id", "nome", "preco", "fornecedor"]
+
+
+def test_formato_invalido(engine, tmp_path):
+    with engine.connect() as conn, pytest.raises(ValueError):
+        exportar_consulta(conn, LISTAGEM, str(tmp_path / "x.json"), formato='json')
@@ -0,0 +1,95 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+from loguru import logger
+from sqlalchemy import bindparam, insert, select
+
+from instrumentacao import HistogramaLatencia, MonitorConsultas, normalizar_sql
+from modelos import Produto
+
+
+def test_normalizacao_agrupa_literais_e_listas_in():
+    assert normalizar_sql("SELECT * FROM t WHERE a = 'x''y' AND b = 10 AND c IN (?, ?, ?)") == \
+        "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (?...)"
+    assert normalizar_sql("SELECT  *\nFROM t WHERE id IN (?, ?)") == normalizar_sql("SELECT * FROM t WHERE id IN (?, ?, ?, ?)")
+    assert normalizar_sql("SELECT lower(?) FROM t WHERE id IN (?)") == "SELECT lower(?) FROM t WHERE id IN (?...)"
+
+
+def test_percentis_do_histograma():
+    histograma = HistogramaLatencia()
+    for _ in range(99):
+        histograma.registrar(0.001)
+    histograma.registrar(1.0, linhas=5)
+    resumo = histograma.resumo()
+    assert resumo["execucoes"] == 100 and resumo["linhas"] == 5
+    assert resumo["p50_ms"] == pytest.approx(1.0, rel=0.19)
+    assert resumo["max_ms"] == 1000.0
+    assert histograma.percentil(99) <= histograma.percentil(100) == 1.0
+
+
+def test_monitor_conta_por_consulta_normalizada(engine, tmp_path):
+    with engine.begin() as conn:
+        conn.execute(insert(Produto.__table__), [{"nome": f"p{i}", "preco": i} for i in range(10)])
+    monitor = MonitorConsultas(limiar_lento=0.0)
+    monitor.instalar(engine)
+    try:
+        with engine.connect() as conn:
+            for tamanho in (1, 2, 3):
+                conn.execute(select(Produto.nome).where(Produto.id.in_(bindparam('ids', expanding=True))),
+                             {"ids": list(range(1, tamanho + 1))}).all()
+    finally:
+        monitor.desinstalar(engine)
+
+    resumo = monitor.resumo()
+    assert resumo["execucoes"] == 3 and resumo["consultas_lentas"] == 3
+    assert [c["execucoes"] for c in resumo["consultas"]] == [3]
+
+    caminho = tmp_path / "consultas.json"
+    monitor.gravar_relatorio(str(caminho))
+    assert json.loads(caminho.read_text(encoding="utf-8"))["execucoes"] == 3
+
+
+def test_limite_de_consultas_distintas(engine):
+    monitor = MonitorConsultas(maximo_consultas=1)
+    monitor.instalar(engine)
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1").all()
+            conn.exec_driver_sql("SELECT count(*) FROM produtos").all()
+            conn.exec_driver_sql("SELECT count(*) FROM usuarios").all()
+    finally:
+        monitor.desinstalar(engine)
+    assert sorted(c["sql"] for c in monitor.resumo()["consultas"]) == [MonitorConsultas.OUTRAS, "SELECT ?"]
+
+
+def test_relatorio_periodico_grava_ao_parar(tmp_path):
+    monitor = MonitorConsultas()
+    caminho = tmp_path / "relatorio.json"
+    monitor.iniciar_relatorio(str(caminho), intervalo=3600)
+    with pytest.raises(RuntimeError):
+        monitor.iniciar_relatorio(str(caminho))
+    monitor.parar_relatorio()
+    assert json.loads(caminho.read_text(encoding="utf-8"))["execucoes"] == 0
+
+
+def test_execucao_sem_inicio_registrado_e_ignorada():
+    # Monitor instalado depois do before_cursor_execute de uma execução em andamento
+    monitor = MonitorConsultas()
+    monitor._depois(None, SimpleNamespace(rowcount=-1), "SELECT 1", (), SimpleNamespace(), False)
+    assert monitor.resumo()["execucoes"] == 0
+
+
+def test_falha_no_relatorio_final_vai_para_o_log(tmp_path, monkeypatch):
+    erros_thread, mensagens = [], []
+    monkeypatch.setattr(threading, "excepthook", erros_thread.append)
+    id_log = logger.add(mensagens.append, level="ERROR")
+    try:
+        monitor = MonitorConsultas()
+        monitor.iniciar_relatorio(str(tmp_path / "nao_existe" / "relatorio.json"), intervalo=3600)
+        monitor.parar_relatorio()
+    finally:
+        logger.remove(id_log)
+    assert erros_thread == []
+    assert len(mensagens) == 1 and "Falha ao gravar" in mensagens[0]
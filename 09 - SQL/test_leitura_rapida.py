@@ -0,0 +1,33 @@
+import datetime
+import json
+
+from sqlmodel import Session, select
+
+from leitura_rapida import (UsuarioLinha, ler_usuarios, ler_usuarios_linhas, linhas_para_json,
+                            para_read_sem_validacao, usuarios_para_json)
+from modelos import Usuario, UsuarioRead
+
+CRIACAO = datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)  # o mesmo do conftest
+
+
+def test_leitura_sem_validacao_equivale_ao_modelo_validado(populado):
+    with populado.connect() as conn:
+        rapidos = list(ler_usuarios(conn, tamanho_lote=1))
+    with Session(populado) as session:
+        validados = [UsuarioRead.model_validate(u, from_attributes=True)
+                     for u in session.exec(select(Usuario).order_by(Usuario.id))]
+        copiado = para_read_sem_validacao(UsuarioRead, session.get(Usuario, 1))
+
+    assert [u.model_dump() for u in rapidos] == [u.model_dump() for u in validados]
+    assert copiado.model_dump() == validados[0].model_dump()
+    assert json.loads(usuarios_para_json(rapidos)) == json.loads(usuarios_para_json(validados))
+
+
+def test_linhas_nomeadas_e_json(populado):
+    with populado.connect() as conn:
+        linhas = list(ler_usuarios_linhas(conn))
+    assert linhas[0] == UsuarioLinha(1, "Ana", "ana@x.com", 30, True, CRIACAO)
+    assert json.loads(linhas_para_json(linhas))[1] == {
+        "id": 2, "nome": "Bia", "email": "bia@x.com", "idade": None, "ativo": True,
+        "data_criacao": CRIACAO.isoformat(),
+    }
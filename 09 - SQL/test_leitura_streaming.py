@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import select
+from sqlmodel import Session
+
+from leitura_streaming import iterar_fornecedores, iterar_produtos, paginar_por_chave, transmitir
+from modelos import Fornecedor, Produto
+
+
+def test_paginas_por_chave_cobrem_a_tabela_sem_repetir(populado):
+    with Session(populado) as session:
+        paginas = list(paginar_por_chave(session, Produto, tamanho_pagina=3))
+        assert [len(p) for p in paginas] == [3, 3, 1]
+        assert [p.id for pagina in paginas for p in pagina] == list(range(1, 8))
+
+        tuplas = list(iterar_produtos(session, tamanho_pagina=2, formato='tupla'))
+        assert len(tuplas) == 7 and tuplas[0][:2] == (1, "p1")
+
+        filtradas = list(paginar_por_chave(session, Produto, 1, 'tupla', filtro=Produto.preco > 20))
+        assert [linha[0] for pagina in filtradas for linha in pagina] == [4, 5]
+
+        assert [f.nome for f in iterar_fornecedores(session, tamanho_pagina=2)] == ["A", "B", "C"]
+        with pytest.raises(ValueError):
+            next(iterar_produtos(session, formato='arrow'))
+
+
+def test_paginas_em_arrow(populado):
+    pytest.importorskip("pyarrow")
+    with Session(populado) as session:
+        lotes = list(paginar_por_chave(session, Produto, 3, 'arrow'))
+    assert [lote.num_rows for lote in lotes] == [3, 3, 1]
+    assert lotes[0].column('nome')[0].as_py() == "p1"
+
+
+def test_transmitir_le_o_cursor_em_lotes(populado):
+    listagem = select(Produto.nome, Fornecedor.nome).join(Fornecedor, Produto.fornecedor_id == Fornecedor.id)
+    with populado.connect() as conn:
+        lotes = list(transmitir(conn, listagem, tamanho_lote=2))
+    assert [len(lote) for lote in lotes] == [2, 2, 1]
+
+    with Session(populado) as session:
+        objetos = [p for lote in transmitir(session, select(Produto), 3, formato='orm') for p in lote]
+    assert len(objetos) == 7 and isinstance(objetos[0], Produto)
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+from sqlalchemy import inspect
+
+import modelos
+from conexao import obter_banco
+
+PASTA_SQL = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_importar_nao_cria_engine_nem_banco(tmp_path):
+    verificacao = ("import modelos, sys; "
+                   "assert modelos.get_engine.cache_info().currsize == 0; assert 'conexao' not in sys.modules")
+    subprocess.run([sys.executable, "-c", verificacao], cwd=tmp_path, check=True,
+                   env={**os.environ, "PYTHONPATH": PASTA_SQL})
+    assert os.listdir(tmp_path) == []
+
+
+def test_init_db_cria_as_tabelas_uma_vez(tmp_path):
+    url = f"sqlite:///{tmp_path / 'modelos.db'}"
+    try:
+        engine = modelos.init_db(url)
+        assert modelos.get_engine(url) is engine
+        assert modelos.init_db(url) is engine  # create_all só cria o que falta
+        inspetor = inspect(engine)
+        assert {"usuarios", "fornecedores", "produtos"} <= set(inspetor.get_table_names())
+        with engine.connect() as conn:
+            # O inspetor do SQLite não reflete índices de expressão; lê direto do catálogo
+            indices = conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars().all()
+        assert "ix_usuarios_email_minusculo" in indices
+    finally:
+        modelos.get_engine(url).dispose()
+        modelos.get_engine.cache_clear()
+        obter_banco.cache_clear()
@@ -0,0 +1,89 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, create_mock_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from perfil_sqlite import aplicar_perfil, pragmas_atuais
+
+
+def test_perfil_oltp_aplicado_a_cada_conexao(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'oltp.db'}")
+    aplicar_perfil(engine, 'oltp')
+    try:
+        pragmas = pragmas_atuais(engine)
+        assert (pragmas["journal_mode"], pragmas["synchronous"]) == ("wal", 1)  # 1 = NORMAL
+        assert pragmas["cache_size"] == -64 * 1024 and pragmas["temp_store"] == 2
+    finally:
+        engine.dispose()
+
+
+def test_somente_leitura_recusa_escrita(tmp_path):
+    url = f"sqlite:///{tmp_path / 'leitura.db'}"
+    carga = create_engine(url)
+    with carga.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    carga.dispose()
+
+    engine = create_engine(url)
+    aplicar_perfil(engine, 'somente_leitura')
+    try:
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 0
+            with pytest.raises(OperationalError):
+                conn.execute(text("INSERT INTO t VALUES (1)"))
+    finally:
+        engine.dispose()
+
+
+class _Registrando:
+    # Envolve a conexão do sqlite3 para registrar (ou fazer falhar) o que é executado direto nela
+    def __init__(self, conexao, executados: list, erro: Exception | None = None):
+        self._conexao = conexao
+        self._executados = executados
+        self._erro = erro
+
+    def execute(self, sql, *args):
+        self._executados.append(sql)
+        if self._erro is not None and sql == "PRAGMA optimize":
+            raise self._erro
+        return self._conexao.execute(sql, *args)
+
+    def __getattr__(self, nome):
+        return getattr(self._conexao, nome)
+
+
+def _engine_registrando(caminho, executados: list, erro: Exception | None = None):
+    return create_engine("sqlite://", creator=lambda: _Registrando(sqlite3.connect(caminho), executados, erro))
+
+
+def test_optimize_na_devolucao_ao_pool(tmp_path):
+    executados = []
+    engine = _engine_registrando(tmp_path / 'otimizar.db', executados)
+    aplicar_perfil(engine, 'padrao', intervalo_otimizacao=0)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert "PRAGMA optimize" in executados
+    finally:
+        engine.dispose()
+
+
+def test_falha_no_optimize_nao_chega_a_quem_devolve_a_conexao(tmp_path):
+    executados = []
+    engine = _engine_registrando(tmp_path / 'travado.db', executados, sqlite3.OperationalError("database is locked"))
+    aplicar_perfil(engine, 'padrao', intervalo_otimizacao=0)
+    try:
+        with Session(engine) as session:
+            session.execute(text("SELECT 1"))
+        assert "PRAGMA optimize" in executados
+    finally:
+        engine.dispose()
+
+
+def test_perfil_ou_dialeto_invalido():
+    with pytest.raises(ValueError):
+        aplicar_perfil(create_engine('sqlite://'), 'inexistente')
+    with pytest.raises(ValueError):
+        aplicar_perfil(create_mock_engine('postgresql://', executor=None), 'oltp')
@@ -0,0 +1,38 @@
+import sqlite3
+
+from sqlmodel import Session
+
+from relatorios import ProdutoResumo, relatorio_fornecedores
+
+
+def test_relatorio_completo(populado):
+    with Session(populado) as session:
+        relatorio = relatorio_fornecedores(session)
+    assert list(relatorio) == [1, 2, 3]
+    assert (relatorio[1].quantidade, relatorio[1].total_preco) == (3, 80)
+    assert relatorio[1].produtos == [ProdutoResumo("p1", 10), ProdutoResumo("p2", 20), ProdutoResumo("p5", 50)]
+    assert relatorio[2].produtos == [ProdutoResumo("p3", None), ProdutoResumo("p4", 40)]
+    assert (relatorio[3].quantidade, relatorio[3].total_preco, relatorio[3].produtos) == (0, 0, [])
+
+
+def test_relatorio_filtrado_em_lotes(populado):
+    with populado.connect() as conn:
+        relatorio = relatorio_fornecedores(conn, [2, 1, 99, 2], tamanho_lote_in=1)
+    assert list(relatorio) == [1, 2]
+    assert [p.nome for p in relatorio[1].produtos] == ["p1", "p2", "p5"]
+    assert relatorio[2].total_preco == 40
+
+
+def test_muitos_ids_nao_estouram_o_limite_de_parametros(populado):
+    with populado.connect() as conn:
+        # Limite de parâmetros por instrução baixo nesta conexão: um IN com todos os ids falharia
+        conn.connection.driver_connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 100)
+        relatorio = relatorio_fornecedores(conn, range(1, 1_000), tamanho_lote_in=50)
+    assert list(relatorio) == [1, 2, 3]
+    assert len(relatorio[1].produtos) == 3
+
+
+def test_relatorio_sem_listagem(populado):
+    with populado.connect() as conn:
+        relatorio = relatorio_fornecedores(conn, listar_produtos=False)
+    assert relatorio[1].produtos == [] and relatorio[1].quantidade == 3
@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_mock_engine, insert, select
+from sqlmodel import Session
+
+from modelos import Usuario, UsuarioCreate
+import servico_usuarios
+from servico_usuarios import ServicoUsuarios, gerar_hash_senha, verificar_senha
+
+
+class ExecutorSemConexao(ThreadPoolExecutor):
+    # Falha se alguma conexão do engine estiver fora do pool enquanto as senhas viram hash
+    def __init__(self, engine):
+        super().__init__(max_workers=1)
+        self.engine = engine
+        self.conexoes_durante_hash = []
+
+    def map(self, *args, **kwargs):
+        self.conexoes_durante_hash.append(self.engine.pool.checkedout())
+        return super().map(*args, **kwargs)
+
+
+def _usuario(email: str, nome: str = "Usuário") -> UsuarioCreate:
+    return UsuarioCreate(nome=nome, email=email, idade=30, senha="segredo")
+
+
+def _emails(engine) -> list[str]:
+    with Session(engine) as session:
+        return sorted(session.execute(select(Usuario.email)).scalars())
+
+
+def test_senha_com_hash_confere():
+    senha_hash = gerar_hash_senha("segredo", iteracoes=10)
+    assert verificar_senha("segredo", senha_hash)
+    assert not verificar_senha("outra", senha_hash)
+
+
+def test_ingerir_descarta_repetidos_e_cadastrados(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(Usuario.__table__), [{"nome": "Existente", "email": "ja@x.com"}])
+    entrada = [_usuario("a@x.com"), _usuario(" A@X.com "), _usuario("ja@x.com"),
+               {"nome": "B", "email": "b@x.com", "senha": "s"}]
+    with ThreadPoolExecutor(1) as executor, ServicoUsuarios(engine, tamanho_lote=2, iteracoes=1,
+                                                            executor=executor) as servico:
+        resultado = servico.ingerir(entrada)
+    assert resultado == {"recebidos": 4, "inseridos": 2, "duplicados_na_entrada": 1, "ja_cadastrados": 1}
+    assert _emails(engine) == ["a@x.com", "b@x.com", "ja@x.com"]
+
+
+def test_email_gravado_como_foi_digitado(engine):
+    with ThreadPoolExecutor(1) as executor, ServicoUsuarios(engine, iteracoes=1, executor=executor) as servico:
+        resultado = servico.ingerir([_usuario(" Maria.Silva@Exemplo.com "), _usuario("maria.silva@exemplo.com")])
+    assert (resultado["inseridos"], resultado["duplicados_na_entrada"]) == (1, 1)
+    assert _emails(engine) == ["Maria.Silva@Exemplo.com"]
+
+
+def test_dialeto_nao_suportado_nao_cria_o_pool(monkeypatch):
+    def sem_pool(*args, **kwargs):
+        raise AssertionError("o pool de processos não deveria ser criado")
+
+    monkeypatch.setattr(servico_usuarios, "ProcessPoolExecutor", sem_pool)
+    with pytest.raises(NotImplementedError):
+        ServicoUsuarios(create_mock_engine('mysql://', executor=None))
+
+
+def test_email_cadastrado_com_maiusculas_nao_duplica(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(Usuario.__table__), [{"nome": "Foo", "email": "Foo@X.com"}])
+    with ThreadPoolExecutor(1) as executor, ServicoUsuarios(engine, iteracoes=1, executor=executor) as servico:
+        resultado = servico.ingerir([_usuario("foo@x.com")])
+    assert (resultado["inseridos"], resultado["ja_cadastrados"]) == (0, 1)
+    assert _emails(engine) == ["Foo@X.com"]
+
+
+def test_hash_sem_conexao_aberta(engine):
+    executor = ExecutorSemConexao(engine)
+    with ServicoUsuarios(engine, tamanho_lote=2, iteracoes=1, executor=executor) as servico:
+        servico.ingerir([_usuario(f"u{i}@x.com") for i in range(5)])
+    executor.shutdown()
+    assert executor.conexoes_durante_hash == [0, 0, 0]
+    assert len(_emails(engine)) == 5